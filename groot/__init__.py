@@ -9,8 +9,7 @@ from groot.commands import *
 from groot.utilities import run_subprocess, rectify_nodes  # groot.utilities is primarily internal, though we export a few things for convenience
 from groot.constants import STAGES, Stage, EChanges, EDomainNames, EFormat, EStartupMode, EWindowMode  # groot.constants is a mix of internal and external stuff, we specify the external bits now
 
-# noinspection PyUnresolvedReferences
-import groot_ex as _  # Allow the default Groot algorithm collection to register itself
+# The default Groot algorithm collection (`groot_ex`) registers itself when an algorithm is first required, see `AlgorithmCollection.load_defaults`
 
 
 
@@ -2,4 +2,4 @@
 Contains features not required for groot's core logic, but which may be useful to the user
 """
 
-from . import compare, help, miscellaneous, status, usergraphs, wizard
\ No newline at end of file
+from . import compare, help, miscellaneous, profiling, refresh, status, usergraphs, wizard
\ No newline at end of file
@@ -1,38 +1,57 @@
 import itertools
-from typing import Iterable, List, Set, cast, Callable
+from collections import defaultdict
+from typing import Callable, Dict, FrozenSet, Iterable, List, Set, cast
 
 from groot import constants
 from groot.application import app
 from groot.constants import EChanges
-from groot.data import INamedGraph, Report, global_view
-from groot.utilities import lego_graph
+from groot.data import INamedGraph, Report, global_view, model_profile
+from groot.utilities import lego_graph, quartets
 from intermake import pr
 from mgraph import AbstractQuartet, QuartetCollection, QuartetComparison, analysing
 from mhelper import SwitchError, TIniData, TIniSection, array_helper, string_helper
 
 
 @app.command( folder = constants.F_CREATE )
-def create_comparison( left: INamedGraph, right: INamedGraph ) -> EChanges:
+def create_comparison( left: INamedGraph, right: INamedGraph, listing: bool = False, samples: int = 0, processes: int = 0 ) -> EChanges:
     """
     Compares two graphs.
     The resulting report is added to the current model's user reports.
     :param left:        First graph. The calculated or "new" data. 
     :param right:       Second graph. The original or "existing" data.
+    :param listing:     List the quartets, with breakdowns by gene.
+                        This requires every quartet to be held in memory, so is only suitable for small graphs.
+    :param samples:     When set, the proportions are estimated from this many randomly sampled quartets,
+                        rather than being counted exactly.
+    :param processes:   When set, the quartets are counted by this many worker processes.
+                        `-1` uses one process per CPU.
+                        This requires that processes can be forked (i.e. it is not available on Windows).
     """
     model = global_view.current_model()
     
-    model.user_reports.append( compare_graphs( left, right ) )
+    with model_profile.profile( model, "Comparison" ):
+        model.user_reports.append( compare_graphs( left, right, listing = listing, samples = samples, processes = processes ) )
     
     return EChanges.INFORMATION
 
 
 def compare_graphs( calc_graph_: INamedGraph,
-                    orig_graph_: INamedGraph ) -> Report:
+                    orig_graph_: INamedGraph,
+                    listing: bool = False,
+                    samples: int = 0,
+                    processes: int = 0 ) -> Report:
     """
     Compares graphs using quartets.
     
+    By default the quartets are counted (see `quartets.count_quartets`) without being listed.
+    
     :param calc_graph_: The model graph. Data is `ILeaf` or `None`. 
     :param orig_graph_: The source graph. Data is `str`.
+    :param listing:     List the quartets, and break the results down by gene. 
+    :param samples:     Estimate the results from this many sampled quartets (see `quartets.sample_quartets`).
+                        Ignored if `listing` is set. 
+    :param processes:   Count the quartets using this many worker processes (see `quartets.count_quartets_in_parallel`).
+                        Ignored if `listing` or `samples` is set. 
     :return:  A `Report` object with an `TIniData` as its `raw_data`. 
     """
     differences = []
@@ -59,10 +78,6 @@ def compare_graphs( calc_graph_: INamedGraph,
                 string_helper.format_array( orig_genes - calc_genes, sort = True, format = lambda x: "{}:{}".format( type( x ).__name__, x ) ),
                 string_helper.format_array( calc_genes - orig_genes, sort = True, format = lambda x: "{}:{}".format( type( x ).__name__, x ) ) ) )
     
-    calc_quartets = __get_quartets_with_progress( calc_graph, "calculated" )
-    orig_quartets = __get_quartets_with_progress( orig_graph, "original" )
-    comparison: QuartetComparison = calc_quartets.compare( orig_quartets )
-    
     html = []
     ini_data: TIniData = { }
     
@@ -70,6 +85,35 @@ def compare_graphs( calc_graph_: INamedGraph,
     html.append( '<table border=1 style="border-collapse: collapse;">' )
     html.append( "<tr><td colspan=2><b>QUARTETS</b></td></tr>" )
     ini_data["quartets"] = q = { }
+    
+    if not listing:
+        if samples:
+            estimate = quartets.sample_quartets( calc_graph, orig_graph, lego_graph.is_sequence_node, samples = samples )
+            model_profile.count( "quartets evaluated", estimate.samples )
+            __add_row( html, q, "total_quartets", array_helper.get_num_combinations( calc_genes, 4 ) )
+            __add_row( html, q, "sampled_quartets", estimate.samples )
+            __add_row( html, q, "match_quartets", estimate.format( estimate.match ) )
+            __add_row( html, q, "mismatch_quartets", estimate.format( estimate.mismatch ) )
+        else:
+            if processes:
+                tally = quartets.count_quartets_in_parallel( calc_graph, orig_graph, lego_graph.is_sequence_node, processes = processes )
+            else:
+                tally = quartets.count_quartets( calc_graph, orig_graph, lego_graph.is_sequence_node )
+            
+            model_profile.count( "quartets evaluated", tally.match + tally.mismatch )
+            __add_row( html, q, "total_quartets", len( tally ) )
+            __add_row( html, q, "match_quartets", string_helper.percent( tally.match, len( tally ) ) )
+            __add_row( html, q, "mismatch_quartets", string_helper.percent( tally.mismatch, len( tally ) ) )
+            __add_row( html, q, "new_quartets", string_helper.percent( tally.missing_in_left, len( tally ) ) )
+            __add_row( html, q, "missing_quartets", string_helper.percent( tally.missing_in_right, len( tally ) ) )
+        
+        html.append( "</table><br/>" )
+        return __make_report( calc_graph_, orig_graph_, html, ini_data )
+    
+    calc_quartets = __get_quartets_with_progress( calc_graph, "calculated" )
+    orig_quartets = __get_quartets_with_progress( orig_graph, "original" )
+    comparison: QuartetComparison = calc_quartets.compare( orig_quartets )
+    
     __add_row( html, q, "total_quartets", len( comparison ) )
     __add_row( html, q, "match_quartets", string_helper.percent( len( comparison.match ), len( comparison.all ) ) )
     __add_row( html, q, "mismatch_quartets", string_helper.percent( len( comparison.mismatch ), len( comparison.all ) ) )
@@ -77,9 +121,10 @@ def compare_graphs( calc_graph_: INamedGraph,
     __add_row( html, q, "missing_quartets", string_helper.percent( len( comparison.missing_in_right ), len( comparison.all ) ) )
     
     # GENE COMBINATIONS
-    __enumerate_2genes( calc_genes, comparison, html, 1, ini_data )
-    __enumerate_2genes( calc_genes, comparison, html, 2, ini_data )
-    __enumerate_2genes( calc_genes, comparison, html, 3, ini_data )
+    index = __QuartetIndex( comparison )
+    __enumerate_2genes( calc_genes, index, html, 1, ini_data )
+    __enumerate_2genes( calc_genes, index, html, 2, ini_data )
+    __enumerate_2genes( calc_genes, index, html, 3, ini_data )
     
     c = calc_quartets.get_unsorted_lookup()
     o = orig_quartets.get_unsorted_lookup()
@@ -92,6 +137,10 @@ def compare_graphs( calc_graph_: INamedGraph,
     
     differences.append( "</body></html>" )
     
+    return __make_report( calc_graph_, orig_graph_, html, ini_data )
+
+
+def __make_report( calc_graph_: INamedGraph, orig_graph_: INamedGraph, html: List[str], ini_data: TIniData ) -> Report:
     report = Report( "{} -vs- {}".format( orig_graph_, calc_graph_ ), "\n".join( html ) )
     report.raw_data = ini_data
     return report
@@ -119,8 +168,63 @@ def __list_comp( comparison, name, html, calculated, original, ini: TIniData ):
     html.append( "</table><br/>" )
 
 
+class __QuartetIndex:
+    """
+    Indexes the quartets of a comparison by gene, so the quartets containing a combination of genes can be found
+    by intersecting the postings for each gene, rather than by searching every quartet.
+    
+    :ivar quartets:     All the quartets, in the order of `QuartetComparison.all`.
+    :ivar categories:   The category (`HIT`, `MISS`, `MISSING_IN_LEFT` or `MISSING_IN_RIGHT`) of each quartet.
+    :ivar postings:     For each gene, the indices of the quartets containing it.
+    """
+    HIT = 0
+    MISS = 1
+    MISSING_IN_LEFT = 2
+    MISSING_IN_RIGHT = 3
+    
+    
+    def __init__( self, comparison: QuartetComparison ):
+        categories: Dict[FrozenSet[object], int] = { }
+        
+        for collection, category in ((comparison.match, self.HIT),
+                                     (comparison.mismatch, self.MISS),
+                                     (comparison.missing_in_left, self.MISSING_IN_LEFT),
+                                     (comparison.missing_in_right, self.MISSING_IN_RIGHT)):
+            for quartet in collection:
+                categories.setdefault( quartet.nodes, category )
+        
+        self.quartets: List[AbstractQuartet] = []
+        self.categories: List[int] = []
+        self.postings: Dict[object, Set[int]] = defaultdict( set )
+        
+        for quartet in comparison.all:
+            assert isinstance( quartet, AbstractQuartet )
+            category = categories.get( quartet.nodes )
+            
+            if category is None:
+                raise SwitchError( "quartet(in)", quartet )
+            
+            for gene in quartet.get_unsorted_key():
+                self.postings[gene].add( len( self.quartets ) )
+            
+            self.quartets.append( quartet )
+            self.categories.append( category )
+    
+    
+    def find( self, genes: Iterable[object] ) -> List[int]:
+        """
+        Returns the indices of the quartets containing all of the `genes`, in order.
+        """
+        postings = sorted( (self.postings.get( gene, set() ) for gene in genes), key = len )
+        
+        if not postings:
+            return list( range( len( self.quartets ) ) )
+        
+        return sorted( postings[0].intersection( *postings[1:] ) )
+
+
 def __enumerate_2genes( calc_seq: Set[object],
-                        comparison: QuartetComparison,
+                        index: __QuartetIndex,
                         html: List[str],
                         n: int,
                         ini_data: TIniData
@@ -141,22 +245,12 @@ def __enumerate_2genes( calc_seq: Set[object],
         n_mil = []
         n_mir = []
         
-        for quartet in comparison.all:
-            assert isinstance( quartet, AbstractQuartet )
+        by_category = (n_hit, n_mis, n_mil, n_mir)
             
-            if all( x in quartet.get_unsorted_key() for x in comb ):
-                n_tot.append( quartet )
-                
-                if quartet in comparison.match:
-                    n_hit.append( quartet )
-                elif quartet in comparison.mismatch:
-                    n_mis.append( quartet )
-                elif quartet in comparison.missing_in_left:
-                    n_mil.append( quartet )
-                elif quartet in comparison.missing_in_right:
-                    n_mir.append( quartet )
-                else:
-                    raise SwitchError( "quartet(in)", quartet )
+        for i in index.find( comb ):
+            quartet = index.quartets[i]
+            n_tot.append( quartet )
+            by_category[index.categories[i]].append( quartet )
         
         if not n_mis and not n_mil and not n_mir:
             continue
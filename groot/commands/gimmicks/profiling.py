@@ -0,0 +1,209 @@
+"""
+Profiling of commands, see `profile_command`.
+"""
+import itertools
+import shlex
+import sys
+import threading
+import time
+from collections import defaultdict
+from os import path
+from typing import Dict, List, Optional, Tuple
+
+from intermake import Controller, pr
+from intermake.framework.console_parser import RX_ARG_TEXT, find_command
+from mhelper import TIniData, string_helper
+
+from groot import constants
+from groot.application import app
+from groot.constants import EChanges
+from groot.data import Report, global_view
+
+
+class _Recording:
+    """
+    A profile being recorded.
+    
+    The thread being profiled is measured by `cProfile`, which records the time spent in each function, and sampled
+    by a second thread, which records the call stacks (for flame graphs).
+    
+    :ivar name:         Name of the recording, usually the command profiled.
+    :ivar started:      Time the recording started (as `time.time`)
+    :ivar wall:         Time the recording took, in seconds, once stopped.
+    :ivar profiler:     The `cProfile` profiler.
+    :ivar stacks:       Number of times each call stack was sampled, in the collapsed stack format (`a;b;c`).
+    :ivar interval:     Interval between samples, in seconds.
+    """
+    
+    
+    def __init__( self, name: str, interval: float ):
+        import cProfile
+        
+        self.name = name
+        self.started = time.time()
+        self.wall: float = 0
+        self.profiler = cProfile.Profile()
+        self.stacks: Dict[str, int] = defaultdict( int )
+        self.interval = interval
+        self.__thread_id = threading.get_ident()
+        self.__stopping = threading.Event()
+        self.__sampler = threading.Thread( target = self.__sample, name = "groot-profile-sampler", daemon = True )
+    
+    
+    def start( self ) -> None:
+        self.profiler.enable()
+        self.__sampler.start()
+    
+    
+    def stop( self ) -> None:
+        self.profiler.disable()
+        self.__stopping.set()
+        self.__sampler.join()
+        self.wall = time.time() - self.started
+    
+    
+    def __sample( self ) -> None:
+        while not self.__stopping.wait( self.interval ):
+            frame = sys._current_frames().get( self.__thread_id )
+            names = []
+            
+            while frame is not None:
+                names.append( "{}:{}".format( path.basename( frame.f_code.co_filename ), frame.f_code.co_name ) )
+                frame = frame.f_back
+            
+            if names:
+                self.stacks[";".join( reversed( names ) )] += 1
+
+
+__active: Optional[_Recording] = None
+"""
+The recording left running by `profile_command`, if any.
+"""
+
+
+@app.command( names = ["profile", "profile_command"], folder = constants.F_EXTRA )
+def profile_command( command: Optional[str] = None, top: int = 25, interval: float = 0.005 ) -> EChanges:
+    """
+    Profiles a command, saving the results to the `sessions` folder and adding a summary to the model's user reports.
+    
+    Two files are saved:
+    * `<name>.pstats`: The time spent in each function, which can be viewed using `pstats`, `snakeviz`, etc.
+    * `<name>.collapsed`: The sampled call stacks, which can be viewed using `flamegraph.pl`, `speedscope`, etc.
+    
+    :param command:     Command to profile, along with its arguments, e.g. `"create_consensus cutoff=0.7"`.
+                        Quote the command so its arguments are not mistaken for those of `profile`.
+                        If not specified, profiling starts and remains on, profiling all the following commands (for
+                        instance a whole wizard run), until `profile` is called again, which stops profiling and
+                        saves the results.
+                        Only the thread that started profiling is profiled, so this mode is not suitable for the GUI,
+                        which runs each command in a new thread.
+    :param top:         Number of functions to list in the report.
+    :param interval:    Interval between the call stack samples, in seconds.
+    """
+    global __active
+    
+    if command is None:
+        if __active is None:
+            __active = _Recording( "session", interval )
+            __active.start()
+            pr.printx( "<verbose>Profiling started. Use <command>profile</command> again to stop.</verbose>" )
+            return EChanges.NONE
+        
+        recording = __active
+        __active = None
+        recording.stop()
+    else:
+        function, args, kwargs = __parse_command( command )
+        recording = _Recording( function.__name__, interval )
+        recording.start()
+        
+        try:
+            function( *args, **kwargs )
+        finally:
+            recording.stop()
+    
+    global_view.current_model().user_reports.append( __save( recording, top ) )
+    
+    return EChanges.MODEL_DATA
+
+
+def __parse_command( text: str ) -> Tuple[object, List[object], Dict[str, object]]:
+    """
+    Parses the command line `text` in the same manner as the CLI, obtaining the function and arguments to call.
+    """
+    arguments = shlex.split( text )
+    
+    if not arguments:
+        raise ValueError( "Cannot profile the command «{}» because no command has been specified.".format( text ) )
+    
+    command = find_command( arguments[0] )
+    coercers = Controller.ACTIVE.coercers
+    args = []
+    kwargs = { }
+    
+    for argument in arguments[1:]:
+        match = RX_ARG_TEXT.match( argument )
+        
+        if match is not None:
+            arg = string_helper.find( source = command.args, search = match.group( 1 ), namer = lambda x: [x.name], detail = "argument" )
+            kwargs[arg.name] = coercers.coerce( arg.annotation.value, string_helper.unescape( match.group( 2 ) ) )
+        else:
+            if kwargs or len( args ) == len( command.args ):
+                raise ValueError( "Cannot profile the command «{}» because the argument «{}» is not expected here.".format( text, argument ) )
+            
+            arg = command.args[len( args )]
+            args.append( coercers.coerce( arg.annotation.value, string_helper.unescape( argument ) ) )
+    
+    return command.function, args, kwargs
+
+
+def __save( recording: _Recording, top: int ) -> Report:
+    """
+    Saves the `recording` to the `sessions` folder and creates the report.
+    """
+    folder = Controller.ACTIVE.app.local_data.local_folder( "sessions" )
+    stem = path.join( folder, "profile-{}-{}".format( recording.name, time.strftime( "%Y%m%d-%H%M%S", time.localtime( recording.started ) ) ) )
+    file_name = stem
+    
+    # Also makes the report name unique
+    for index in itertools.count( 2 ):
+        if not path.exists( file_name + ".pstats" ) and not any( x.name == path.basename( file_name ) for x in global_view.current_model().user_reports ):
+            break
+        
+        file_name = "{}-{}".format( stem, index )
+    
+    stats_file_name = file_name + ".pstats"
+    stacks_file_name = file_name + ".collapsed"
+    
+    recording.profiler.dump_stats( stats_file_name )
+    
+    with open( stacks_file_name, "w" ) as file:
+        for stack, count in sorted( recording.stacks.items() ):
+            file.write( "{} {}\n".format( stack, count ) )
+    
+    import pstats
+    
+    stats = pstats.Stats( recording.profiler )
+    functions = sorted( stats.stats.items(), key = lambda x: x[1][3], reverse = True )[:top]
+    ini_data: TIniData = { "profile": { "command"  : recording.name,
+                                        "wall"     : recording.wall,
+                                        "samples"  : sum( recording.stacks.values() ),
+                                        "pstats"   : stats_file_name,
+                                        "collapsed": stacks_file_name } }
+    
+    html = []
+    html.append( "<html><body>" )
+    html.append( "<h1>Profile of {}</h1>".format( recording.name ) )
+    html.append( "<p>{:.3f}s wall, {} samples.<br/>Statistics saved to <code>{}</code>, call stacks saved to <code>{}</code>.</p>".format( recording.wall, sum( recording.stacks.values() ), stats_file_name, stacks_file_name ) )
+    html.append( '<table border=1 style="border-collapse: collapse;">' )
+    html.append( "<tr><td><b>FUNCTION</b></td><td><b>CALLS</b></td><td><b>TOTAL</b></td><td><b>CUMULATIVE</b></td></tr>" )
+    
+    for (file, line, name), (_, num_calls, total, cumulative, _) in functions:
+        html.append( "<tr><td>{}:{}({})</td><td>{}</td><td>{:.3f}s</td><td>{:.3f}s</td></tr>".format( path.basename( file ), line, name, num_calls, total, cumulative ) )
+    
+    html.append( "</table>" )
+    html.append( "</body></html>" )
+    
+    pr.printx( "<verbose>Profile saved to <file>{}</file>.</verbose>".format( file_name ) )
+    
+    return Report( path.basename( file_name ), "\n".join( html ), ini_data )
@@ -0,0 +1,150 @@
+import inspect
+from collections import defaultdict
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from intermake import pr
+from mhelper import string_helper
+
+from groot import constants
+from groot.application import app
+from groot.commands import workflow
+from groot.constants import STAGES, EChanges, Stage
+from groot.data import Model, global_view
+from groot.utilities import AbstractAlgorithm
+
+
+__COMMANDS: Dict[Stage, Tuple[Callable, Callable]] = {
+    STAGES.MAJOR_4      : (workflow.s040_major.create_major, workflow.s040_major.drop_major),
+    STAGES.MINOR_5      : (workflow.s050_minor.create_minor, workflow.s050_minor.drop_minor),
+    STAGES.DOMAINS_6    : (workflow.s060_userdomains.create_domains, workflow.s060_userdomains.drop_domains),
+    STAGES.ALIGNMENTS_7 : (workflow.s070_alignment.create_alignments, workflow.s070_alignment.drop_alignment),
+    STAGES.TREES_8      : (workflow.s080_tree.create_trees, workflow.s080_tree.drop_trees),
+    STAGES.FUSIONS_9    : (workflow.s090_fusion_events.create_fusions, workflow.s090_fusion_events.drop_fusions),
+    STAGES.SPLITS_10    : (workflow.s100_splits.create_splits, workflow.s100_splits.drop_splits),
+    STAGES.CONSENSUS_11 : (workflow.s110_consensus.create_consensus, workflow.s110_consensus.drop_consensus),
+    STAGES.SUBSETS_12   : (workflow.s120_subsets.create_subsets, workflow.s120_subsets.drop_subsets),
+    STAGES.PREGRAPHS_13 : (workflow.s130_pregraphs.create_pregraphs, workflow.s130_pregraphs.drop_pregraphs),
+    STAGES.SUPERTREES_14: (workflow.s140_supertrees.create_supertrees, workflow.s140_supertrees.drop_supertrees),
+    STAGES.FUSE_15      : (workflow.s150_fuse.create_fused, workflow.s150_fuse.drop_fused),
+    STAGES.CLEAN_16     : (workflow.s160_clean.create_cleaned, workflow.s160_clean.drop_cleaned),
+    STAGES.CHECKED_17   : (workflow.s170_checked.create_checked, workflow.s170_checked.drop_checked),
+}
+"""
+The `create_*` and `drop_*` commands of the stages that `refresh` can recreate.
+"""
+
+
+@app.command( folder = constants.F_CREATE )
+def refresh( parameters: Optional[List[str]] = None, query: bool = False ) -> EChanges:
+    """
+    Recreates the stages whose inputs have changed since they were created.
+    
+    When a stage is created, the parameters used and a fingerprint of the stage's inputs (the parameters and the
+    fingerprints of the preceding stages) are recorded. This command recreates the stages whose fingerprints no
+    longer match, along with the stages that follow them, using the recorded parameters.
+    Stages that are still current are not recreated.
+    
+    :param parameters:  Parameters to change, each in the form `stage.parameter=value`.
+                        The stage and those following it are recreated using the new value.
+                        For instance `consensus.cutoff=0.7` recreates the consensus and the subsequent stages, but
+                        not the trees and fusions that the consensus was created from.
+    :param query:       Only list the stages that would be recreated.
+    """
+    model = global_view.current_model()
+    changes = __read_parameters( parameters or () )
+    stale = __find_stale_stages( model, changes )
+    
+    if not stale:
+        pr.printx( "<verbose>All stages are current, there is nothing to refresh.</verbose>" )
+        return EChanges.NONE
+    
+    if query:
+        for stage in stale:
+            print( "{} ({})".format( stage, "parameters changed" if stage in changes else "inputs changed" if not model.get_status( stage ).is_current else "follows a refreshed stage" ) )
+        
+        return EChanges.INFORMATION
+    
+    # Each stage must be dropped before those it requires
+    for stage in reversed( stale ):
+        __COMMANDS[stage][1]()
+    
+    for stage in pr.pr_iterate( stale, "Refreshing stages" ):
+        arguments = dict( model.get_status( stage ).parameters )
+        arguments.update( changes.get( stage, { } ) )
+        __COMMANDS[stage][0]( **arguments )
+    
+    pr.printx( "<verbose>{} stages refreshed: {}.</verbose>".format( len( stale ), string_helper.format_array( stale ) ) )
+    
+    return EChanges.MODEL_DATA
+
+
+def __find_stale_stages( model: Model, changes: Dict[Stage, Dict[str, object]] ) -> List[Stage]:
+    """
+    Finds the stages which need to be recreated, in the order they should be recreated.
+    
+    :param model:       Model
+    :param changes:     Parameter changes
+    :return:            The stages whose fingerprints have changed, or whose parameters are being changed, together
+                        with any stages that require them.
+    :except ValueError: A stage needs to be recreated, but cannot be.
+    """
+    stale = []
+    
+    for stage in STAGES:
+        status = model.get_status( stage )
+        
+        if not status.is_partial:
+            if stage in changes:
+                raise ValueError( "Cannot change the parameters of «{}» because this stage has not been created.".format( stage ) )
+            
+            continue
+        
+        if stage not in changes and status.is_current and not any( requisite in stale for requisite in stage.requires ):
+            continue
+        
+        if stage not in __COMMANDS or status.parameters is None:
+            raise ValueError( "Cannot refresh «{}» because this stage was not created using its `create` command, so I don't know how to recreate it. Perhaps you meant to drop and recreate it yourself?".format( stage ) )
+        
+        stale.append( stage )
+    
+    return stale
+
+
+def __read_parameters( parameters: Iterable[str] ) -> Dict[Stage, Dict[str, object]]:
+    """
+    Reads the `stage.parameter=value` pairs passed to `refresh`.
+    """
+    r = defaultdict( dict )
+    
+    for text in parameters:
+        name, equals, value = text.partition( "=" )
+        stage_name, dot, parameter_name = name.strip().partition( "." )
+        
+        if not equals or not dot:
+            raise ValueError( "Cannot read the parameter «{}» because it is not in the form `stage.parameter=value`.".format( text ) )
+        
+        stage = next( (x for x in __COMMANDS if x.name.lower() == stage_name.lower()), None )
+        
+        if stage is None:
+            raise ValueError( "Cannot read the parameter «{}» because there is no stage named «{}» that can be refreshed. Your options appear to be as follows: «{}».".format( text, stage_name, string_helper.format_array( __COMMANDS ) ) )
+        
+        signature = inspect.signature( __COMMANDS[stage][0] )
+        parameter = signature.parameters.get( parameter_name )
+        
+        if parameter is None:
+            raise ValueError( "Cannot read the parameter «{}» because «{}» has no parameter named «{}». Your options appear to be as follows: «{}».".format( text, stage, parameter_name, string_helper.format_array( signature.parameters ) ) )
+        
+        r[stage][parameter_name] = __read_value( parameter.annotation, value.strip() )
+    
+    return r
+
+
+def __read_value( annotation: object, text: str ) -> object:
+    if isinstance( annotation, type ) and issubclass( annotation, AbstractAlgorithm ):
+        return annotation.get_owner().get_algorithm( text )
+    elif annotation is bool:
+        return string_helper.to_bool( text )
+    elif annotation in (int, float, str):
+        return annotation( text )
+    else:
+        raise ValueError( "Cannot read a value of type «{}».".format( annotation ) )
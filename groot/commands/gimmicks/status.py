@@ -4,6 +4,7 @@ from intermake import pr
 from groot.application import app
 from groot.constants import STAGES, EChanges
 from groot.data import global_view
+from mhelper import string_helper
 
 
 
@@ -27,7 +28,9 @@ def print_status() -> EChanges:
             r.append( "<tr>" )
             r.append( "<td>{}</td>".format( ("{}. {}:".format( stage.index, stage.name )).ljust( 20 ) ) )
             
-            if status.is_complete:
+            if status.is_complete and not status.is_current:
+                r.append( "<td><neutral>{}</neutral> - Out of date, consider running <command>refresh</command></td>".format( status ) )
+            elif status.is_complete:
                 r.append( "<td><positive>{}</positive></td>".format( status ) )
             else:
                 if status.is_hot:
@@ -49,3 +52,61 @@ def print_status() -> EChanges:
         pr.printx( "".join( r ) )
     
     return EChanges.INFORMATION
+
+
+@app.command( names = ["print_profile", "stage_profile"], folder = constants.F_PRINT )
+def print_profile() -> EChanges:
+    """
+    Prints the time and memory taken to create each stage, as measured when the stage was last created.
+    
+    Peak memory is that of the Groot process, so it only increases.
+    The memory allocated (`traced`) is only shown if `tracemalloc` was started before the stages were created
+    (e.g. `python -X tracemalloc -m groot`).
+    """
+    model = global_view.current_model()
+    profiles = model.stage_profiles
+    names = [stage.name for stage in STAGES if stage.name in profiles]
+    names.extend( sorted( name for name in profiles if name not in names ) )
+    
+    if not names:
+        pr.printx( "<verbose>No stages have been profiled. Stages are profiled when created.</verbose>" )
+        return EChanges.INFORMATION
+    
+    # Nested profiles are already included in the profile that encloses them
+    total = sum( profiles[name].wall for name in names if profiles[name].within is None )
+    
+    with pr.pr_section( model.name ):
+        r = []
+        r.append( "<table>" )
+        r.append( "<tr><td>Stage</td><td>Wall</td><td>CPU</td><td>%</td><td>Peak RSS</td><td>RSS growth</td><td>Traced</td><td>Counters</td></tr>" )
+        
+        for name in names:
+            profile = profiles[name]
+            
+            r.append( "<tr>" )
+            r.append( "<td>{}</td>".format( name if profile.within is None else "  {} (in {})".format( name, profile.within ) ) )
+            r.append( "<td>{:.3f}s</td>".format( profile.wall ) )
+            r.append( "<td>{:.3f}s</td>".format( profile.cpu ) )
+            r.append( "<td>{:.1f}%</td>".format( profile.wall * 100 / total if total else 0 ) )
+            r.append( "<td>{}</td>".format( __format_size( profile.peak_rss ) ) )
+            r.append( "<td>{}</td>".format( __format_size( profile.rss_growth ) ) )
+            r.append( "<td>{}</td>".format( __format_size( profile.traced ) ) )
+            r.append( "<td>{}</td>".format( ", ".join( "{} = {:g}".format( key, value ) for key, value in sorted( profile.counters.items() ) ) ) )
+            r.append( "</tr>" )
+        
+        r.append( "</table>" )
+        
+        pr.printx( "".join( r ) )
+        pr.printx( "<verbose>Total: {:.3f}s</verbose>".format( total ) )
+    
+    return EChanges.INFORMATION
+
+
+def __format_size( size ) -> str:
+    if size is None:
+        return "-"
+    
+    if size < 0:
+        return "-" + string_helper.format_size( -size )
+    
+    return string_helper.format_size( size )
@@ -1,14 +1,15 @@
 from warnings import warn
 
 from intermake import Command, Theme, commands, visibilities, BasicCommand, pr
-from mhelper import EFileMode, isFilename, MFlags, file_helper, ManagedWith
-from typing import List, Optional, cast, Set
+from mhelper import EFileMode, isFilename, MFlags, file_helper, ManagedWith, string_helper
+from typing import Dict, Iterable, List, Optional, cast, Set
 
 from groot import constants
 from groot.application import app
 from groot.commands import workflow
 from groot.constants import EFormat, Stage, STAGES, EChanges
 from groot.data import global_view
+from groot.data.model_journal import ModelJournal
 
 
 
@@ -31,8 +32,9 @@ class Wizard:
     SERIALISABLE
     
     Manages the guided wizard.
+    
+    Each model has its own active wizard (see `ModelHandle.wizard`).
     """
-    __active_walkthrough: "Wizard" = None
     
     
     def __init__( self,
@@ -46,7 +48,8 @@ class Wizard:
                   view: bool,
                   save: bool,
                   outgroups: List[str],
-                  supertree: str ):
+                  supertree: str,
+                  pipeline: bool = False ):
         """
         CONSTRUCTOR.
         
@@ -68,6 +71,8 @@ class Wizard:
         self.__result = EChanges.NONE
         self.pause_reason = "start"
         self.outgroups = outgroups
+        self.pipeline = pipeline
+        self.__journal: ModelJournal = None
         
         if self.save and not self.name:
             raise ValueError( "Wizard parameter `save` specified but `name` is not set." )
@@ -91,6 +96,7 @@ class Wizard:
         r.append( "outgroups         = {}".format( self.outgroups ) )
         r.append( "save              = {}".format( self.save ) )
         r.append( "supertree         = {}".format( self.supertree ) )
+        r.append( "pipeline          = {}".format( self.pipeline ) )
         
         return "\n".join( r )
     
@@ -124,7 +130,7 @@ class Wizard:
     
     
     def stop( self ):
-        Wizard.__active_walkthrough = None
+        global_view.current_handle().wizard = None
         pr.pr_verbose( "The active wizard has been deleted." )
     
     
@@ -142,9 +148,10 @@ class Wizard:
         self.__result = EChanges.NONE
         
         while not self.is_paused and self.__stage < len( self.__stages ):
-            self.__stages[self.__stage]( self )
+            fn = self.__stages[self.__stage]
+            fn( self )
             self.__stage += 1
-            self.__save_model()
+            self.__save_model( self.__checkpoints.get( fn, () ) )
         
         if self.__stage == len( self.__stages ):
             pr.pr_verbose( "The wizard is complete." )
@@ -236,22 +243,33 @@ class Wizard:
     
     def __fn6_make_trees( self ):
         with self.__start_line( STAGES.TREES_8 ):
-            model = global_view.current_model()
-            ogs = [model.genes[x] for x in self.outgroups]
-            
-            self.__result |= workflow.s055_outgroups.set_outgroups( ogs )
-            
-            algo = workflow.s080_tree.tree_algorithms.get_algorithm( self.tree )
-            self.__result |= workflow.s080_tree.create_trees( algo )
+            if not self.pipeline:
+                self.__set_outgroups()
+                algo = workflow.s080_tree.tree_algorithms.get_algorithm( self.tree )
+                self.__result |= workflow.s080_tree.create_trees( algo )
         
         if STAGES.TREES_8 in self.pauses:
             self.__pause( STAGES.TREES_8, (workflow.s080_tree.print_trees,) )
     
     
+    def __set_outgroups( self ):
+        model = global_view.current_model()
+        ogs = [model.genes[x] for x in self.outgroups]
+        
+        self.__result |= workflow.s055_outgroups.set_outgroups( ogs )
+    
+    
     def __fn5_make_alignments( self ):
         with self.__start_line( STAGES.ALIGNMENTS_7 ):
             algo = workflow.s070_alignment.alignment_algorithms.get_algorithm( self.alignment )
-            self.__result |= workflow.s070_alignment.create_alignments( algo )
+            
+            if self.pipeline:
+                # The trees are created along with the alignments, so the outgroups must be set first
+                self.__set_outgroups()
+                tree_algo = workflow.s080_tree.tree_algorithms.get_algorithm( self.tree )
+                self.__result |= workflow.s080_tree.create_alignments_and_trees( algo, tree_algo )
+            else:
+                self.__result |= workflow.s070_alignment.create_alignments( algo )
         
         if STAGES.ALIGNMENTS_7 in self.pauses:
             self.__pause( STAGES.ALIGNMENTS_7, (workflow.s070_alignment.print_alignments,) )
@@ -288,10 +306,64 @@ class Wizard:
             self.__pause( STAGES.SEQ_AND_SIM_ps, (workflow.s020_sequences.print_genes,) )
     
     
-    def __save_model( self ):
-        if self.save:
-            with self.__start_line( STAGES._FILE_0 ):
+    def __save_model( self, stages: Iterable[Stage] ) -> None:
+        """
+        Saves the model after a stage of the wizard.
+        
+        Rather than writing the whole model each time, the data created by the `stages` is added to a journal (see
+        `ModelJournal`), along with the state of the wizard, so the wizard can be resumed (see `resume_wizard`).
+        When the wizard completes, the model is saved and the journal deleted.
+        """
+        if not self.save:
+            return
+        
+        with self.__start_line( STAGES.FILE_1 ):
+            model = global_view.current_model()
+            
+            if self.__stage == len( self.__stages ):
                 self.__result |= workflow.s010_file.file_save( self.name )
+                file_helper.delete_file( workflow.s010_file._get_journal_name( self.name ) )
+                self.__journal = None
+            elif self.__journal is None:
+                self.__journal = ModelJournal.create( workflow.s010_file._get_journal_name( self.name ), model, self.__get_checkpoint() )
+            else:
+                size = self.__journal.append( model, stages, self.__get_checkpoint() )
+                pr.printx( "<verbose>Journal record {} of {}.</verbose>".format( self.__journal.num_records, string_helper.format_size( size ) ) )
+    
+    
+    def __get_checkpoint( self ) -> Dict[str, object]:
+        """
+        Returns the state of the wizard, for the journal.
+        """
+        r = dict( vars( self ) )
+        del r["_Wizard__journal"]
+        return r
+    
+    
+    @staticmethod
+    def resume( file_name: str ) -> "Wizard":
+        """
+        Restores the model and the wizard from the journal written by a wizard with `save` set.
+        The wizard resumes after the last stage recorded in the journal and continues to append to the same journal.
+        
+        :param file_name:   Journal file
+        :return:            The wizard, paused. The restored model is made the current model.
+        """
+        journal, model, checkpoint = ModelJournal.open( file_name )
+        
+        if not isinstance( checkpoint, dict ) or "_Wizard__stage" not in checkpoint:
+            raise ValueError( "Cannot resume the wizard from «{}» because this journal was not written by the wizard.".format( file_name ) )
+        
+        wizard = Wizard.__new__( Wizard )
+        vars( wizard ).update( checkpoint )
+        wizard.__journal = journal
+        wizard.is_paused = True
+        wizard.pause_reason = "resume"
+        
+        model.file_name = file_helper.replace_extension( file_name, constants.EXT_MODEL )
+        global_view.set_model( model )
+        
+        return wizard
     
     
     def __fn1_new_model( self ):
@@ -306,7 +378,7 @@ class Wizard:
         Sets this `Wizard` object as the active (currently running) wizard.
         This is called by the `create_wizard` command after constructing the wizard.
         """
-        Wizard.__active_walkthrough = self
+        global_view.current_handle().wizard = self
         pr.pr_verbose( "{}".format( str( self ) ) )
         pr.pr_verbose( "The wizard has been activated and is paused. Use the {}{}{} function to begin.".format(
                 Theme.COMMAND_NAME,
@@ -317,9 +389,9 @@ class Wizard:
     @staticmethod
     def get_active() -> Optional["Wizard"]:
         """
-        Gets the active `Wizard` object (which may be `None`).
+        Gets the active `Wizard` object of the current model (which may be `None`).
         """
-        return Wizard.__active_walkthrough
+        return global_view.current_handle().wizard
     
     
     __stages = [__fn1_new_model,
@@ -340,6 +412,26 @@ class Wizard:
                 __fn15_make_checks,
                 __fn16_view_nrfg]
 
+    __checkpoints = { __fn3_import_data     : (STAGES.SEQ_AND_SIM_ps,),
+                      __fn4_make_major      : (STAGES.MAJOR_4,),
+                      __fn4_make_minor      : (STAGES.MINOR_5,),
+                      __fn4b_make_domains   : (STAGES.DOMAINS_6,),
+                      __fn5_make_alignments : (STAGES.ALIGNMENTS_7, STAGES.OUTGROUPS_7b, STAGES.TREES_8),
+                      __fn6_make_trees      : (STAGES.OUTGROUPS_7b, STAGES.TREES_8),
+                      __fn7_make_fusions    : (STAGES.FUSIONS_9,),
+                      __fn8_make_splits     : (STAGES.SPLITS_10,),
+                      __fn9_make_consensus  : (STAGES.CONSENSUS_11,),
+                      __fn10_make_subsets   : (STAGES.SUBSETS_12,),
+                      __fn11_make_pregraphs : (STAGES.PREGRAPHS_13,),
+                      __fn12_make_subgraphs : (STAGES.SUPERTREES_14,),
+                      __fn13_make_fused     : (STAGES.FUSE_15,),
+                      __fn14_make_clean     : (STAGES.CLEAN_16,),
+                      __fn15_make_checks    : (STAGES.CHECKED_17,) }
+    """
+    The stages whose data is written to the journal after each step of the wizard (see `__save_model`).
+    The alignment step lists the trees because these are created together when `pipeline` is set.
+    """
+
 
 @app.command( folder = constants.F_CREATE )
 def create_wizard( new: Optional[bool] = None,
@@ -352,7 +444,8 @@ def create_wizard( new: Optional[bool] = None,
                    tree: Optional[str] = None,
                    view: Optional[bool] = None,
                    save: Optional[bool] = None,
-                   pause: str = None ) -> None:
+                   pause: str = None,
+                   pipeline: bool = False ) -> None:
     """
     Sets up a workflow that you can activate in one go.
     
@@ -383,9 +476,14 @@ def create_wizard( new: Optional[bool] = None,
     :param view:                View the final NRFG in Vis.js?
                                 :values:`true→yes, false→no, none→ask` 
     :param save:                Save file to disk? (requires `name`)
+                                The model is journaled after each stage, so an interrupted wizard can be resumed
+                                using `resume_wizard`.
                                 :values:`true→yes, false→no, none→ask` 
     :param pause:               Pause after stage default value.
                                 :values:`none→ask`
+    :param pipeline:            Create each component's tree as soon as its alignment is ready, using one process
+                                per CPU (see `create_alignments_and_trees`)?
+                                If the wizard pauses after the alignments, the trees will have been created too.
     """
     if new is None:
         x = pr.pr_question( "Are you starting a new model, or do you want to continue with your current data?", ["new", "continue"] )
@@ -493,7 +591,8 @@ def create_wizard( new: Optional[bool] = None,
                           view = view,
                           save = save,
                           outgroups = outgroups,
-                          supertree = supertree )
+                          supertree = supertree,
+                          pipeline = pipeline )
     
     walkthrough.make_active()
     pr.pr_verbose( "The wizard has been created paused.\nYou can use the {} and {} commands to manage your wizard.".format( continue_wizard, drop_wizard ) )
@@ -512,6 +611,26 @@ def continue_wizard() -> EChanges:
     return Wizard.get_active().step()
 
 
+@app.command( visibility = visibilities.ADVANCED, folder = constants.F_EXTRA )
+def resume_wizard( name: str ) -> EChanges:
+    """
+    Resumes a wizard that did not complete, such as one that was interrupted.
+    
+    This only applies to wizards created with the `save` option set, which journal the model after each stage.
+    The model is restored to the last stage recorded, and the wizard is made active, paused.
+    Use the `continue_wizard` command to continue the wizard from that point.
+    
+    :param name:    Name of the model, as passed to `create_wizard`, or the path to the journal.
+    """
+    file_name = name if file_helper.get_extension( name ) == constants.EXT_JOURNAL else workflow.s010_file._get_journal_name( name )
+    
+    wizard = Wizard.resume( file_name )
+    wizard.make_active()
+    pr.pr_verbose( "The wizard will resume at «{}».".format( wizard.get_stage_name() ) )
+    
+    return EChanges.MODEL_OBJECT
+
+
 @app.command( visibility = visibilities.ADVANCED, names = ["stop"], folder = constants.F_DROP )
 def drop_wizard() -> EChanges:
     """
@@ -594,7 +713,7 @@ def import_file( file_name: isFilename[EFileMode.READ],
                 return EChanges.INFORMATION
     
     if filter.MODEL:
-        if ext == constants.EXT_MODEL:
+        if ext in (constants.EXT_MODEL, constants.EXT_JOURNAL):
             if not query:
                 return workflow.s010_file.file_load( file_name )
             else:
@@ -9,6 +9,8 @@ from groot import constants
 from groot.commands.gimmicks import wizard
 from groot.data import global_view, config, sample_data
 from groot.data.model import Model
+from groot.data.model_journal import ModelJournal
+from groot.data import model_sections
 from groot.constants import EChanges
 from groot.application import app
 
@@ -24,6 +26,37 @@ def file_new() -> EChanges:
     return EChanges.MODEL_OBJECT
 
 
+@app.command( names = ["file_switch", "switch"], folder = constants.F_FILE )
+def file_switch( name: Optional[str] = None, close: bool = False ) -> EChanges:
+    """
+    Lists the open models, or switches to another model.
+    
+    Groot can hold several models at once, each with its own name. The model that Groot starts with is called
+    `default`. From Python, a model can also be used without switching to it, see `groot.use_model`.
+    
+    :param name:    Name of the model to switch to. A new model is created if there is no model with this name.
+                    If not specified the open models are listed.
+    :param close:   Closes the model instead of switching to it. The current model cannot be closed.
+    """
+    if not name:
+        current = global_view.current_handle()
+        
+        for handle in global_view.list_models():
+            pr.printx( "{} {}".format( "*" if handle is current else " ", handle ) )
+        
+        return EChanges.INFORMATION
+    
+    if close:
+        global_view.close_model( name )
+        pr.printx( "<verbose>Closed model «{}».</verbose>".format( name ) )
+        return EChanges.NONE
+    
+    global_view.select_model( name )
+    pr.printx( "<verbose>Switched to model «{}».</verbose>".format( name ) )
+    
+    return EChanges.MODEL_OBJECT
+
+
 @app.command( names = ["file_save", "save"], folder = constants.F_FILE )
 def file_save( file_name: isOptional[isFilename[EFileMode.WRITE, constants.EXT_MODEL]] = None ) -> EChanges:
     """
@@ -47,7 +80,7 @@ def file_save( file_name: isOptional[isFilename[EFileMode.WRITE, constants.EXT_M
     
     with pr.pr_action( "Saving file to «{}»".format( file_name ) ):
         model.file_name = file_name
-        io_helper.save_binary( file_name, model )
+        model_sections.save_model( file_name, model )
     
     model.file_name = file_name
     pr.printx( "<verbose>Saved model to <file>{}</file></verbose>", file_name )
@@ -72,7 +105,11 @@ def file_load( file_name: isFilename[EFileMode.READ] ) -> EChanges:
     """
     Loads the model from a file
     
+    Only the summary of the model is read, the data for each stage is read when it is first required.
+    
     :param file_name:   File to load.
+                        This may also be a journal (`constants.EXT_JOURNAL`), such as that left by a wizard which
+                        did not complete.
                         If you don't specify a path, the following folders are attempted (in order):
                         * The current working directory
                         * `$(DATA_FOLDER)sessions`
@@ -84,11 +121,22 @@ def file_load( file_name: isFilename[EFileMode.READ] ) -> EChanges:
         file_name = __fix_path( file_name )
     
     try:
-        model: Model = io_helper.load_binary( file_name, type_ = Model )
+        if file_helper.get_extension( file_name ) == constants.EXT_JOURNAL:
+            model, _ = ModelJournal.load( file_name )
+        elif model_sections.is_sectioned( file_name ):
+            # Only the header and model are read, the data is read when it is first used
+            model = model_sections.load_model( file_name )
+        else:
+            # Models saved by older versions of Groot
+            model: Model = io_helper.load_binary( file_name, type_ = Model )
     except Exception as ex:
         raise ValueError( "Failed to load the model «{}». Either this is not a Groot model or this model was saved using a different version of Groot.".format( file_name ) ) from ex
     
-    model.file_name = file_name
+    if file_helper.get_extension( file_name ) == constants.EXT_JOURNAL:
+        # Saving writes the whole model, which doesn't go in the journal
+        model.file_name = file_helper.replace_extension( file_name, constants.EXT_MODEL )
+    else:
+        model.file_name = file_name
     
     global_view.set_model( model )
     config.remember_file( file_name )
@@ -168,3 +216,10 @@ def __fix_path( file_name: str ) -> str:
         file_name += constants.EXT_MODEL
     
     return file_name
+
+
+def _get_journal_name( file_name: str ) -> str:
+    """
+    Returns the journal (see `ModelJournal`) that accompanies the model file `file_name`.
+    """
+    return file_helper.replace_extension( __fix_path( file_name ), constants.EXT_JOURNAL )
@@ -31,35 +31,37 @@ def import_genes( file_name: str ) -> EChanges:
     :param file_name:   File to import
     """
     model = global_view.current_model()
-    model.get_status( STAGES.SEQUENCES_2 ).assert_import()
     
-    model.user_comments.append( "IMPORT_FASTA \"{}\"".format( file_name ) )
-    
-    with LOG( "IMPORT FASTA FROM '{}'".format( file_name ) ):
-        obtain_only = model._has_data()
-        num_updates = 0
-        idle = 0
-        idle_counter = 10000
+    with model.get_status( STAGES.SEQUENCES_2 ).profile():
+        model.get_status( STAGES.SEQUENCES_2 ).assert_import()
+        
+        model.user_comments.append( "IMPORT_FASTA \"{}\"".format( file_name ) )
         
-        for name, sequence_data in bio_helper.parse_fasta( file = file_name ):
-            sequence = _make_gene( model, str( name ), obtain_only, len( sequence_data ), True )
+        with LOG( "IMPORT FASTA FROM '{}'".format( file_name ) ):
+            obtain_only = model._has_data()
+            num_updates = 0
+            idle = 0
+            idle_counter = 10000
             
-            if sequence:
-                LOG( "FASTA UPDATES {} WITH ARRAY OF LENGTH {}".format( sequence, len( sequence_data ) ) )
-                num_updates += 1
-                sequence.site_array = str( sequence_data )
-                idle = 0
-            else:
-                idle += 1
+            for name, sequence_data in bio_helper.parse_fasta( file = file_name ):
+                sequence = _make_gene( model, str( name ), obtain_only, len( sequence_data ), True )
                 
-                if idle == idle_counter:
-                    LOG( "THIS FASTA IS BORING..." )
-                    idle_counter *= 2
+                if sequence:
+                    LOG( "FASTA UPDATES {} WITH ARRAY OF LENGTH {}".format( sequence, len( sequence_data ) ) )
+                    num_updates += 1
+                    sequence.site_array = str( sequence_data )
                     idle = 0
-    
-    pr.printx( "<verbose>Imported Fasta from <file>{}</file>.</verbose>", file_name ) 
-    
-    return EChanges.MODEL_ENTITIES
+                else:
+                    idle += 1
+                    
+                    if idle == idle_counter:
+                        LOG( "THIS FASTA IS BORING..." )
+                        idle_counter *= 2
+                        idle = 0
+        
+        pr.printx( "<verbose>Imported Fasta from <file>{}</file>.</verbose>", file_name ) 
+        
+        return EChanges.MODEL_ENTITIES
 
 
 _T = isFilename["r", ".csv"]
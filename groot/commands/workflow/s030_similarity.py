@@ -45,14 +45,16 @@ def create_similarities( algorithm: similarity_algorithms.Algorithm, evalue: flo
     :param length:      length cutoff.
     """
     model: Model = global_view.current_model()
-    model.get_status( STAGES.SIMILARITIES_3 ).assert_create()
     
-    input = model.genes.to_fasta()
-    
-    output = external_runner.run_in_temporary( algorithm, input )
-    output = output.split( "\n" )
-    
-    __import_blast_format_6( evalue, output, "algorithm_output({})".format( algorithm ), length, model, True )
+    with model.get_status( STAGES.SIMILARITIES_3 ).profile():
+        model.get_status( STAGES.SIMILARITIES_3 ).assert_create()
+        
+        input = model.genes.to_fasta()
+        
+        output = external_runner.run_in_temporary( algorithm, input )
+        output = output.split( "\n" )
+        
+        __import_blast_format_6( evalue, output, "algorithm_output({})".format( algorithm ), length, model, True )
 
 
 @app.command( folder = constants.F_SET )
@@ -82,15 +84,17 @@ def import_similarities( file_name: isFilename[EFileMode.READ, EXT_BLAST], evalu
     :return: 
     """
     model: Model = global_view.current_model()
-    model.get_status( STAGES.SIMILARITIES_3 ).assert_create()
-    
-    obtain_only = model._has_data()
     
-    with LOG:
-        with open( file_name, "r" ) as file:
-            __import_blast_format_6( evalue, file.readlines(), file_name, length, model, obtain_only )
-    
-    return EChanges.MODEL_ENTITIES
+    with model.get_status( STAGES.SIMILARITIES_3 ).profile():
+        model.get_status( STAGES.SIMILARITIES_3 ).assert_create()
+        
+        obtain_only = model._has_data()
+        
+        with LOG:
+            with open( file_name, "r" ) as file:
+                __import_blast_format_6( evalue, file.readlines(), file_name, length, model, obtain_only )
+        
+        return EChanges.MODEL_ENTITIES
 
 
 @app.command( folder = constants.F_DROP )
@@ -12,7 +12,7 @@ import warnings
 from groot.application import app
 from groot import constants
 from groot.constants import EChanges, STAGES
-from groot.data import Component, Edge, Gene, global_view
+from groot.data import Component, Edge, Gene, global_view, model_profile
 
 LOG_MAJOR = Logger( "comp.major", False )
 LOG_MAJOR_V = Logger( "comp.major.v", False )
@@ -42,93 +42,98 @@ def create_major( tol: int = 0, debug: bool = False ) -> EChanges:
     :returns:           Nothing, the components are written to :ivar:`model.components`.
     """
     model = global_view.current_model()
-    model.get_status( STAGES.MAJOR_4 ).assert_create()
     
-    model.components.clear()
-    
-    # Find connected components
-    components = ComponentFinder()
-    
-    # Basic assertions
-    LOG_MAJOR( "There are {} sequences.", len( model.genes ) )
-    missing_edges = []
-    
-    for sequence in model.genes:
-        edges = model.edges.find_gene( sequence )
+    with model.get_status( STAGES.MAJOR_4 ).profile():
+        model.get_status( STAGES.MAJOR_4 ).assert_create()
         
-        if not edges:
-            missing_edges.append( sequence )
-    
-    if missing_edges:
-        raise ValueError( "Refusing to detect components because some sequences have no edges: «{}»".format( string_helper.format_array( missing_edges ) ) )
-    
-    # Iterate sequences
-    for sequence_alpha in model.genes:
-        assert isinstance( sequence_alpha, Gene )
+        model.components.clear()
         
-        alpha_edges = model.edges.find_gene( sequence_alpha )
-        any_accept = False
+        # Find connected components
+        components = ComponentFinder()
         
-        LOG_MAJOR( "Sequence {} contains {} edges.", sequence_alpha, len( alpha_edges ) )
+        # Basic assertions
+        LOG_MAJOR( "There are {} sequences.", len( model.genes ) )
+        missing_edges = []
         
-        for edge in alpha_edges:
-            assert isinstance( edge, Edge )
-            source_difference = abs( edge.left.length - edge.left.gene.length )
-            destination_difference = abs( edge.right.length - edge.right.gene.length )
-            total_difference = abs( edge.left.gene.length - edge.right.gene.length )
+        for sequence in model.genes:
+            edges = model.edges.find_gene( sequence )
             
-            LOG_MAJOR_V( "{}", edge )
-            LOG_MAJOR_V( "-- Source difference ({})", source_difference )
-            LOG_MAJOR_V( "-- Destination difference ({})", destination_difference )
-            LOG_MAJOR_V( "-- Total difference ({})", total_difference )
+            if not edges:
+                missing_edges.append( sequence )
+        
+        if missing_edges:
+            raise ValueError( "Refusing to detect components because some sequences have no edges: «{}»".format( string_helper.format_array( missing_edges ) ) )
+        
+        # Iterate sequences
+        for sequence_alpha in model.genes:
+            assert isinstance( sequence_alpha, Gene )
+            
+            alpha_edges = model.edges.find_gene( sequence_alpha )
+            any_accept = False
             
-            if source_difference > tol:
-                LOG_MAJOR_V( "-- ==> REJECTED (SOURCE)" )
-                continue
-            elif destination_difference > tol:
-                LOG_MAJOR_V( "-- ==> REJECTED (DEST)" )
-                continue
-            elif total_difference > tol:
-                LOG_MAJOR_V( "-- ==> REJECTED (TOTAL)" )
-                continue
-            else:
-                LOG_MAJOR_V( "-- ==> ACCEPTED" )
+            LOG_MAJOR( "Sequence {} contains {} edges.", sequence_alpha, len( alpha_edges ) )
+            model_profile.count( "edges scanned", len( alpha_edges ) )
             
-            if debug and edge.left.gene.accession[0] != edge.right.gene.accession[0]:
-                raise ValueError( "Debug assertion failed. This edge not rejected: {}".format( edge ) )
+            for edge in alpha_edges:
+                assert isinstance( edge, Edge )
+                source_difference = abs( edge.left.length - edge.left.gene.length )
+                destination_difference = abs( edge.right.length - edge.right.gene.length )
+                total_difference = abs( edge.left.gene.length - edge.right.gene.length )
+                
+                LOG_MAJOR_V( "{}", edge )
+                LOG_MAJOR_V( "-- Source difference ({})", source_difference )
+                LOG_MAJOR_V( "-- Destination difference ({})", destination_difference )
+                LOG_MAJOR_V( "-- Total difference ({})", total_difference )
+                
+                if source_difference > tol:
+                    LOG_MAJOR_V( "-- ==> REJECTED (SOURCE)" )
+                    continue
+                elif destination_difference > tol:
+                    LOG_MAJOR_V( "-- ==> REJECTED (DEST)" )
+                    continue
+                elif total_difference > tol:
+                    LOG_MAJOR_V( "-- ==> REJECTED (TOTAL)" )
+                    continue
+                else:
+                    LOG_MAJOR_V( "-- ==> ACCEPTED" )
+                
+                if debug and edge.left.gene.accession[0] != edge.right.gene.accession[0]:
+                    raise ValueError( "Debug assertion failed. This edge not rejected: {}".format( edge ) )
+                
+                any_accept = True
+                beta = edge.opposite( sequence_alpha ).gene
+                LOG_MAJOR( "-- {:<40} LINKS {:<5} AND {:<5}", edge, sequence_alpha, beta )
+                components.join( sequence_alpha, beta )
             
-            any_accept = True
-            beta = edge.opposite( sequence_alpha ).gene
-            LOG_MAJOR( "-- {:<40} LINKS {:<5} AND {:<5}", edge, sequence_alpha, beta )
-            components.join( sequence_alpha, beta )
+            if debug and not any_accept:
+                raise ValueError( "Debug assertion failed. This sequence has no good edges: {}".format( sequence_alpha ) )
         
-        if debug and not any_accept:
-            raise ValueError( "Debug assertion failed. This sequence has no good edges: {}".format( sequence_alpha ) )
-    
-    # Create the components!
-    sequences_in_components = set()
-    
-    for index, sequence_list in enumerate( components.tabulate() ):
-        model.components.add( Component( model, index, sequence_list ) )
-        LOG_MAJOR( "COMPONENT MAJOR: {}", sequence_list )
-        sequences_in_components.update( sequence_list )
-    
-    # Create components for orphans
-    for sequence in model.genes:
-        if sequence not in sequences_in_components:
-            LOG_MAJOR( "ORPHAN: {}", sequence )
-            model.components.add( Component( model, len( model.components ), (sequence,) ) )
-    
-    # An assertion
-    for component in model.components:
-        assert isinstance( component, Component )
-        if len( component.major_genes ) == 1:
-            warnings.warn( "There are components with just one sequence in them. Maybe you meant to use a tolerance higher than {}?".format( tol ), UserWarning )
-            break
-    
-    pr.printx( "<verbose>{} components detected.</verbose>".format( len( model.components ) ) )
-    
-    return EChanges.COMPONENTS
+        # Create the components!
+        sequences_in_components = set()
+        
+        for index, sequence_list in enumerate( components.tabulate() ):
+            model.components.add( Component( model, index, sequence_list ) )
+            LOG_MAJOR( "COMPONENT MAJOR: {}", sequence_list )
+            sequences_in_components.update( sequence_list )
+        
+        # Create components for orphans
+        for sequence in model.genes:
+            if sequence not in sequences_in_components:
+                LOG_MAJOR( "ORPHAN: {}", sequence )
+                model.components.add( Component( model, len( model.components ), (sequence,) ) )
+        
+        # An assertion
+        for component in model.components:
+            assert isinstance( component, Component )
+            if len( component.major_genes ) == 1:
+                warnings.warn( "There are components with just one sequence in them. Maybe you meant to use a tolerance higher than {}?".format( tol ), UserWarning )
+                break
+        
+        pr.printx( "<verbose>{} components detected.</verbose>".format( len( model.components ) ) )
+        
+        model.get_status( STAGES.MAJOR_4 ).record( tol = tol )
+        
+        return EChanges.COMPONENTS
 
 
 @app.command( folder = constants.F_DROP )
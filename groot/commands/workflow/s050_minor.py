@@ -36,130 +36,134 @@ def create_minor( tol: int ) -> EChanges:
     :param tol:         Tolerance on overlap, in sites.
     """
     model = global_view.current_model()
-    model.get_status( STAGES.MINOR_5 ).assert_create()
     
-    average_lengths = __get_average_component_lengths( model )
-    
-    #
-    # PHASE I.
-    # We complete an `entry_dict`
-    # - this is a dict, for components v components, of their longest spanning edges
-    #
-    entry_dict: Dict[Component, Dict[Component, Edge]] = defaultdict( dict )
-    
-    # Iterate the components
-    for comp in model.components:
-        LOG_MINOR( "~~~~~ {} ~~~~~", comp )
-        comp.minor_domains = []
+    with model.get_status( STAGES.MINOR_5 ).profile():
+        model.get_status( STAGES.MINOR_5 ).assert_create()
+        
+        average_lengths = __get_average_component_lengths( model )
         
-        # Iterate the major sequences
-        for sequence in comp.major_genes:
-            # Add the origin-al sequence
-            comp.minor_domains.append( Domain( sequence, 1, sequence.length ) )
+        #
+        # PHASE I.
+        # We complete an `entry_dict`
+        # - this is a dict, for components v components, of their longest spanning edges
+        #
+        entry_dict: Dict[Component, Dict[Component, Edge]] = defaultdict( dict )
+        
+        # Iterate the components
+        for comp in model.components:
+            LOG_MINOR( "~~~~~ {} ~~~~~", comp )
+            comp.minor_domains = []
             
-            # Iterate the edges of that sequence
-            for edge in model.edges.find_gene( sequence ):
-                same_side, oppo_side = edge.sides( sequence )
-                
-                # Discard edges with a mismatch < tolerance
-                if abs( sequence.length - same_side.length ) > tol:
-                    LOG_MINOR( "IGNORING: {}", edge )
-                    continue
-                
-                LOG_MINOR( "ATTEMPTING: {}", edge )
+            # Iterate the major sequences
+            for sequence in comp.major_genes:
+                # Add the origin-al sequence
+                comp.minor_domains.append( Domain( sequence, 1, sequence.length ) )
                 
-                oppo_comp = model.components.find_component_for_major_gene( oppo_side.gene )
-                
-                if oppo_comp != comp:
-                    # We have found an entry from `comp` into `oppo_comp`
+                # Iterate the edges of that sequence
+                for edge in model.edges.find_gene( sequence ):
+                    same_side, oppo_side = edge.sides( sequence )
                     
-                    # We'll get both ways around, so filter to deal with the big to little transitions
-                    if average_lengths[oppo_comp] < average_lengths[comp]:
+                    # Discard edges with a mismatch < tolerance
+                    if abs( sequence.length - same_side.length ) > tol:
+                        LOG_MINOR( "IGNORING: {}", edge )
                         continue
                     
-                    # If we have an edge already, we use the larger one
-                    # (We just use the side in the opposite component - we assume the side in the origin component will be roughly similar so ignore it)
-                    existing_edge = entry_dict[comp].get( oppo_comp )
+                    LOG_MINOR( "ATTEMPTING: {}", edge )
                     
-                    if existing_edge is not None:
-                        new_length = oppo_side.length
-                        existing_length = existing_edge.side( oppo_comp ).length
-                        
-                        if new_length > existing_length:
-                            existing_edge = None
+                    oppo_comp = model.components.find_component_for_major_gene( oppo_side.gene )
                     
-                    if existing_edge is None:
-                        LOG_MINOR( "FROM {} TO {} ACROSS {}", comp, oppo_comp, edge )
-                        entry_dict[comp][oppo_comp] = edge
-    
-    #
-    # PHASE II.
-    # Now slice those sequences up!
-    # Unfortunately we can't just relay the positions, since there will be small shifts.
-    # We need to use BLAST to work out the relationship between the genes.
-    #
-    for comp, oppo_dict in entry_dict.items():
-        assert isinstance( comp, Component )
+                    if oppo_comp != comp:
+                        # We have found an entry from `comp` into `oppo_comp`
+                        
+                        # We'll get both ways around, so filter to deal with the big to little transitions
+                        if average_lengths[oppo_comp] < average_lengths[comp]:
+                            continue
+                        
+                        # If we have an edge already, we use the larger one
+                        # (We just use the side in the opposite component - we assume the side in the origin component will be roughly similar so ignore it)
+                        existing_edge = entry_dict[comp].get( oppo_comp )
+                        
+                        if existing_edge is not None:
+                            new_length = oppo_side.length
+                            existing_length = existing_edge.side( oppo_comp ).length
+                            
+                            if new_length > existing_length:
+                                existing_edge = None
+                        
+                        if existing_edge is None:
+                            LOG_MINOR( "FROM {} TO {} ACROSS {}", comp, oppo_comp, edge )
+                            entry_dict[comp][oppo_comp] = edge
         
-        for oppo_comp, edge in oppo_dict.items():
-            # `comp` enters `oppo_comp` via `edge`
-            assert isinstance( oppo_comp, Component )
-            assert isinstance( edge, Edge )
-            
-            same_side, oppo_side = edge.sides( comp )
-            
-            # Grab the entry point
-            comp.minor_domains.append( oppo_side )
-            
-            # Now iterate over the rest of the `other_component`
-            to_do = set( oppo_comp.major_genes )
-            done = set()
-            
-            # We have added the entry point already
-            to_do.remove( oppo_side.gene )
-            done.add( oppo_side.gene )
-            
-            LOG_MINOR( "flw. FOR {}".format( edge ) )
-            LOG_MINOR( "flw. ENTRY POINT IS {}".format( oppo_side ) )
+        #
+        # PHASE II.
+        # Now slice those sequences up!
+        # Unfortunately we can't just relay the positions, since there will be small shifts.
+        # We need to use BLAST to work out the relationship between the genes.
+        #
+        for comp, oppo_dict in entry_dict.items():
+            assert isinstance( comp, Component )
             
-            while to_do:
-                # First we need to find an edge between something in the "done" set and something in the "to_do" set.
-                # If multiple relationships are present, we use the largest one.
-                edge, src_dom, dst_dom = __find_largest_relationship( model, done, to_do )
-                to_do.remove( dst_dom.gene )
-                done.add( dst_dom.gene )
-                
-                LOG_MINOR( "flw. FOLLOWING {}", edge )
-                LOG_MINOR( "flw. -- SRC {} {}", src_dom.start, src_dom.end )
-                LOG_MINOR( "flw. -- DST {} {}", dst_dom.start, dst_dom.end )
+            for oppo_comp, edge in oppo_dict.items():
+                # `comp` enters `oppo_comp` via `edge`
+                assert isinstance( oppo_comp, Component )
+                assert isinstance( edge, Edge )
                 
-                # Now we have our relationship, we can use it to calculate the offset within the component
-                src_comp_dom = comp.get_minor_domain_by_gene( src_dom.gene )
-                LOG_MINOR( "flw. -- SRC-OWN {} {}", src_comp_dom.start, src_comp_dom.end )
+                same_side, oppo_side = edge.sides( comp )
                 
-                if src_comp_dom.start < src_dom.start - tol or src_comp_dom.end > src_dom.end + tol:
-                    raise ValueError( "Cannot resolve components. The edge «{}» is smaller than the component boundary «{}» (less the tolerance «{}»). This is indicative of an earlier error in :func:`detect_major`. Component data follows:\n{}".format(
-                            edge, src_comp_dom, tol, string_helper.dump_data( comp ) ) )
+                # Grab the entry point
+                comp.minor_domains.append( oppo_side )
                 
-                # The offset is the position in the edge pertaining to our origin
-                offset_start = src_comp_dom.start - src_dom.start
-                offset_end = src_comp_dom.end - src_dom.start  # We use just the `start` of the edge (TODO: a possible improvement might be to use something more advanced)
-                LOG_MINOR( "flw. -- OFFSET {} {}", offset_start, offset_end )
+                # Now iterate over the rest of the `other_component`
+                to_do = set( oppo_comp.major_genes )
+                done = set()
                 
-                # The destination is the is slice of the trailing side, adding our original offset
-                destination_start = dst_dom.start + offset_start
-                destination_end = dst_dom.start + offset_end
-                LOG_MINOR( "flw. -- DESTINATION {} {}", offset_start, offset_end )
+                # We have added the entry point already
+                to_do.remove( oppo_side.gene )
+                done.add( oppo_side.gene )
                 
-                # Fix any small discrepancies
-                destination_end, destination_start = __fit_to_range( dst_dom.gene.length, destination_start, destination_end, tol )
+                LOG_MINOR( "flw. FOR {}".format( edge ) )
+                LOG_MINOR( "flw. ENTRY POINT IS {}".format( oppo_side ) )
                 
-                subsequence_list = Domain( dst_dom.gene, destination_start, destination_end )
-                
-                LOG_MINOR( "flw. -- SHIFTED {} {}", offset_start, offset_end )
-                comp.minor_domains.append( subsequence_list )
-    
-    return EChanges.COMPONENTS
+                while to_do:
+                    # First we need to find an edge between something in the "done" set and something in the "to_do" set.
+                    # If multiple relationships are present, we use the largest one.
+                    edge, src_dom, dst_dom = __find_largest_relationship( model, done, to_do )
+                    to_do.remove( dst_dom.gene )
+                    done.add( dst_dom.gene )
+                    
+                    LOG_MINOR( "flw. FOLLOWING {}", edge )
+                    LOG_MINOR( "flw. -- SRC {} {}", src_dom.start, src_dom.end )
+                    LOG_MINOR( "flw. -- DST {} {}", dst_dom.start, dst_dom.end )
+                    
+                    # Now we have our relationship, we can use it to calculate the offset within the component
+                    src_comp_dom = comp.get_minor_domain_by_gene( src_dom.gene )
+                    LOG_MINOR( "flw. -- SRC-OWN {} {}", src_comp_dom.start, src_comp_dom.end )
+                    
+                    if src_comp_dom.start < src_dom.start - tol or src_comp_dom.end > src_dom.end + tol:
+                        raise ValueError( "Cannot resolve components. The edge «{}» is smaller than the component boundary «{}» (less the tolerance «{}»). This is indicative of an earlier error in :func:`detect_major`. Component data follows:\n{}".format(
+                                edge, src_comp_dom, tol, string_helper.dump_data( comp ) ) )
+                    
+                    # The offset is the position in the edge pertaining to our origin
+                    offset_start = src_comp_dom.start - src_dom.start
+                    offset_end = src_comp_dom.end - src_dom.start  # We use just the `start` of the edge (TODO: a possible improvement might be to use something more advanced)
+                    LOG_MINOR( "flw. -- OFFSET {} {}", offset_start, offset_end )
+                    
+                    # The destination is the is slice of the trailing side, adding our original offset
+                    destination_start = dst_dom.start + offset_start
+                    destination_end = dst_dom.start + offset_end
+                    LOG_MINOR( "flw. -- DESTINATION {} {}", offset_start, offset_end )
+                    
+                    # Fix any small discrepancies
+                    destination_end, destination_start = __fit_to_range( dst_dom.gene.length, destination_start, destination_end, tol )
+                    
+                    subsequence_list = Domain( dst_dom.gene, destination_start, destination_end )
+                    
+                    LOG_MINOR( "flw. -- SHIFTED {} {}", offset_start, offset_end )
+                    comp.minor_domains.append( subsequence_list )
+        
+        model.get_status( STAGES.MINOR_5 ).record( tol = tol )
+        
+        return EChanges.COMPONENTS
 
 
 @app.command( folder = constants.F_DROP )
@@ -10,7 +10,7 @@ from mhelper import ansi, string_helper
 from groot import constants
 from groot.application import app
 from groot.data import Gene, global_view
-from groot.constants import EChanges
+from groot.constants import STAGES, EChanges
 from groot.utilities import cli_view_utils
 from groot.utilities.extendable_algorithm import AlgorithmCollection
 
@@ -31,18 +31,21 @@ def create_domains( algorithm: domain_algorithms.Algorithm ):
     :param algorithm:   Mode of domain generation. See `algorithm_help`.
     """
     model = global_view.current_model()
-    if not model.genes:
-        raise ValueError( "Cannot generate domains because there are no sequences." )
     
-    model.user_domains.clear()
-    
-    for sequence in model.genes:
-        for domain in algorithm( sequence ):
-            model.user_domains.add( domain )
-    
-    pr.printx( "<verbose>Domains created, there are now {} domains.</verbose>".format( len( model.user_domains ) ) )
-    
-    return EChanges.DOMAINS
+    with model.get_status( STAGES.DOMAINS_6 ).profile():
+        if not model.genes:
+            raise ValueError( "Cannot generate domains because there are no sequences." )
+        
+        model.user_domains.clear()
+        
+        for sequence in model.genes:
+            for domain in algorithm( sequence ):
+                model.user_domains.add( domain )
+        
+        pr.printx( "<verbose>Domains created, there are now {} domains.</verbose>".format( len( model.user_domains ) ) )
+        model.get_status( STAGES.DOMAINS_6 ).record( algorithm = algorithm )
+        
+        return EChanges.DOMAINS
 
 
 @app.command( folder = constants.F_DROP )
@@ -5,7 +5,7 @@ from mhelper import io_helper, string_helper
 from groot import constants
 from groot.application import app
 from groot.data import Component, Model, global_view
-from groot.constants import EChanges
+from groot.constants import STAGES, EChanges
 from groot.utilities import cli_view_utils, external_runner
 from groot.utilities.extendable_algorithm import AlgorithmCollection
 
@@ -29,20 +29,31 @@ def create_alignments( algorithm: alignment_algorithms.Algorithm, component: Opt
     """
     model = global_view.current_model()
     
-    if not all( x.site_array for x in model.genes ):
-        raise ValueError( "Refusing to make alignments because there is no site data. Did you mean to load the site data (FASTA) first?" )
-    
-    to_do = cli_view_utils.get_component_list( component )
-    before = sum( x.alignment is not None for x in model.components )
-    
-    for component_ in pr.pr_iterate( to_do, "Aligning" ):
-        fasta = component_.get_unaligned_legacy_fasta()
-        component_.alignment = external_runner.run_in_temporary( algorithm, component_.model, fasta )
-    
-    after = sum( x.alignment is not None for x in model.components )
-    pr.printx( "<verbose>{} components aligned. {} of {} components have an alignment ({}).</verbose>".format( len( to_do ), after, len( model.components ), string_helper.as_delta( after - before ) ) )
-    
-    return EChanges.COMP_DATA
+    with model.get_status( STAGES.ALIGNMENTS_7 ).profile():
+        if not all( x.site_array for x in model.genes ):
+            raise ValueError( "Refusing to make alignments because there is no site data. Did you mean to load the site data (FASTA) first?" )
+        
+        to_do = cli_view_utils.get_component_list( component )
+        before = sum( x.alignment is not None for x in model.components )
+        
+        for component_ in pr.pr_iterate( to_do, "Aligning" ):
+            component_.alignment = _create_alignment( algorithm, component_ )
+        
+        after = sum( x.alignment is not None for x in model.components )
+        pr.printx( "<verbose>{} components aligned. {} of {} components have an alignment ({}).</verbose>".format( len( to_do ), after, len( model.components ), string_helper.as_delta( after - before ) ) )
+        
+        if not component:
+            model.get_status( STAGES.ALIGNMENTS_7 ).record( algorithm = algorithm )
+        
+        return EChanges.COMP_DATA
+
+
+def _create_alignment( algorithm: alignment_algorithms.Algorithm, component: Component ) -> str:
+    """
+    Creates the alignment for the `component`, without adding it to the model.
+    """
+    fasta = component.get_unaligned_legacy_fasta()
+    return external_runner.run_in_temporary( algorithm, component.model, fasta )
 
 
 @app.command( folder = constants.F_SET )
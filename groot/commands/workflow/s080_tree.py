@@ -1,12 +1,14 @@
+import queue
 from intermake import pr
 from mgraph import MGraph
 from mhelper import isFilename, isOptional, SwitchError, io_helper
-from typing import Callable, List, Optional
+from typing import Callable, List, Optional, Tuple
 
 from groot import constants
 from groot.application import app
+from groot.commands.workflow import s070_alignment
 from groot.constants import EFormat, EChanges
-from groot.data import EPosition, ESiteType, INamedGraph, Component, Model, Gene, global_view
+from groot.data import EPosition, ESiteType, INamedGraph, Component, Model, Gene, PackedTree, global_view, model_profile
 from groot.utilities import AlgorithmCollection, cli_view_utils, external_runner, graph_viewing, lego_graph
 
 
@@ -30,48 +32,184 @@ def create_trees( algorithm: tree_algorithms.Algorithm, components: Optional[Lis
     # Get the current model
     model = global_view.current_model()
     
-    # Get the site type
+    with model.get_status( constants.STAGES.TREES_8 ).profile():
+        # Get the site type
+        site_type = __get_site_type( model )
+        
+        # Get the components
+        components = cli_view_utils.get_component_list( components )
+        
+        # Assert that we are in a position to create the trees
+        model.get_status( constants.STAGES.TREES_8 ).assert_create()
+        assert all( x.alignment is not None for x in components ), "Cannot generate the tree because the alignment has not yet been specified."
+        assert all( x.tree is None for x in components ), "Cannot generate the tree because the tree has already been generated."
+        
+        # Iterate the components
+        for component in pr.pr_iterate( components, "Generating trees" ):
+            newick = __create_tree( algorithm, site_type, component, component.alignment )
+            
+            # Set the tree on the component
+            set_tree( component, newick )
+        
+        # Show the completion message
+        after = sum( x.tree is not None for x in model.components )
+        pr.printx( "<verbose>{} trees generated. {} of {} components have a tree.</verbose>".format( len( components ), after, len( model.components ) ) )
+        
+        if after == len( model.components ) and len( components ) == len( model.components ):
+            model.get_status( constants.STAGES.TREES_8 ).record( algorithm = algorithm )
+        
+        return EChanges.COMP_DATA
+
+
+@app.command( folder = constants.F_CREATE )
+def create_alignments_and_trees( alignment: s070_alignment.alignment_algorithms.Algorithm,
+                                 tree: tree_algorithms.Algorithm,
+                                 processes: int = -1 ) -> EChanges:
+    """
+    Creates the alignments and trees for all components.
+    
+    This is the same as `create_alignments` followed by `create_trees`, but each component moves on to its tree as
+    soon as its own alignment is ready, rather than waiting for every component to be aligned. Each alignment and
+    tree is added to the model as soon as it is complete.
+    Since the two stages overlap, their time is profiled together, as `Alignments+Trees` (see `print_profile`).
+    
+    Requisites: `create_minor` and FASTA data.
+    
+    :param alignment:   Alignment algorithm to use. See `algorithm_help`.
+    :param tree:        Tree algorithm to use. See `algorithm_help`.
+    :param processes:   Number of alignments or trees to create at once, each in its own process.
+                        `0` creates them one at a time in the current process.
+                        `-1` uses one process per CPU.
+                        Parallel processing requires that processes can be forked (i.e. it is not available on Windows).
+    """
+    model = global_view.current_model()
+    
+    # The alignments and trees are created together, so they are profiled together
+    with model_profile.profile( model, "Alignments+Trees" ):
+        if not all( x.site_array for x in model.genes ):
+            raise ValueError( "Refusing to make alignments because there is no site data. Did you mean to load the site data (FASTA) first?" )
+        
+        model.get_status( constants.STAGES.ALIGNMENTS_7 ).assert_create()
+        model.get_status( constants.STAGES.TREES_8 ).assert_not_in_use( "create" )
+        
+        site_type = __get_site_type( model )
+        components = list( model.components )
+        
+        if processes:
+            __create_alignments_and_trees_in_parallel( alignment, tree, site_type, components, processes )
+        else:
+            for component in pr.pr_iterate( components, "Aligning and generating trees" ):
+                component.alignment = s070_alignment._create_alignment( alignment, component )
+                set_tree( component, __create_tree( tree, site_type, component, component.alignment ) )
+        
+        model.get_status( constants.STAGES.ALIGNMENTS_7 ).record( algorithm = alignment )
+        model.get_status( constants.STAGES.TREES_8 ).record( algorithm = tree )
+        
+        # Remove any profiles from creating the stages separately, which no longer apply
+        model.stage_profiles.pop( constants.STAGES.ALIGNMENTS_7.name, None )
+        model.stage_profiles.pop( constants.STAGES.TREES_8.name, None )
+        pr.printx( "<verbose>{} components aligned and {} trees generated.</verbose>".format( model.components.num_aligned, model.components.num_trees ) )
+        
+        return EChanges.COMP_DATA
+
+
+__parallel_state = []
+"""
+The algorithms, site type and components for `__align_in_worker` and `__tree_in_worker`.
+This is set before the workers are forked, so they inherit it.
+"""
+
+
+def __create_alignments_and_trees_in_parallel( alignment: s070_alignment.alignment_algorithms.Algorithm,
+                                               tree: tree_algorithms.Algorithm,
+                                               site_type: str,
+                                               components: List[Component],
+                                               processes: int ) -> None:
+    """
+    As `create_alignments_and_trees`, using a pool of `processes` workers shared by the alignments and trees.
+    A component's tree is queued as soon as its alignment arrives.
+    """
+    import multiprocessing
+    
+    if "fork" not in multiprocessing.get_all_start_methods():
+        raise ValueError( "Cannot create the alignments and trees in parallel because processes cannot be forked on this platform. Please set `processes` to `0`." )
+    
+    __parallel_state[:] = [alignment, tree, site_type, components]
+    results = queue.Queue()
+    
+    try:
+        with multiprocessing.get_context( "fork" ).Pool( processes if processes > 0 else None ) as pool:
+            for index in range( len( components ) ):
+                pool.apply_async( __align_in_worker, (index,), callback = results.put, error_callback = results.put )
+            
+            for _ in pr.pr_iterate( range( len( components ) * 2 ), "Aligning and generating trees" ):
+                result = results.get()
+                
+                if isinstance( result, BaseException ):
+                    raise result
+                
+                index, aligned, newick = result
+                component = components[index]
+                
+                if newick is None:
+                    component.alignment = aligned
+                    pool.apply_async( __tree_in_worker, (index, aligned), callback = results.put, error_callback = results.put )
+                else:
+                    set_tree( component, newick )
+    finally:
+        __parallel_state.clear()
+
+
+def __align_in_worker( index: int ) -> Tuple[int, str, None]:
+    """
+    Creates the alignment for the `index`th component of the `__parallel_state` (in a worker process).
+    """
+    alignment, _, _, components = __parallel_state
+    return index, s070_alignment._create_alignment( alignment, components[index] ), None
+
+
+def __tree_in_worker( index: int, alignment: str ) -> Tuple[int, str, str]:
+    """
+    Creates the tree for the `index`th component of the `__parallel_state`, from its `alignment` (in a worker process).
+    """
+    _, tree, site_type, components = __parallel_state
+    return index, alignment, __create_tree( tree, site_type, components[index], alignment )
+
+
+def __get_site_type( model: Model ) -> str:
+    """
+    Obtains the site type argument for the tree algorithms.
+    """
     if model.site_type == ESiteType.DNA:
-        site_type = "n"
+        return "n"
     elif model.site_type == ESiteType.PROTEIN:
-        site_type = "p"
+        return "p"
     else:
         raise SwitchError( "site_type", model.site_type )
+
+
+def __create_tree( algorithm: tree_algorithms.Algorithm, site_type: str, component: Component, alignment: str ) -> str:
+    """
+    Creates the tree for the `component`, from its `alignment`.
     
-    # Get the components
-    components = cli_view_utils.get_component_list( components )
-    
-    # Assert that we are in a position to create the trees
-    model.get_status( constants.STAGES.TREES_8 ).assert_create()
-    assert all( x.alignment is not None for x in components ), "Cannot generate the tree because the alignment has not yet been specified."
-    assert all( x.tree is None for x in components ), "Cannot generate the tree because the tree has already been generated."
-    
-    # Iterate the components
-    for component in pr.pr_iterate( components, "Generating trees" ):
-        # Handle the edge cases for a tree of three or less
-        num_genes = len( component.minor_genes )
-        if num_genes <= 3:
-            if num_genes == 1:
-                newick = "({});"
-            elif num_genes == 2:
-                newick = "({},{});"
-            elif num_genes == 3:
-                newick = "(({},{}),{});"
-            else:
-                raise SwitchError( "num_genes", num_genes )
-            
-            newick = newick.format( *(x.legacy_accession for x in component.minor_genes) )
+    :return:    The tree, in Newick format.
+    """
+    # Handle the edge cases for a tree of three or less
+    num_genes = len( component.minor_genes )
+    if num_genes <= 3:
+        if num_genes == 1:
+            newick = "({});"
+        elif num_genes == 2:
+            newick = "({},{});"
+        elif num_genes == 3:
+            newick = "(({},{}),{});"
         else:
-            # Run the algorithm normally
-            newick = external_runner.run_in_temporary( algorithm, site_type, component.alignment )
+            raise SwitchError( "num_genes", num_genes )
         
-        # Set the tree on the component
-        set_tree( component, newick )
-    
-    # Show the completion message
-    after = sum( x.tree is not None for x in model.components )
-    pr.printx( "<verbose>{} trees generated. {} of {} components have a tree.</verbose>".format( len( components ), after, len( model.components ) ) )
-    return EChanges.COMP_DATA
+        return newick.format( *(x.legacy_accession for x in component.minor_genes) )
+    else:
+        # Run the algorithm normally
+        return external_runner.run_in_temporary( algorithm, site_type, alignment )
 
 
 @app.command( folder = constants.F_SET )
@@ -93,11 +231,15 @@ def set_tree( component: Component, newick: str ) -> EChanges:
 
 
 def _force_set_tree( component, newick ):
+    unrooted = lego_graph.import_newick( newick, component.model )
+    tree = unrooted.copy()
+    reposition_tree( tree )
+    
+    # Only the rooted tree is used by the subsequent stages, the others are kept as arrays until they are required
     component.tree_newick = newick
-    component.tree_unrooted = lego_graph.import_newick( newick, component.model )
-    component.tree = component.tree_unrooted.copy()
-    reposition_tree( component.tree )
-    component.tree_unmodified = component.tree.copy()
+    component.packed_tree_unrooted = PackedTree.pack( unrooted )
+    component.tree = tree
+    component.packed_tree_unmodified = component.packed_tree.copy()
 
 
 @app.command( folder = constants.F_DROP )
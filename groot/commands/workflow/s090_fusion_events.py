@@ -30,23 +30,26 @@ def create_fusions() -> EChanges:
     Requisites: `create_trees`
     """
     model = global_view.current_model()
-    model.get_status( constants.STAGES.FUSIONS_9 ).assert_create()
     
-    r: List[Fusion] = []
-    
-    for event in __find_fusion_events( model ):
-        __LOG( "Processing fusion event: {}", event )
-        event.points = []
+    with model.get_status( constants.STAGES.FUSIONS_9 ).profile():
+        model.get_status( constants.STAGES.FUSIONS_9 ).assert_create()
         
-        for component in model.components:
-            __find_fusion_points( event, component )
+        r: List[Fusion] = []
         
-        r.append( event )
-    
-    model.fusions = FusionCollection( r )
-    n = len( model.fusions )
-    pr.printx( "<verbose>{} {} detected</verbose>".format( n, "fusion" if n == 1 else "fusions" ) )
-    return EChanges.MODEL_DATA
+        for event in __find_fusion_events( model ):
+            __LOG( "Processing fusion event: {}", event )
+            event.points = []
+            
+            for component in model.components:
+                __find_fusion_points( event, component )
+            
+            r.append( event )
+        
+        model.fusions = FusionCollection( r )
+        n = len( model.fusions )
+        pr.printx( "<verbose>{} {} detected</verbose>".format( n, "fusion" if n == 1 else "fusions" ) )
+        model.get_status( constants.STAGES.FUSIONS_9 ).record()
+        return EChanges.MODEL_DATA
 
 
 @app.command( folder = constants.F_DROP )
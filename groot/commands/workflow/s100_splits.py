@@ -39,42 +39,44 @@ def create_splits(  ):
     """
     model: Model   =global_view.current_model()
     
-    # Status check
-    model.get_status( STAGES.SPLITS_10 ).assert_create()
-    
-    all_splits: Dict[MSplit, Split] = { }
-    
-    for component in model.components:
-        __LOG_SPLITS( "FOR COMPONENT {}", component )
-        
-        tree: MGraph = component.tree
-        tree.any_root.make_root()  # ensure root is root-like
-        
-        component_sequences = lego_graph.get_ileaf_data( tree.get_nodes() )
+    with model.get_status( STAGES.SPLITS_10 ).profile():
+        # Status check
+        model.get_status( STAGES.SPLITS_10 ).assert_create()
         
-        # Split the tree, `ILeaf` is a strange definition of a "leaf", since we'll pull out clades too (`LegoPoint`s).
-        # We fix this when we reconstruct the NRFG.
-        component_splits = exporting.export_splits( tree, filter = lambda x: isinstance( x.data, INode ) )
-        component_splits_r = []
+        all_splits: Dict[MSplit, Split] = { }
         
-        for split in component_splits:
-            __LOG_SPLITS( "---- FOUND SPLIT {}", str( split ) )
+        for component in model.components:
+            __LOG_SPLITS( "FOR COMPONENT {}", component )
             
-            exi = all_splits.get( split )
+            tree: MGraph = component.tree
+            tree.any_root.make_root()  # ensure root is root-like
             
-            if exi is None:
-                exi = Split( split, len( all_splits ) )
-                all_splits[split] = exi
+            component_sequences = lego_graph.get_ileaf_data( tree.get_nodes() )
             
-            exi.components.add( component )
-            component_splits_r.append( exi )
+            # Split the tree, `ILeaf` is a strange definition of a "leaf", since we'll pull out clades too (`LegoPoint`s).
+            # We fix this when we reconstruct the NRFG.
+            component_splits = exporting.export_splits( tree, filter = lambda x: isinstance( x.data, INode ) )
+            component_splits_r = []
+            
+            for split in component_splits:
+                __LOG_SPLITS( "---- FOUND SPLIT {}", str( split ) )
+                
+                exi = all_splits.get( split )
+                
+                if exi is None:
+                    exi = Split( split, len( all_splits ) )
+                    all_splits[split] = exi
+                
+                exi.components.add( component )
+                component_splits_r.append( exi )
+            
+            component.splits = frozenset( component_splits_r )
+            component.leaves = frozenset( component_sequences )
         
-        component.splits = frozenset( component_splits_r )
-        component.leaves = frozenset( component_sequences )
-    
-    model.splits = frozenset( all_splits.values() )
-    
-    return EChanges.MODEL_DATA
+        model.splits = frozenset( all_splits.values() )
+        model.get_status( STAGES.SPLITS_10 ).record()
+        
+        return EChanges.MODEL_DATA
     
 @app.command(folder = constants.F_DROP)
 def drop_splits( ):
@@ -84,7 +86,7 @@ def drop_splits( ):
     model: Model   =global_view.current_model()
     model.get_status( STAGES.SPLITS_10 ).assert_drop()
     
-    model.splits = frozenset()
+    model.splits = None
     
     for component in model.components:
         component.splits = None
@@ -1,10 +1,12 @@
+import bisect
+from intermake import pr
 from mhelper import Logger, LogicError, ansi_helper, string_helper
-from typing import Set
+from typing import List, Optional, Set
 
 from groot import constants
 from groot.application import app
 from groot.constants import STAGES, EChanges
-from groot.data import Split, global_view
+from groot.data import Model, NotReadyError, Split, global_view, model_profile
 
 
 __LOG_EVIDENCE = Logger( "nrfg.evidence", False )
@@ -25,74 +27,45 @@ def create_consensus( cutoff: float = 0.5 ) -> EChanges:
     | Unlike a normal majority rule consensus, there's no guarantee that our splits are in the graphs, |
     | so, in addition to support/reject evidence, we have a third category, whereby the graph neither  |
     | supports nor rejects a split.                                                                    |
+    |                                                                                                  |
+    | The evidence is retained on the splits, so trying a different cutoff (`set_consensus`,           |
+    | `print_consensus_sweep`) only repeats the final `frequency > cutoff` test.                       |
     ----------------------------------------------------------------------------------------------------
                                                                                                        
-    :param cutoff:              Cutoff to be used in the consensus 
+    :param cutoff:              Cutoff to be used in the consensus
     """
     model = global_view.current_model()
-    __LOG_EVIDENCE.pause( "▒▒▒▒▒▒▒▒▒▒▒▒▒▒▒▒▒▒▒▒ EVIDENCE ▒▒▒▒▒▒▒▒▒▒▒▒▒▒▒▒▒▒▒▒" )
     
-    model.get_status( STAGES.CONSENSUS_11 ).assert_create()
-    
-    __LOG_EVIDENCE( "BEGIN EVIDENCE ({} splits)".format( len( model.splits ) ) )
-    viable_splits: Set[Split] = set()
-    
-    for split in model.splits:
-        assert isinstance( split, Split ), split
+    with model.get_status( STAGES.CONSENSUS_11 ).profile():
+        __LOG_EVIDENCE.pause( "▒▒▒▒▒▒▒▒▒▒▒▒▒▒▒▒▒▒▒▒ EVIDENCE ▒▒▒▒▒▒▒▒▒▒▒▒▒▒▒▒▒▒▒▒" )
         
-        if split.split.is_empty:
-            __LOG_EVIDENCE( "SPLIT IS EMPTY: {}".format( split ) )
-            continue
+        model.get_status( STAGES.CONSENSUS_11 ).assert_create()
         
-        evidence_for = set()
-        evidence_against = set()
-        evidence_unused = set()
-        
-        for component in model.components:
-            component_splits = component.splits
-            has_evidence = None
-            
-            for component_split in component_splits:
-                evidence = split.is_evidenced_by( component_split )
-                
-                if evidence is True:
-                    has_evidence = True
-                    break
-                elif evidence is False:
-                    has_evidence = False
-            
-            if has_evidence is True:
-                evidence_for.add( component )
-            elif has_evidence is False:
-                evidence_against.add( component )
-            else:
-                evidence_unused.add( component )
+        model.consensus = frozenset( __get_viable_splits( model, cutoff ) )
+        model.get_status( STAGES.CONSENSUS_11 ).record( cutoff = cutoff )
         
-        if not evidence_for:
-            raise LogicError( "There is no evidence for (F{} A{} U{}) this split «{}», but the split must have come from somewhere.".format( len( evidence_for ), len( evidence_against ), len( evidence_unused ), split ) )
+        return EChanges.MODEL_DATA
         
-        total_evidence: int = len( evidence_for ) + len( evidence_against )
-        frequency: float = len( evidence_for ) / total_evidence
-        accept: bool = frequency > cutoff
-        split.evidence_for = frozenset( evidence_for )
-        split.evidence_against = frozenset( evidence_against )
-        split.evidence_unused = frozenset( evidence_unused )
         
-        __LOG_EVIDENCE( "{} {} = {}% -- FOR: ({}) {}, AGAINST: ({}) {}, UNUSED: ({}) {}",
-                        "✔" if accept else "✘",
-                        ansi_helper.ljust( str( split ), 80 ),
-                        int( frequency * 100 ),
-                        len( evidence_for ),
-                        string_helper.format_array( evidence_for, sort = True ),
-                        len( evidence_against ),
-                        string_helper.format_array( evidence_against, sort = True ),
-                        len( evidence_unused ),
-                        string_helper.format_array( evidence_unused, sort = True ) )
+@app.command( folder = constants.F_SET )
+def set_consensus( cutoff: float = 0.5 ) -> EChanges:
+    """
+    Replaces the consensus with one using a different cutoff.
         
-        if accept:
-            viable_splits.add( split )
-    
-    model.consensus = frozenset( viable_splits )
+    The evidence collected by `create_consensus` is reused, so this is much faster than dropping and
+    recreating the consensus.
+            
+    :param cutoff:              Cutoff to be used in the consensus
+    """
+    model = global_view.current_model()
+    model.get_status( STAGES.CONSENSUS_11 ).assert_not_in_use( "set" )
+                
+    before = len( model.consensus ) if model.consensus is not None else 0
+    model.consensus = frozenset( __get_viable_splits( model, cutoff ) )
+    model.get_status( STAGES.CONSENSUS_11 ).record( cutoff = cutoff )
+    after = len( model.consensus )
+            
+    pr.printx( "<verbose>{} of {} splits are viable at a cutoff of {} ({}).</verbose>".format( after, len( model.splits ), cutoff, string_helper.as_delta( after - before ) ) )
     
     return EChanges.MODEL_DATA
 
@@ -101,11 +74,13 @@ def create_consensus( cutoff: float = 0.5 ) -> EChanges:
 def drop_consensus():
     """
     Removes data from the model.
+    
+    The evidence collected for the splits is retained, see `create_consensus`.
     """
     model = global_view.current_model()
     model.get_status( STAGES.CONSENSUS_11 ).assert_drop()
     
-    model.consensus = frozenset()
+    model.consensus = None
     
     return EChanges.COMP_DATA
 
@@ -122,3 +97,131 @@ def print_consensus() -> EChanges:
         print( str( x ) )
     
     return EChanges.INFORMATION
+
+
+@app.command( names = ["print_consensus_sweep", "consensus_sweep"], folder = constants.F_EXTRA )
+def print_consensus_sweep( cutoffs: Optional[List[float]] = None, splits: bool = False ) -> EChanges:
+    """
+    Prints the number of viable splits for a range of cutoffs.
+    
+    The evidence is only collected once (and is reused if `create_consensus` has already been run),
+    the model's consensus is not changed.
+    Since the evidence is recorded on the model's splits, this is not in the `F_PRINT` folder, whose commands must not
+    change the model (see `global_view.edit_model`).
+    
+    :param cutoffs: Cutoffs to try.
+                    If not specified, every cutoff at which the set of viable splits changes is listed.
+    :param splits:  Also list the viable splits for each cutoff.
+    """
+    model = global_view.current_model()
+    
+    candidates = sorted( __get_evidenced_splits( model ), key = lambda x: x.evidence_frequency )
+    frequencies = [x.evidence_frequency for x in candidates]
+    
+    if not cutoffs:
+        cutoffs = [0.0] + sorted( set( frequencies ) )
+    
+    for cutoff in cutoffs:
+        # Splits are viable if `frequency > cutoff`, i.e. everything right of the insertion point
+        first = bisect.bisect_right( frequencies, cutoff )
+        print( "cutoff {}: {} of {} splits are viable".format( cutoff, len( candidates ) - first, len( model.splits ) ) )
+        
+        if splits:
+            print( "    {}".format( string_helper.format_array( candidates[first:], sort = True ) ) )
+    
+    return EChanges.INFORMATION
+
+
+def __get_viable_splits( model: Model, cutoff: float ) -> Set[Split]:
+    """
+    Returns the splits in the `model` that are viable at the specified `cutoff`.
+    """
+    viable_splits: Set[Split] = set()
+    
+    for split in __get_evidenced_splits( model ):
+        frequency: float = split.evidence_frequency
+        accept: bool = frequency > cutoff
+        
+        __LOG_EVIDENCE( "{} {} = {}%",
+                        "✔" if accept else "✘",
+                        ansi_helper.ljust( str( split ), 80 ),
+                        int( frequency * 100 ) )
+        
+        if accept:
+            viable_splits.add( split )
+    
+    return viable_splits
+
+
+def __get_evidenced_splits( model: Model ) -> List[Split]:
+    """
+    Returns the non-empty splits in the `model`, collecting their evidence if this hasn't been done already.
+    """
+    if model.get_status( STAGES.SPLITS_10 ).is_not_complete:
+        raise NotReadyError( "Cannot collect the consensus evidence because the «{}» stage is not complete. Perhaps you meant to complete that stage first?".format( STAGES.SPLITS_10 ) )
+    
+    r = []
+    
+    for split in model.splits:
+        assert isinstance( split, Split ), split
+        
+        if split.split.is_empty:
+            __LOG_EVIDENCE( "SPLIT IS EMPTY: {}".format( split ) )
+            continue
+        
+        if not split.has_evidence:
+            __collect_evidence( model, split )
+        
+        r.append( split )
+    
+    return r
+
+
+def __collect_evidence( model: Model, split: Split ) -> None:
+    """
+    Determines which components support, reject, or cannot evidence the `split`.
+    The result is stored on the `split` itself.
+    """
+    evidence_for = set()
+    evidence_against = set()
+    evidence_unused = set()
+    num_compared = 0
+    
+    for component in model.components:
+        component_splits = component.splits
+        has_evidence = None
+        
+        for component_split in component_splits:
+            evidence = split.is_evidenced_by( component_split )
+            num_compared += 1
+            
+            if evidence is True:
+                has_evidence = True
+                break
+            elif evidence is False:
+                has_evidence = False
+        
+        if has_evidence is True:
+            evidence_for.add( component )
+        elif has_evidence is False:
+            evidence_against.add( component )
+        else:
+            evidence_unused.add( component )
+    
+    model_profile.count( "splits compared", num_compared )
+    
+    if not evidence_for:
+        raise LogicError( "There is no evidence for (F{} A{} U{}) this split «{}», but the split must have come from somewhere.".format( len( evidence_for ), len( evidence_against ), len( evidence_unused ), split ) )
+    
+    split.evidence_for = frozenset( evidence_for )
+    split.evidence_against = frozenset( evidence_against )
+    split.evidence_unused = frozenset( evidence_unused )
+    
+    __LOG_EVIDENCE( "{} -- FOR: ({}) {}, AGAINST: ({}) {}, UNUSED: ({}) {}",
+                    ansi_helper.ljust( str( split ), 80 ),
+                    len( evidence_for ),
+                    string_helper.format_array( evidence_for, sort = True ),
+                    len( evidence_against ),
+                    string_helper.format_array( evidence_against, sort = True ),
+                    len( evidence_unused ),
+                    string_helper.format_array( evidence_unused, sort = True ) )
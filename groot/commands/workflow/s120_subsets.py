@@ -18,7 +18,7 @@ def drop_subsets():
     model = global_view.current_model()
     model.get_status( STAGES.SUBSETS_12 ).assert_drop()
     
-    model.subsets = frozenset()
+    model.subsets = None
     
     return EChanges.COMP_DATA
 
@@ -52,75 +52,131 @@ def create_subsets( no_super: bool = True ):
     
     model = global_view.current_model()
     
-    # Check we are good to go
-    model.get_status( STAGES.SUBSETS_12 ).assert_create()
-    
-    # Define our output variables
-    all_gene_sets: Set[FrozenSet[INode]] = set()
-    gene_set_to_fusion: Dict[FrozenSet[INode], List[Point]] = defaultdict( list )
-    
-    # Iterate over the fusion points 
-    for event in model.fusions:  # type: Fusion
-        for formation in event.formations:
-            for point in formation.points:
-                # Each fusion point splits the graph into two halves ("inside" and "outside" that point)
-                # Each half defines one of our subgraphs.
-                pertinent_inner = frozenset( point.formation.pertinent_inner )
-                pertinent_outer = frozenset( point.pertinent_outer )
-                all_gene_sets.add( pertinent_inner )
-                all_gene_sets.add( pertinent_outer )
-                
-                # Note that multiple points may define the same graphs, we don't want these
-                # extra graphs, so we remember which points define which graphs. 
-                gene_set_to_fusion[pertinent_inner].append( point )
-                gene_set_to_fusion[pertinent_outer].append( point )
-    
-    to_remove = set()
-    
-    # Drop any useless gene sets
-    
-    for gene_set in all_gene_sets:
-        # Drop EMPTY gene sets
-        if not any( isinstance( x, Gene ) for x in gene_set ):
-            __LOG( "DROP GENE SET (EMPTY): {}", gene_set )
-            to_remove.add( gene_set )
-            continue
+    with model.get_status( STAGES.SUBSETS_12 ).profile():
+        # Check we are good to go
+        model.get_status( STAGES.SUBSETS_12 ).assert_create()
         
-        # Drop gene sets that are a SUPERSET of another
-        if no_super:
-            remaining = set( gene_set )
-            
-            for gene_set_2 in all_gene_sets:
-                if gene_set_2 is not gene_set:
-                    if gene_set_2.issubset( gene_set ):
-                        remaining -= gene_set_2
+        # Define our output variables
+        all_gene_sets: Set[FrozenSet[INode]] = set()
+        gene_set_to_fusion: Dict[FrozenSet[INode], List[Point]] = defaultdict( list )
+        
+        # Iterate over the fusion points 
+        for event in model.fusions:  # type: Fusion
+            for formation in event.formations:
+                for point in formation.points:
+                    # Each fusion point splits the graph into two halves ("inside" and "outside" that point)
+                    # Each half defines one of our subgraphs.
+                    pertinent_inner = frozenset( point.formation.pertinent_inner )
+                    pertinent_outer = frozenset( point.pertinent_outer )
+                    all_gene_sets.add( pertinent_inner )
+                    all_gene_sets.add( pertinent_outer )
+                    
+                    # Note that multiple points may define the same graphs, we don't want these
+                    # extra graphs, so we remember which points define which graphs. 
+                    gene_set_to_fusion[pertinent_inner].append( point )
+                    gene_set_to_fusion[pertinent_outer].append( point )
+        
+        to_remove = set()
+        supersets = __find_supersets( all_gene_sets ) if no_super else set()
+        
+        # Drop any useless gene sets
+        
+        for gene_set in all_gene_sets:
+            # Drop EMPTY gene sets
+            if not any( isinstance( x, Gene ) for x in gene_set ):
+                __LOG( "DROP GENE SET (EMPTY): {}", gene_set )
+                to_remove.add( gene_set )
+                continue
             
-            if not remaining:
-                # Gene set is a superset of other sets
+            # Drop gene sets that are a SUPERSET of another
+            if gene_set in supersets:
                 __LOG( "DROP GENE SET (SUPERSET): {}", gene_set )
                 to_remove.add( gene_set )
                 continue
+            
+            # Good gene set (keep)
+            __LOG( "KEEP GENE SET: {}", gene_set )
+            for point in gene_set_to_fusion[gene_set]:
+                __LOG( "    POINT: {}", point )
         
-        # Good gene set (keep)
-        __LOG( "KEEP GENE SET: {}", gene_set )
-        for point in gene_set_to_fusion[gene_set]:
-            __LOG( "    POINT: {}", point )
+        for gene_set in to_remove:
+            all_gene_sets.remove( gene_set )
+        
+        # Finally, complement our gene sets with the fusion points they are adjacent to
+        # We'll need these to know where our graph fits into the big picture
+        results: Set[FrozenSet[INode]] = set()
+        
+        for gene_set in all_gene_sets:
+            new_set = set( gene_set )
+            new_set.update( gene_set_to_fusion[gene_set] )
+            results.add( frozenset( new_set ) )
+        
+        model.subsets = frozenset( Subset( model, i, x ) for i, x in enumerate( results ) )
+        model.get_status( STAGES.SUBSETS_12 ).record( no_super = no_super )
+        
+        return EChanges.MODEL_DATA
+
+
+def __find_supersets( gene_sets: Set[FrozenSet[INode]] ) -> Set[FrozenSet[INode]]:
+    """
+    Finds the gene sets that are entirely covered by the union of the other gene sets they contain.
     
-    for gene_set in to_remove:
-        all_gene_sets.remove( gene_set )
+    :remarks:
+    The sets are visited in size order, so when a set is visited, the index holds only those sets
+    that are smaller than it, i.e. its only candidate subsets. A candidate is a subset if all of its
+    elements were found whilst walking the elements of the visited set. Sets are encoded as
+    bitmasks, so the union of the subsets can be accumulated and compared cheaply.
     
-    # Finally, complement our gene sets with the fusion points they are adjacent to
-    # We'll need these to know where our graph fits into the big picture
-    results: Set[FrozenSet[INode]] = set()
+    This avoids the all-pairs comparison, the work is proportional to the number of
+    (element, containing set) pairs encountered.
+    
+    :param gene_sets:   Gene sets to search 
+    :return:            The gene sets that are supersets of others 
+    """
+    bits: Dict[INode, int] = { }
+    masks: Dict[FrozenSet[INode], int] = { }
+    
+    for gene_set in gene_sets:
+        mask = 0
+        
+        for node in gene_set:
+            mask |= 1 << bits.setdefault( node, len( bits ) )
+        
+        masks[gene_set] = mask
     
-    for gene_set in all_gene_sets:
-        new_set = set( gene_set )
-        new_set.update( gene_set_to_fusion[gene_set] )
-        results.add( frozenset( new_set ) )
+    by_size: Dict[int, List[FrozenSet[INode]]] = defaultdict( list )
     
-    model.subsets = frozenset( Subset( model, i, x ) for i, x in enumerate( results ) )
+    for gene_set in gene_sets:
+        by_size[len( gene_set )].append( gene_set )
+    
+    index: Dict[INode, List[FrozenSet[INode]]] = defaultdict( list )
+    results: Set[FrozenSet[INode]] = set()
+    
+    for size in sorted( by_size ):
+        group = by_size[size]
+        
+        # Query the whole group before adding it to the index, sets of equal size cannot be subsets of each other
+        for gene_set in group:
+            hits: Dict[FrozenSet[INode], int] = defaultdict( int )
+            
+            for node in gene_set:
+                for candidate in index[node]:
+                    hits[candidate] += 1
+            
+            covered = 0
+            
+            for candidate, count in hits.items():
+                if count == len( candidate ):
+                    covered |= masks[candidate]
+            
+            if covered == masks[gene_set]:
+                results.add( gene_set )
+        
+        for gene_set in group:
+            for node in gene_set:
+                index[node].append( gene_set )
     
-    return EChanges.MODEL_DATA
+    return results
 
 
 @app.command( names = ["print_subsets", "subsets"], folder=constants.F_PRINT )
@@ -1,13 +1,13 @@
 from intermake import pr
-from mgraph import analysing
 from mhelper import ComponentFinder, Logger, LogicError, string_helper
-from typing import List
+from typing import Dict, List
 
 from groot import constants
 from groot.application import app
 from groot.constants import STAGES, EChanges
-from groot.data import INode, Pregraph, Subset, global_view
+from groot.data import Component, INode, Pregraph, Subset, global_view
 from groot.utilities import lego_graph
+from groot.utilities.lca_index import LcaIndex
 
 
 LOG = Logger( "pregraphs", False )
@@ -22,18 +22,25 @@ def create_pregraphs():
     """
     model = global_view.current_model()
     
-    # Special case - if no subsets just stop now
-    if model.get_status( STAGES.PREGRAPHS_13 ).is_complete and len( model.subsets ) == 0:
-        pr.printx( "<verbose>No subsets - nothing to do.</verbose>" )
-        return
-    
-    model.get_status( STAGES.PREGRAPHS_13 ).assert_create()
-    
-    for subset in model.subsets:
-        __subset_to_possible_graphs( subset )
-        __assert_recreatable( subset )
-    
-    return EChanges.MODEL_DATA
+    with model.get_status( STAGES.PREGRAPHS_13 ).profile():
+        # Special case - if no subsets just stop now
+        if model.get_status( STAGES.PREGRAPHS_13 ).is_complete and len( model.subsets ) == 0:
+            pr.printx( "<verbose>No subsets - nothing to do.</verbose>" )
+            model.get_status( STAGES.PREGRAPHS_13 ).record()
+            return
+        
+        model.get_status( STAGES.PREGRAPHS_13 ).assert_create()
+        
+        # Index the trees once, rather than searching them for every subset
+        indexes = { component: LcaIndex( component.tree ) for component in model.components }
+        
+        for subset in model.subsets:
+            __subset_to_possible_graphs( subset, indexes )
+            __assert_recreatable( subset )
+        
+        model.get_status( STAGES.PREGRAPHS_13 ).record()
+        
+        return EChanges.MODEL_DATA
 
 
 @app.command( folder = constants.F_DROP )
@@ -67,7 +74,7 @@ def print_pregraphs() -> EChanges:
     return EChanges.INFORMATION
 
 
-def __subset_to_possible_graphs( subset: Subset ):
+def __subset_to_possible_graphs( subset: Subset, indexes: Dict[Component, LcaIndex] ):
     """
     Converts a subset of genes into the possible graphs representing these genes (1 graph per component).
     
@@ -81,13 +88,17 @@ def __subset_to_possible_graphs( subset: Subset ):
         should generally just be boring clades, but occasionally we'll pull a fusion node into them.
         This also causes problems at the supertree stage.
         We address this issue by swapping them out these out for clades.
+    
+    :param subset:  Subset to create the graphs for 
+    :param indexes: Index of each component's tree, used to find the intermediaries without walking the whole tree.  
     """
     graphs: List[Pregraph] = []
     
     LOG( "{} :::: {}", subset, subset.contents )
     
     for component in subset.model.components:
-        intermediaries = analysing.get_intermediaries( component.tree, lambda x: x.data in subset.contents )
+        index = indexes[component]
+        intermediaries = index.get_intermediaries( node for data in subset.contents for node in index.find( data ) )
         
         LOG( "{} :::: {}", subset, component )
         graph = component.tree.copy( nodes = intermediaries )
@@ -1,6 +1,10 @@
+import hashlib
+from os import path
+from intermake import pr
+from intermake.engine.abstract_controller import Controller
 from mgraph import MGraph, MNode
-from mhelper import Logger, SwitchError, string_helper, FunctionInspector
-from typing import Callable, Iterable, Sequence, Union
+from mhelper import Logger, SwitchError, file_helper, string_helper, FunctionInspector
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Union
 
 from groot import constants
 from groot.application import app
@@ -31,52 +35,64 @@ supertree_algorithms = AlgorithmCollection( DAlgorithm, "Supertree" )
 
 
 @app.command( folder = constants.F_CREATE )
-def create_supertrees( algorithm: supertree_algorithms.Algorithm ) -> None:
+def create_supertrees( algorithm: supertree_algorithms.Algorithm, processes: int = 0, cache: bool = True ) -> None:
     """
     Creates the supertrees/subgraphs for the model.
     
     Requisites: `create_pregraphs`
     
     :param algorithm:   Algorithm to use, see `algorithm_help`.
+    :param processes:   Number of subsets to process at once, each in its own process.
+                        External algorithms (such as CLANN) will therefore have this many instances running concurrently.
+                        `0` processes the subsets one at a time in the current process.
+                        `-1` uses one process per CPU.
+                        Parallel processing requires that processes can be forked (i.e. it is not available on Windows).
+    :param cache:       Reuse the result when an algorithm taking Newick is given a set of trees it has seen before.
+                        Results are remembered across sessions, in the `supertrees` folder of the workspace.
     :return:            Nothing is returned, the state is saved into the model. 
     """
     
     # Check we're ready to go
     model = global_view.current_model()
-    model.get_status( STAGES.SUPERTREES_14 ).assert_create()
     
-    # Create the subgraphs 
-    subgraphs = []
-    
-    for subset in model.subsets:
-        subgraph = __create_supertree( algorithm, subset )
+    with model.get_status( STAGES.SUPERTREES_14 ).profile():
+        model.get_status( STAGES.SUPERTREES_14 ).assert_create()
         
-        subgraphs.append( (subset, subgraph) )
-    
-    # Collect the sources and destinations
-    destinations = set()
-    sources = set()
-    
-    for subset, subgraph in subgraphs:
-        sequences = lego_graph.get_sequence_data( subgraph )
-        ffn = lego_graph.get_fusion_formation_nodes( subgraph )
+        # Create the subgraphs 
+        subsets = list( model.subsets )
         
-        if not ffn:
-            raise ValueError( "The subgraph («{}») of the subset «{}» («{}») doesn't appear to have any fusion point nodes. Refusing to continue because this means the subgraph's position in the NRFG is unavailable.".format( string_helper.format_array( subgraph.nodes ), subset, string_helper.format_array( subset.contents ) ) )
+        if processes:
+            supertrees = __create_supertrees_in_parallel( algorithm, subsets, processes, cache )
+        else:
+            supertrees = [__create_supertree( algorithm, subset, cache ) for subset in subsets]
         
-        for node in ffn:  # type:MNode
-            formation: Formation = node.data
+        subgraphs = list( zip( subsets, supertrees ) )
+        
+        # Collect the sources and destinations
+        destinations = set()
+        sources = set()
+        
+        for subset, subgraph in subgraphs:
+            sequences = lego_graph.get_sequence_data( subgraph )
+            ffn = lego_graph.get_fusion_formation_nodes( subgraph )
             
-            if any( x in sequences for x in formation.pertinent_inner ):
-                destinations.add( node.uid )
-            else:
-                sources.add( node.uid )
-    
-    model.subgraphs_destinations = tuple( destinations )
-    model.subgraphs_sources = tuple( sources )
-    model.subgraphs = tuple( Subgraph( subgraph, subset, repr( algorithm ) ) for subset, subgraph in subgraphs )
-    
-    return EChanges.MODEL_DATA
+            if not ffn:
+                raise ValueError( "The subgraph («{}») of the subset «{}» («{}») doesn't appear to have any fusion point nodes. Refusing to continue because this means the subgraph's position in the NRFG is unavailable.".format( string_helper.format_array( subgraph.nodes ), subset, string_helper.format_array( subset.contents ) ) )
+            
+            for node in ffn:  # type:MNode
+                formation: Formation = node.data
+                
+                if any( x in sequences for x in formation.pertinent_inner ):
+                    destinations.add( node.uid )
+                else:
+                    sources.add( node.uid )
+        
+        model.subgraphs_destinations = tuple( destinations )
+        model.subgraphs_sources = tuple( sources )
+        model.subgraphs = tuple( Subgraph( subgraph, subset, repr( algorithm ) ) for subset, subgraph in subgraphs )
+        model.get_status( STAGES.SUPERTREES_14 ).record( algorithm = algorithm )
+        
+        return EChanges.MODEL_DATA
 
 
 @app.command( folder = constants.F_DROP )
@@ -87,9 +103,9 @@ def drop_supertrees() -> EChanges:
     model = global_view.current_model()
     model.get_status( STAGES.SUPERTREES_14 ).assert_drop()
     
-    model.subgraphs = tuple()
-    model.subgraphs_destinations = tuple()
-    model.subgraphs_sources = tuple()
+    model.subgraphs = None
+    model.subgraphs_destinations = None
+    model.subgraphs_sources = None
     
     return EChanges.MODEL_DATA
 
@@ -110,14 +126,181 @@ def print_supertrees() -> EChanges:
     return EChanges.INFORMATION
 
 
-def __create_supertree( algorithm: supertree_algorithms.Algorithm, subset: Subset ) -> MGraph:
+def __create_supertree( algorithm: supertree_algorithms.Algorithm, subset: Subset, cache: bool ) -> MGraph:
     """
     Generates a supertree from a set of trees.
     
     :param algorithm:   Algorithm to use. See `algorithm_help`.
     :param subset:      Subset of genes from which we generate the consensus from 
+    :param cache:       Use the cache (see `__read_cache`).
     :return:            The consensus graph (this may be a reference to one of the input `graphs`)
     """
+    input = __get_input( algorithm, subset )
+    
+    if input is None:
+        return subset.pregraphs[0].graph
+    
+    output = __read_cache( algorithm, input ) if cache else None
+    
+    if output is not None:
+        return __read_output( subset, output )
+    
+    # Run the algorithm!
+    output = external_runner.run_in_temporary( algorithm, input )
+    result = __read_output( subset, output )
+    
+    # Only outputs that could be read are cached
+    if cache:
+        __write_cache( algorithm, input, output )
+    
+    return result
+
+
+_CACHE_VERSION = 2
+"""
+Version of the supertree cache (see `__read_cache`).
+Changing this discards the results cached by earlier versions, e.g. if the way the inputs are written changes.
+"""
+
+__cache: Dict[str, str] = { }
+"""
+Results already read from or written to the cache folder.
+"""
+
+
+def __read_cache( algorithm: supertree_algorithms.Algorithm, input: Union[Subset, str] ) -> Optional[str]:
+    """
+    Obtains the result of a previous call to the `algorithm` with the same Newick `input`.
+    
+    :remarks:
+    This relies on `__get_input`, which puts the input trees into a canonical form, so the same set of trees always
+    results in the same input.
+    Only Newick in and Newick out algorithms are cached, Python algorithms have access to more than just the trees.
+    
+    :return:    The result, or `None` if there is no cached result. 
+    """
+    if not isinstance( input, str ):
+        return None
+    
+    key = __get_cache_key( algorithm, input )
+    result = __cache.get( key )
+    
+    if result is None:
+        file_name = __get_cache_file( key )
+        
+        if path.isfile( file_name ):
+            result = file_helper.read_all_text( file_name )
+            __cache[key] = result
+    
+    return result
+
+
+def __write_cache( algorithm: supertree_algorithms.Algorithm, input: Union[Subset, str], output: Union[str, MGraph] ) -> None:
+    """
+    Records the `output` of the `algorithm` for the `input`, see `__read_cache`.
+    """
+    if not isinstance( input, str ) or not isinstance( output, str ):
+        return
+    
+    key = __get_cache_key( algorithm, input )
+    __cache[key] = output
+    file_helper.write_all_text( __get_cache_file( key ), output )
+
+
+def __get_cache_key( algorithm: supertree_algorithms.Algorithm, input: str ) -> str:
+    """
+    Obtains the key of the cached result of the `algorithm` for the `input`.
+    
+    The key includes the function implementing the algorithm, as well as its name and arguments, so an algorithm
+    registered again with the same name does not receive the results of the previous one, and `_CACHE_VERSION`.
+    """
+    function = "{}.{}".format( getattr( algorithm.function, "__module__", "" ), getattr( algorithm.function, "__qualname__", algorithm.function ) )
+    return hashlib.sha1( "{}\n{}\n{}\n{}".format( _CACHE_VERSION, function, algorithm, input ).encode( "utf-8" ) ).hexdigest()
+
+
+def __get_cache_file( key: str ) -> str:
+    return path.join( Controller.ACTIVE.app.local_data.local_folder( "supertrees" ), key + ".nwk" )
+
+
+__parallel_state = []
+"""
+The algorithm and inputs for `__run_in_worker`.
+This is set before the workers are forked, so they inherit it, along with the model the inputs reference.
+"""
+
+
+def __create_supertrees_in_parallel( algorithm: supertree_algorithms.Algorithm, subsets: List[Subset], processes: int, cache: bool ) -> List[MGraph]:
+    """
+    As `__create_supertree`, for each of the `subsets`, using a pool of `processes` workers.
+    
+    :return:    The consensus graphs, in the same order as `subsets`. 
+    """
+    import multiprocessing
+    
+    if "fork" not in multiprocessing.get_all_start_methods():
+        raise ValueError( "Cannot create the supertrees in parallel because processes cannot be forked on this platform. Please set `processes` to `0`." )
+    
+    inputs = [__get_input( algorithm, subset ) for subset in subsets]
+    outputs = [__read_cache( algorithm, input ) if cache else None for input in inputs]
+    
+    # Each distinct input is only run once
+    firsts = { }
+    to_do = []
+    
+    for index, input in enumerate( inputs ):
+        if input is not None and outputs[index] is None and input not in firsts:
+            firsts[input] = index
+            to_do.append( index )
+    
+    __parallel_state[:] = [algorithm, inputs]
+    
+    try:
+        with multiprocessing.get_context( "fork" ).Pool( processes if processes > 0 else None ) as pool:
+            for index, output in zip( to_do, pr.pr_iterate( pool.imap( __run_in_worker, to_do ), "Creating supertrees", count = len( to_do ) ) ):
+                if isinstance( output, MGraph ):
+                    # Convert the references back (see `__run_in_worker`)
+                    output.format_data( lambda x: lego_graph.import_leaf_reference( x, subsets[index].model, allow_empty = True ) )
+                
+                outputs[index] = output
+    finally:
+        __parallel_state.clear()
+    
+    results = []
+    
+    for subset, input, output in zip( subsets, inputs, outputs ):
+        if input is None:
+            results.append( subset.pregraphs[0].graph )
+        else:
+            results.append( __read_output( subset, output if output is not None else outputs[firsts[input]] ) )
+    
+    # Only outputs that could be read are cached
+    if cache:
+        for index in to_do:
+            __write_cache( algorithm, inputs[index], outputs[index] )
+    
+    return results
+
+
+def __run_in_worker( index: int ) -> Union[str, MGraph]:
+    """
+    Runs the algorithm on the `index`th input of the `__parallel_state` (in a worker process).
+    """
+    algorithm, inputs = __parallel_state
+    output = external_runner.run_in_temporary( algorithm, inputs[index] )
+    
+    # Graph data would arrive as copies of the model's objects, not the objects themselves, so send references instead
+    if isinstance( output, MGraph ):
+        output.format_data( lambda x: x.legacy_accession if x is not None else "" )
+    
+    return output
+
+
+def __get_input( algorithm: supertree_algorithms.Algorithm, subset: Subset ) -> Optional[Union[Subset, str]]:
+    """
+    Obtains the input to the `algorithm` for the `subset`.
+    
+    :return:    The input, or `None` if the algorithm need not be run because the pregraphs are redundant (see `__is_redundant`).  
+    """
     # Get our algorithm
     ins = FunctionInspector( algorithm.function )
     
@@ -129,16 +312,22 @@ def __create_supertree( algorithm: supertree_algorithms.Algorithm, subset: Subse
         input = subset
     else:
         # External algorithms get newick strings for each possible tree in the subset
-        input_lines = __graphs_to_newick( subset.pregraphs )
+        # - Topologically identical trees are only sent once, and the trees are sorted, so the same set of trees
+        #   always results in the same input 
+        input_lines = sorted( set( lego_graph.canonicalise_newick( line ) for line in __graphs_to_newick( subset.pregraphs ) ) )
         
         if __is_redundant( subset.pregraphs, input_lines ):
-            return subset.pregraphs[0].graph
+            return None
         
         input = "\n".join( input_lines ) + "\n"
     
-    # Run the algorithm!
-    output = external_runner.run_in_temporary( algorithm, input )
-    
+    return input
+
+
+def __read_output( subset: Subset, output: Union[str, MGraph] ) -> MGraph:
+    """
+    Reads and checks the output of the supertree algorithm for the `subset`.
+    """
     # We allow two types of result
     # - `MGraph` objects
     # - `str` objects, which denote a newick-formatted string
@@ -205,7 +394,7 @@ def __is_redundant( graphs: Sequence[INamedGraph], input_lines: Sequence[str] )
         # * All graphs contain only one node and that is the same node for all graphs, return that
         return True
     
-    if all( line == input_lines[0] for line in input_lines ):
+    if len( input_lines ) == 1:
         # * All graphs are the same (not a problem but we can speed things up)
         return True
     
@@ -1,5 +1,6 @@
+from collections import defaultdict
 from mgraph import MGraph
-from mhelper import Logger, array_helper, string_helper
+from mhelper import Logger, string_helper
 
 from groot import constants
 from groot.application import app
@@ -23,62 +24,68 @@ def create_fused():
     __LOG.pause( "▒▒▒▒▒▒▒▒▒▒▒▒▒▒▒▒▒▒▒▒ SEW ▒▒▒▒▒▒▒▒▒▒▒▒▒▒▒▒▒▒▒▒" )
     
     model = global_view.current_model()
-    model.get_status( STAGES.FUSE_15 ).assert_create()
     
-    # There is a special case where there is no fusions
-    if len( model.fusions ) == 0 and len( model.components ) == 1:
-        model.fusion_graph_unclean = FusionGraph( model.components[0].tree.copy(), False )
-        return
-    
-    # First, we pull all of our subgraphs ("supertrees") into the nrfg
-    nrfg: MGraph = MGraph()
-    
-    for minigraph in model.subgraphs:
-        minigraph.graph.copy( target = nrfg, merge = True )
-    
-    # Second, we find the fusion points ("formation nodes") and stitch these together
-    fusion_nodes = lego_graph.get_fusion_formation_nodes( nrfg )
-    
-    for an, bn in array_helper.square_comparison( fusion_nodes ):
-        a: Formation = an.data
-        b: Formation = bn.data
+    with model.get_status( STAGES.FUSE_15 ).profile():
+        model.get_status( STAGES.FUSE_15 ).assert_create()
         
-        assert an.uid in model.subgraphs_sources or an.uid in model.subgraphs_destinations
-        assert bn.uid in model.subgraphs_sources or bn.uid in model.subgraphs_destinations
+        # There is a special case where there is no fusions
+        if len( model.fusions ) == 0 and len( model.components ) == 1:
+            model.fusion_graph_unclean = FusionGraph( model.components[0].tree.copy(), False )
+            model.get_status( STAGES.FUSE_15 ).record()
+            return
         
-        a_is_source = an.uid in model.subgraphs_sources
-        b_is_source = bn.uid in model.subgraphs_sources
+        # First, we pull all of our subgraphs ("supertrees") into the nrfg
+        nrfg: MGraph = MGraph()
         
-        assert isinstance( a, Formation )
-        assert isinstance( b, Formation )
+        for minigraph in model.subgraphs:
+            minigraph.graph.copy( target = nrfg, merge = True )
         
-        __LOG( "-----------------------------------" )
-        __LOG( "COMPARING THE NEXT TWO FUSION NODES" )
-        __LOG( "-----------------------------------" )
-        __LOG( "    A: {}", __str_long( a ) )
-        __LOG( "    B: {}", __str_long( b ) )
+        # Second, we find the fusion points ("formation nodes") and stitch these together
+        fusion_nodes = lego_graph.get_fusion_formation_nodes( nrfg )
+        sources = set( model.subgraphs_sources )
+        destinations = set( model.subgraphs_destinations )
         
-        if a.event is not b.event:
-            __LOG( "SKIP (THEY REFERENCE DIFFERENT EVENTS)" )
-            continue
+        # - Index the destinations by event and then by the members of their inner groups, so each source only
+        #   meets the destinations it could match (i.e. the same event and intersecting inner groups)
+        order = { }
+        destination_index = defaultdict( lambda: defaultdict( list ) )
         
-        if b_is_source or not a_is_source:
-            __LOG( "SKIP (DEALING WITH THE A->B TRANSITIONS AND THIS IS B->A)" )
-            continue
+        for index, node in enumerate( fusion_nodes ):
+            assert node.uid in sources or node.uid in destinations
+            assert isinstance( node.data, Formation )
+            
+            order[node] = index
+            
+            if node.uid not in sources:
+                formation: Formation = node.data
+                
+                for element in formation.pertinent_inner:
+                    destination_index[formation.event][element].append( node )
         
-        if not a.pertinent_inner.intersection( b.pertinent_inner ):
-            __LOG( "SKIP (THE INNER GROUPS DON'T MATCH)" )
-            continue
+        for an in fusion_nodes:
+            if an.uid not in sources:
+                continue
+            
+            a: Formation = an.data
+            event_index = destination_index[a.event]
+            matches = set()
+            
+            for element in a.pertinent_inner:
+                matches.update( event_index.get( element, () ) )
+            
+            for bn in sorted( matches, key = order.__getitem__ ):
+                __LOG( "MATCH! (I'M READY TO MAKE THAT EDGE)" )
+                __LOG( "    A: {}", __str_long( a ) )
+                __LOG( "    B: {}", __str_long( bn.data ) )
+                an.add_edge_to( bn )
         
-        __LOG( "MATCH! (I'M READY TO MAKE THAT EDGE)" )
-        an.add_edge_to( bn )
-    
-    __LOG.pause( "NRFG AFTER SEWING ALL:" )
-    __LOG( nrfg.to_ascii() )
-    __LOG.pause( "END OF SEW" )
-    
-    model.fusion_graph_unclean = FusionGraph( nrfg, False )
-    return EChanges.MODEL_DATA
+        __LOG.pause( "NRFG AFTER SEWING ALL:" )
+        __LOG( nrfg.to_ascii() )
+        __LOG.pause( "END OF SEW" )
+        
+        model.fusion_graph_unclean = FusionGraph( nrfg, False )
+        model.get_status( STAGES.FUSE_15 ).record()
+        return EChanges.MODEL_DATA
 
 
 @app.command( folder = constants.F_DROP )
@@ -1,5 +1,8 @@
+import heapq
+from collections import deque
 from mgraph import MGraph, MNode, analysing
-from mhelper import Logger, LoopDetector, SwitchError
+from mhelper import Logger, SwitchError
+from typing import Dict, Optional, Tuple
 
 from groot.constants import STAGES, EChanges
 from groot.data import EPosition, FusionGraph, Formation, Point, Gene, global_view
@@ -19,16 +22,19 @@ def create_cleaned():
     Requisites: `create_fused`
     """
     model = global_view.current_model()
-    model.get_status( STAGES.CLEAN_16 ).assert_create()
-    nrfg = model.fusion_graph_unclean.graph.copy()
     
-    __remove_redundant_fusions( nrfg )
-    __remove_redundant_clades( nrfg )
-    __make_fusions_rootlets( nrfg )
-    __make_outgroup_parents_roots( nrfg )
-    
-    model.fusion_graph_clean = FusionGraph( nrfg, True )
-    return EChanges.MODEL_DATA
+    with model.get_status( STAGES.CLEAN_16 ).profile():
+        model.get_status( STAGES.CLEAN_16 ).assert_create()
+        nrfg = model.fusion_graph_unclean.graph.copy()
+        
+        __remove_redundant_fusions( nrfg )
+        __remove_redundant_clades( nrfg )
+        __make_fusions_rootlets( nrfg )
+        __make_outgroup_parents_roots( nrfg )
+        
+        model.fusion_graph_clean = FusionGraph( nrfg, True )
+        model.get_status( STAGES.CLEAN_16 ).record()
+        return EChanges.MODEL_DATA
 
 
 @app.command( folder = constants.F_DROP )
@@ -69,6 +75,9 @@ def __make_fusions_rootlets( nrfg: MGraph ) -> None:
     """
     LOG( "Fixing fusion rootlets" )
     
+    # Only edge directions change in this pass, so the nearest sequences can be found up-front
+    nearest = __find_nearest_sequences( nrfg )
+    
     for node in nrfg:
         if lego_graph.is_formation( node ):
             LOG( "Fix fusion edges: {}".format( node ) )
@@ -82,13 +91,17 @@ def __make_fusions_rootlets( nrfg: MGraph ) -> None:
             
             for edge in list( node.edges ):
                 oppo = edge.opposite( node )
+                end, via = nearest.get( oppo, (None, node) )
                 
-                path = analysing.find_shortest_path( graph = nrfg,
-                                                     start = oppo,
-                                                     end = lego_graph.is_sequence_node,
-                                                     filter = lambda x: x is not node )
+                if via is node:
+                    # The nearest sequence is found through the fusion itself, which we must not cross (or there is no sequence) 
+                    path = analysing.find_shortest_path( graph = nrfg,
+                                                         start = oppo,
+                                                         end = lego_graph.is_sequence_node,
+                                                         filter = lambda x: x is not node )
+                
+                    end = path[-1]
                 
-                end = path[-1]
                 assert lego_graph.is_sequence_node( end )
                 
                 if end.data in major:
@@ -106,26 +119,66 @@ def __make_fusions_rootlets( nrfg: MGraph ) -> None:
                     edge.ensure( oppo, node )
 
 
+def __find_nearest_sequences( nrfg: MGraph ) -> Dict[MNode, Tuple[MNode, Optional[MNode]]]:
+    """
+    Finds the nearest sequence to every node, using a single breadth first search starting from all the sequences.
+    
+    :return:    Dictionary of each node against a tuple of:
+                    * the nearest sequence
+                    * the next node on the path to that sequence (`None` for the sequences themselves)
+                Nodes with no path to a sequence are not included.  
+    """
+    results = { }
+    queue = deque()
+    
+    for node in nrfg:
+        if lego_graph.is_sequence_node( node ):
+            results[node] = node, None
+            queue.append( node )
+    
+    while queue:
+        node = queue.popleft()
+        sequence = results[node][0]
+        
+        for relation in node.relations:
+            if relation not in results:
+                results[relation] = sequence, node
+                queue.append( relation )
+    
+    return results
+
+
 def __remove_redundant_clades( nrfg: MGraph ) -> None:
     """
     Remove redundant clades (clades which aren't the root and have only two edges)
     """
     LOG( "Fixing redundant clades" )
-    safe = LoopDetector( nrfg.nodes.__len__() + 10, invert = True )
     
-    # Repeat until nothing more changes
-    while safe():
-        for node in nrfg:  # type:MNode
-            if lego_graph.is_clade( node ):
-                if lego_graph.is_root( node ):
-                    LOG( "Node is root: {}", node )
-                    continue
+    # Removing a clade only affects its relations, so only these need checking again.
+    # Nodes are always visited in graph order, as if the graph was rescanned after each removal.
+    order = { node: index for index, node in enumerate( nrfg ) }
+    to_do = list( index for node, index in order.items() if lego_graph.is_clade( node ) )
+    nodes = list( order )
+    removed = set()
                 
-                if node.num_relations == 2:
-                    LOG( "Remove redundant clade: {}", node )
-                    node.remove_node_safely( directed = False )
-                    safe.persist()
-                    break
+    while to_do:
+        node = nodes[heapq.heappop( to_do )]
+        
+        if node in removed or not lego_graph.is_clade( node ):
+            continue
+        
+        if lego_graph.is_root( node ):
+            LOG( "Node is root: {}", node )
+            continue
+        
+        if node.num_relations == 2:
+            LOG( "Remove redundant clade: {}", node )
+            relations = list( node.relations )
+            node.remove_node_safely( directed = False )
+            removed.add( node )
+            
+            for relation in relations:
+                heapq.heappush( to_do, order[relation] )
 
 
 def __remove_redundant_fusions( nrfg: MGraph ) -> None:
@@ -143,25 +196,36 @@ def __remove_redundant_fusions( nrfg: MGraph ) -> None:
                                                                         
     """
     LOG( "Fixing redundant fusions" )
-    safe = LoopDetector( nrfg.nodes.__len__() + 10, invert = True )
     
-    # Repeat until nothing more changes
-    while safe():
-        for node in nrfg:  # type: MNode
-            if lego_graph.is_formation( node ):
-                for relation in node.relations:  # type: MNode
-                    if lego_graph.is_formation( relation ):
-                        # So we have a fusion next to a fusion
-                        for child in node.children:
-                            relation.try_add_edge_to( child )
+    # As `__remove_redundant_clades`, only the relations of a removed fusion need checking again
+    order = { node: index for index, node in enumerate( nrfg ) }
+    to_do = list( index for node, index in order.items() if lego_graph.is_formation( node ) )
+    nodes = list( order )
+    removed = set()
                         
-                        for parent in node.parents:
-                            parent.try_add_edge_to( relation )
+    while to_do:
+        node = nodes[heapq.heappop( to_do )]
                         
-                        LOG( "Remove redundant fusion: {}", node )
-                        node.remove_node()
-                        safe.persist()
-                        break  # relation
+        if node in removed:
+            continue
             
-            if safe.check:  # list changed during iteration
-                break
+        for relation in node.relations:  # type: MNode
+            if lego_graph.is_formation( relation ):
+                # So we have a fusion next to a fusion
+                relations = list( node.relations )
+
+                for child in node.children:
+                    relation.try_add_edge_to( child )
+                
+                for parent in node.parents:
+                    parent.try_add_edge_to( relation )
+                
+                LOG( "Remove redundant fusion: {}", node )
+                node.remove_node()
+                removed.add( node )
+                
+                for other in relations:
+                    if lego_graph.is_formation( other ):
+                        heapq.heappush( to_do, order[other] )
+                
+                break  # relation
@@ -17,7 +17,18 @@ class Stage:
                   requires: Tuple["Stage", ...],
                   status: Callable[[_Model_], Iterable[bool]],
                   hot = False,
-                  cold = False ):
+                  cold = False,
+                  content: Callable[[_Model_], Iterable[object]] = None,
+                  inputs: Tuple["Stage", ...] = () ):
+        """
+        CONSTRUCTOR
+        
+        :param content: For stages holding data provided by the user (rather than derived from the preceding stages),
+                        this obtains that data, which is then used to fingerprint the stage (see `ModelStatus.fingerprint`).
+        :param inputs:  Stages this stage is created from, in addition to those it `requires`, but which need not be
+                        complete (e.g. the outgroups). These are included in the stage's fingerprint
+                        (see `ModelStatus.get_fingerprint`).
+        """
         assert isinstance( requires, tuple )
         
         self.name = name
@@ -27,11 +38,31 @@ class Stage:
         self.status = status
         self.hot = hot
         self.cold = cold
+        self.content = content
+        self.inputs = inputs
         self.index = len( StageCollection.INSTANCE )
     
     
     def __str__( self ):
         return self.name
+    
+    
+    def __reduce__( self ):
+        # Stages are singletons (and hold lambdas), so these are pickled by their name in `STAGES`
+        key = next( k for k, v in vars( StageCollection.INSTANCE ).items() if v is self )
+        return _get_stage, (key,)
+
+
+def _get_stage( key: str ) -> Stage:
+    return getattr( StageCollection.INSTANCE, key )
+
+
+def _get_edge_content( edge ) -> Tuple[str, int, int, str, int, int]:
+    """
+    Obtains the content of an edge, for fingerprinting.
+    This uses the accessions, since `str( edge )` follows the user's choice of gene names (see `options().gene_namer`).
+    """
+    return edge.left.gene.accession, edge.left.start, edge.left.end, edge.right.gene.accession, edge.right.start, edge.right.end
 
 
 def M( m: object ) -> _Model_:
@@ -59,17 +90,20 @@ class StageCollection:
                                      icon = resources.black_gene,
                                      status = lambda m: itertools.chain( (bool( M( m ).edges ),), (bool( x.site_array ) for x in M( m ).genes) ),
                                      headline = lambda m: "{} of {} sequences with site data. {} edges".format( M( m ).genes.num_fasta, M( m ).genes.__len__(), M( m ).edges.__len__() ),
-                                     requires = () )
+                                     requires = (),
+                                     content = lambda m: itertools.chain( ((x.accession, x.site_array) for x in M( m ).genes), (_get_edge_content( x ) for x in M( m ).edges) ) )
         self.SEQUENCES_2 = Stage( "Fasta",
                                   icon = resources.black_gene,
                                   headline = lambda m: "{} of {} sequences with site data".format( M( m ).genes.num_fasta, M( m ).genes.__len__() ),
                                   requires = (),
-                                  status = lambda m: [bool( x.site_array ) for x in M( m ).genes] )
+                                  status = lambda m: [bool( x.site_array ) for x in M( m ).genes],
+                                  content = lambda m: ((x.accession, x.site_array) for x in M( m ).genes) )
         self.SIMILARITIES_3 = Stage( "Blast",
                                      icon = resources.black_edge,
                                      status = lambda m: (bool( M( m ).edges ),),
                                      headline = lambda m: "{} edges".format( M( m ).edges.__len__() ),
-                                     requires = () )
+                                     requires = (),
+                                     content = lambda m: (_get_edge_content( x ) for x in M( m ).edges) )
         self.MAJOR_4 = Stage( "Major",
                               icon = resources.black_major,
                               status = lambda m: (M( m ).components.has_major_gene_got_component( x ) for x in M( m ).genes),
@@ -94,12 +128,14 @@ class StageCollection:
                                    icon = resources.black_outgroup,
                                    status = lambda m: (any( x.is_positioned for x in M( m ).genes ),),
                                    headline = lambda m: "{} outgroups".format( sum( x.is_positioned for x in M( m ).genes ) ),
-                                   requires = (self.SEQ_AND_SIM_ps,) )
+                                   requires = (self.SEQ_AND_SIM_ps,),
+                                   content = lambda m: ((x.accession, x.position) for x in M( m ).genes) )
         self.TREES_8 = Stage( "Trees",
                               icon = resources.black_tree,
-                              status = lambda m: (x.tree is not None for x in M( m ).components),
+                              status = lambda m: (x.packed_tree is not None for x in M( m ).components),
                               headline = lambda m: "{} of {} components have a tree".format( M( m ).components.num_trees, M( m ).components.count ),
-                              requires = (self.ALIGNMENTS_7,) )
+                              requires = (self.ALIGNMENTS_7,),
+                              inputs = (self.OUTGROUPS_7b,) )
         self.FUSIONS_9 = Stage( "Fusions",
                                 icon = resources.black_fusion,
                                 status = lambda m: (M( m ).fusions is not None,),
@@ -124,7 +160,7 @@ class StageCollection:
                                  status = lambda m: (M( m ).subsets is not None,),
                                  icon = resources.black_subset,
                                  headline = lambda m: "{} subsets".format( M( m ).subsets.__len__() ) if M( m ).subsets else "(None)",
-                                 requires = (self.FUSIONS_9,) )
+                                 requires = (self.CONSENSUS_11,) )
         self.PREGRAPHS_13 = Stage( "Pregraphs",
                                    status = lambda m: () if M( m ).subsets is None else (True,) if len( M( m ).subsets ) == 0 else ((x.pregraphs is not None) for x in M( m ).subsets),
                                    icon = resources.black_pregraph,
@@ -226,6 +262,7 @@ APP_NAME = "Groot"
 # File extensions
 #
 EXT_MODEL = ".{}".format( APP_NAME.lower() )
+EXT_JOURNAL = ".{}-journal".format( APP_NAME.lower() )
 EXT_JSON = ".json"
 EXT_FASTA = ".fasta"
 EXT_BLAST = ".blast"
@@ -36,9 +36,18 @@ from .exceptions import \
     AlreadyError, \
     NotReadyError
 
+from .model_journal import \
+    ModelJournal
+
+from .model_trees import \
+    PackedTree
+
+from .model_profile import \
+    StageProfile
+
 from . import global_view
 
-from .global_view import current_model
+from .global_view import current_model, use_model, ModelHandle
 
 from groot.data.config import options
 
@@ -0,0 +1,44 @@
+"""
+Variables local to the current context, see `ContextVar`.
+
+Groot only relies on each thread being a separate context. Asyncio tasks are only separate contexts from Python 3.7,
+so running Groot's commands from several asyncio tasks on the same thread at once is not supported.
+"""
+import threading
+from typing import Generic, TypeVar
+
+
+T = TypeVar( "T" )
+
+try:
+    from contextvars import ContextVar
+except ImportError:
+    # Python 3.6 doesn't have `contextvars`, each thread is a separate context
+    class ContextVar( Generic[T] ):
+        """
+        The subset of `contextvars.ContextVar` used by Groot, for Python 3.6.
+        Each thread has its own value, so unlike `contextvars`, asyncio tasks on the same thread share values.
+        """
+        
+        
+        def __init__( self, name: str, *, default: T ) -> None:
+            self.name = name
+            self.__default = default
+            self.__local = threading.local()
+        
+        
+        def get( self ) -> T:
+            return getattr( self.__local, "value", self.__default )
+        
+        
+        def set( self, value: T ) -> object:
+            """
+            :return: The token to pass to `reset`.
+            """
+            token = self.get()
+            self.__local.value = value
+            return token
+        
+        
+        def reset( self, token: object ) -> None:
+            self.__local.value = token
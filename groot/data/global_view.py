@@ -1,27 +1,269 @@
-from mhelper import exception_helper
+"""
+Holds the models, see `current_model`.
+
+Groot holds a registry of named models (see `ModelHandle`), of which one is selected (see `select_model`).
+The current model is the selected model, unless the code is running within `use_model`, which sets the model for the
+current thread, so that several models can be used at once.
+
+The current model may be edited in place (as the CLI does) or, when it must remain readable whilst a command runs
+(as the GUI does), through a snapshot, see `edit_model`.
+"""
+import pickle
+import threading
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional, Tuple, TypeVar, Union
+
+from mhelper import exception_helper, NotFoundError
+from groot.data.context_vars import ContextVar
 from groot.data.model import Model
 
 
+T = TypeVar( "T" )
+
+DEFAULT_NAME = "default"
+"""
+Name of the model selected when Groot starts.
+"""
+
+
+class ModelHandle:
+    """
+    A named model.
+    
+    The model itself may be replaced (e.g. by `file_load`), whilst the handle remains the same.
+    
+    :ivar name:     Name of the model, or `None` for a model used without being registered (see `use_model`).
+    :ivar model:    The model (the last committed, see `edit_model`).
+    :ivar wizard:   The wizard running on the model, see `Wizard.get_active`.
+    :ivar lock:     Held whilst the model is being edited (see `edit_model`), so there is only one editor at a time.
+    """
+    
+    
+    def __init__( self, name: Optional[str], model: Model ) -> None:
+        self.name = name
+        self.model = model
+        self.wizard = None
+        self.lock = threading.RLock()
+    
+    
+    def __str__( self ) -> str:
+        return "{}: {}".format( self.name, self.model )
+
+
+__handles: Dict[str, ModelHandle] = { }
+"""
+The registry of models, by name.
+"""
 
-__model: Model = None
+__selected = ModelHandle( DEFAULT_NAME, Model() )
+__handles[DEFAULT_NAME] = __selected
+
+__lock = threading.RLock()
+"""
+Held whilst changing the registry.
+"""
+
+__context_handle = ContextVar( "groot_model", default = None )
+"""
+The model used by the current context (see `use_model`), or `None` to use the selected model.
+"""
+
+__context_snapshot = ContextVar( "groot_snapshot", default = None )
+"""
+The snapshot being edited by the current context (see `edit_model`), as a tuple of the handle and the snapshot.
+"""
+
+
+def current_handle() -> ModelHandle:
+    """
+    Obtains the handle of the current model.
+    """
+    handle = __context_handle.get()
+    
+    if handle is not None:
+        return handle
+    
+    return __selected
 
 
 def current_model() -> Model:
-    if __model is None:
-        new_model()
+    """
+    Obtains the current model.
     
-    return __model
+    Within `edit_model` this is the snapshot being edited, otherwise it is the last model committed.
+    """
+    handle = current_handle()
+    snapshot = __context_snapshot.get()
+    
+    if snapshot is not None and snapshot[0] is handle:
+        return snapshot[1]
+    
+    return handle.model
 
 
 def set_model( model: Model ):
+    """
+    Replaces the current model.
+    Within `edit_model` this replaces the snapshot, which will replace the current model when committed.
+    """
     exception_helper.safe_cast( "model", model, Model )
-    global __model
-    __model = model
-    return __model
+    handle = current_handle()
+    snapshot = __context_snapshot.get()
+    
+    if snapshot is not None and snapshot[0] is handle:
+        __context_snapshot.set( (handle, model) )
+        return model
+    
+    with handle.lock:
+        handle.model = model
+    
+    return model
 
 
 def new_model():
     set_model( Model() )
 
 
-new_model()
+def open_model( name: str, model: Optional[Model] = None ) -> ModelHandle:
+    """
+    Obtains a model from the registry, adding it if necessary.
+    
+    :param name:    Name of the model.
+    :param model:   Model to add, replacing any model of the same name.
+                    If not specified, the model of this name is obtained, or a new model is created if there isn't one.
+    :return:        The handle of the model.
+    """
+    with __lock:
+        handle = __handles.get( name )
+        
+        if handle is None:
+            handle = ModelHandle( name, model if model is not None else Model() )
+            __handles[name] = handle
+        elif model is not None:
+            with handle.lock:
+                handle.model = model
+        
+        return handle
+
+
+def close_model( name: str ) -> None:
+    """
+    Removes a model from the registry.
+    Contexts still using the model (see `use_model`) may continue to do so.
+    
+    :param name:    Name of the model. This cannot be the selected model.
+    """
+    with __lock:
+        handle = __get_registered( name )
+        
+        if handle is __selected:
+            raise ValueError( "Cannot close the model «{}» because it is the selected model.".format( name ) )
+        
+        del __handles[name]
+
+
+def list_models() -> List[ModelHandle]:
+    """
+    Obtains the models in the registry, in the order they were added.
+    """
+    with __lock:
+        return list( __handles.values() )
+
+
+def select_model( name: str ) -> ModelHandle:
+    """
+    Selects the model to use outside of `use_model`, adding it to the registry if necessary (see `open_model`).
+    
+    :param name:    Name of the model.
+    :return:        The handle of the model.
+    """
+    global __selected
+    
+    with __lock:
+        __selected = open_model( name )
+        return __selected
+
+
+@contextmanager
+def use_model( model: Union[str, Model, ModelHandle] ) -> Iterator[ModelHandle]:
+    """
+    Within the `with` block, makes `model` the current model of the current thread.
+    Commands called within the block act upon this model, so that several models may be used at once, e.g.::
+    
+        with global_view.use_model( "first" ):
+            groot.file_load( "first.groot" )
+            groot.create_trees( ... )
+    
+    :param model:   Name of a model in the registry, which is added if necessary (see `open_model`), or a model, which
+                    need not be in the registry, or a handle.
+    :return:        Yields the handle of the model.
+    """
+    if isinstance( model, ModelHandle ):
+        handle = model
+    elif isinstance( model, str ):
+        handle = open_model( model )
+    else:
+        exception_helper.safe_cast( "model", model, Model )
+        
+        with __lock:
+            handle = next( (x for x in __handles.values() if x.model is model), None ) or ModelHandle( None, model )
+    
+    token = __context_handle.set( handle )
+    
+    try:
+        yield handle
+    finally:
+        __context_handle.reset( token )
+
+
+@contextmanager
+def edit_model( related: T = None ) -> Iterator[Tuple[Model, T]]:
+    """
+    Edits a snapshot of the current model.
+    
+    Within the `with` block, `current_model` returns the snapshot to the current context, whilst other contexts continue
+    to read the last model committed, which is not modified. At the end of the block the snapshot is committed, becoming
+    the current model in a single step, so other contexts never see a partially created stage.
+    If the block raises an error (including if the command is cancelled) the snapshot is discarded, leaving the current
+    model as it was.
+    
+    There is only one editor of each model at a time, other contexts wait to enter the block.
+    If this context is already editing the model, the existing snapshot is used.
+    
+    :param related:     Objects that may reference the model, usually the arguments of a command.
+                        These are copied along with the model, so that any references are to the snapshot.
+    :return:            Yields a tuple of the snapshot and the copy of `related`.
+    :except ValueError: `related` cannot be copied (pickled). Using it as-is would leave any references to the
+                        committed model, so that the changes would be lost.
+    """
+    handle = current_handle()
+    snapshot = __context_snapshot.get()
+    
+    if snapshot is not None and snapshot[0] is handle:
+        yield snapshot[1], related
+        return
+    
+    with handle.lock:
+        # Pickling is much faster than `copy.deepcopy`, `Model.__getstate__` includes any sections not yet loaded
+        try:
+            snapshot, related = pickle.loads( pickle.dumps( (handle.model, related), pickle.HIGHEST_PROTOCOL ) )
+        except (pickle.PicklingError, TypeError, AttributeError) as ex:
+            raise ValueError( "Cannot edit a snapshot of the model because the related objects cannot be copied along with it ({}). "
+                              "Please make sure these can be pickled, e.g. algorithms must be module-level functions rather than lambdas.".format( ex ) ) from ex
+        
+        token = __context_snapshot.set( (handle, snapshot) )
+        
+        try:
+            yield snapshot, related
+            handle.model = __context_snapshot.get()[1]
+        finally:
+            __context_snapshot.reset( token )
+
+
+def __get_registered( name: str ) -> ModelHandle:
+    handle = __handles.get( name )
+
+    if handle is None:
+        raise NotFoundError( "There is no model named «{}». The models are: {}.".format( name, ", ".join( __handles ) ) )
+    
+    return handle
@@ -6,6 +6,7 @@ from groot.data.model_collections import ComponentCollection, EdgeCollection, Fu
 from groot.data.model_core import FusionGraph, Point, Pregraph, Report, Split, Subgraph, Subset, Gene, Formation, HasTable
 from groot.data.model_interfaces import ESiteType
 from groot.data.model_meta import ModelStatus
+from groot.data.model_profile import StageProfile
 from intermake import Controller
 
 from mhelper import file_helper as FileHelper, string_helper, NOT_PROVIDED
@@ -42,6 +43,9 @@ class Model( HasTable ):
         # Metadata
         self.file_name = None
         self.command_history: List[str] = []
+        self.stage_parameters: Dict[str, Dict[str, object]] = { }
+        self.stage_fingerprints: Dict[str, str] = { }
+        self.stage_profiles: Dict[str, StageProfile] = { }
         self.__seq_type = ESiteType.UNKNOWN
         self.lego_domain_positions: Dict[Tuple[int, int], Dict[str, object]] = { }
         
@@ -52,6 +56,32 @@ class Model( HasTable ):
         self.user_comments = ["MODEL CREATED AT {}".format( string_helper.current_time() )]
     
     
+    def __getattr__( self, name: str ) -> object:
+        """
+        Reads attributes that haven't been loaded yet (see `model_sections`).
+        """
+        if name.startswith( "__" ):
+            raise AttributeError( name )
+        
+        from groot.data import model_sections
+        return model_sections.load_attribute( self, self, name )
+    
+    
+    def __getstate__( self ) -> Dict[str, object]:
+        # Pickling must include the sections that haven't been loaded yet
+        from groot.data import model_sections
+        model_sections.load_all( self )
+        return self.__dict__
+    
+    
+    def __setstate__( self, state: Dict[str, object] ) -> None:
+        # Models saved by older versions of Groot don't have the newer metadata
+        state.setdefault( "stage_parameters", { } )
+        state.setdefault( "stage_fingerprints", { } )
+        state.setdefault( "stage_profiles", { } )
+        self.__dict__.update( state )
+    
+    
     def iter_pregraphs( self ) -> Iterable[Pregraph]:
         """
         Iterates through the model pregraphs.
@@ -75,7 +105,7 @@ class Model( HasTable ):
     
     
     def has_any_tree( self ):
-        return any( x.tree for x in self.components )
+        return any( x.packed_tree is not None for x in self.components )
     
     
     def on_tabulate( self ):
@@ -110,7 +140,7 @@ class Model( HasTable ):
     @property
     def name( self ) -> str:
         from groot.data import global_view
-        if self is not global_view.current_model():
+        if self is not global_view.current_model() and not any( x.model is self for x in global_view.list_models() ):
             return "Not the current model"
         
         if self.file_name:
@@ -161,8 +191,8 @@ class Model( HasTable ):
     
     
     def iter_graphs( self ):
-        yield from (x.named_tree for x in self.components if x.tree is not None)
-        yield from (x.named_tree_unrooted for x in self.components if x.tree_unrooted is not None)
+        yield from (x.named_tree for x in self.components if x.packed_tree is not None)
+        yield from (x.named_tree_unrooted for x in self.components if x.packed_tree_unrooted is not None)
         
         if self.subgraphs:
             yield from self.subgraphs
@@ -113,7 +113,7 @@ class ComponentCollection:
     
     @property
     def num_trees( self ):
-        return sum( x.tree is not None for x in self )
+        return sum( x.packed_tree is not None for x in self )
     
     
     def __bool__( self ):
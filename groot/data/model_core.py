@@ -1,12 +1,13 @@
 import re
 import warnings
 from itertools import combinations, chain
-from typing import Tuple, Optional, List, Iterable, FrozenSet, cast, Any, Set
+from typing import Dict, Tuple, Optional, List, Iterable, FrozenSet, cast, Any, Set
 
 import groot.constants
 from groot.constants import EComponentGraph
 import groot.data.config
 from groot.data.model_interfaces import EPosition, IHasFasta, INamedGraph, INode
+from groot.data.model_trees import PackedTree
 from intermake import Controller
 from mgraph import MGraph, MSplit
 from mhelper import SwitchError, NotFoundError, string_helper, bio_helper, array_helper, TTristate, safe_cast
@@ -343,6 +344,17 @@ class Gene( INode, IHasFasta, HasTable ):
         self.display_name: str = None
     
     
+    def __getattr__( self, name: str ) -> object:
+        """
+        Reads attributes that haven't been loaded yet (see `model_sections`).
+        """
+        if name.startswith( "__" ):
+            raise AttributeError( name )
+        
+        from groot.data import model_sections
+        return model_sections.load_attribute( self.__dict__.get( "model" ), self, name )
+    
+    
     @property
     def is_outgroup( self ):
         return self.position == EPosition.OUTGROUP
@@ -525,6 +537,9 @@ class Component( HasTable ):
                                       i.e. genes only containing domains in :ivar:`minor_domains`
     :ivar tree:                       Tree generated for this component.
                                       * `None` before it has been calculated.
+                                      This, `tree_unrooted` and `tree_unmodified` are stored as `PackedTree`s,
+                                      in `packed_tree`, `packed_tree_unrooted` and `packed_tree_unmodified`
+                                      respectively, and are only created as `MGraph`s when first accessed.
     :ivar alignment:                  Alignment generated for this component, in FASTA format, with genes
                                       referenced by IID "legacy format" (not accession).
                                       * `None` before it has been calculated.
@@ -550,10 +565,61 @@ class Component( HasTable ):
         self.alignment: str = None
         self.splits: FrozenSet[Split] = None
         self.leaves: FrozenSet[INode] = None
-        self.tree: MGraph = None
-        self.tree_unrooted: MGraph = None
+        self.packed_tree: PackedTree = None
+        self.packed_tree_unrooted: PackedTree = None
         self.tree_newick: str = None
-        self.tree_unmodified: MGraph = None
+        self.packed_tree_unmodified: PackedTree = None
+    
+    
+    def __setstate__( self, state: Dict[str, object] ) -> None:
+        # Models saved by older versions of Groot hold the `MGraph`s
+        for name in ("tree", "tree_unrooted", "tree_unmodified"):
+            if name in state:
+                graph = state.pop( name )
+                state["packed_" + name] = PackedTree( graph ) if graph is not None else None
+        
+        self.__dict__.update( state )
+    
+    
+    @property
+    def tree( self ) -> Optional[MGraph]:
+        return self.packed_tree.graph if self.packed_tree is not None else None
+    
+    
+    @tree.setter
+    def tree( self, value: Optional[MGraph] ) -> None:
+        self.packed_tree = PackedTree( value ) if value is not None else None
+    
+    
+    @property
+    def tree_unrooted( self ) -> Optional[MGraph]:
+        return self.packed_tree_unrooted.graph if self.packed_tree_unrooted is not None else None
+    
+    
+    @tree_unrooted.setter
+    def tree_unrooted( self, value: Optional[MGraph] ) -> None:
+        self.packed_tree_unrooted = PackedTree( value ) if value is not None else None
+    
+    
+    @property
+    def tree_unmodified( self ) -> Optional[MGraph]:
+        return self.packed_tree_unmodified.graph if self.packed_tree_unmodified is not None else None
+    
+    
+    @tree_unmodified.setter
+    def tree_unmodified( self, value: Optional[MGraph] ) -> None:
+        self.packed_tree_unmodified = PackedTree( value ) if value is not None else None
+    
+    
+    def __getattr__( self, name: str ) -> object:
+        """
+        Reads attributes that haven't been loaded yet (see `model_sections`).
+        """
+        if name.startswith( "__" ):
+            raise AttributeError( name )
+        
+        from groot.data import model_sections
+        return model_sections.load_attribute( self.__dict__.get( "model" ), self, name )
     
     
     def get_accid( self ):
@@ -577,21 +643,21 @@ class Component( HasTable ):
     
     @property
     def named_tree( self ):
-        if self.tree:
+        if self.packed_tree is not None:
             from groot.data.model_meta import _ComponentAsGraph
             return _ComponentAsGraph( self, EComponentGraph.ROOTED )
     
     
     @property
     def named_tree_unrooted( self ):
-        if self.tree_unrooted:
+        if self.packed_tree_unrooted is not None:
             from groot.data.model_meta import _ComponentAsGraph
             return _ComponentAsGraph( self, EComponentGraph.UNROOTED )
     
     
     @property
     def named_tree_unmodified( self ):
-        if self.tree_unrooted:
+        if self.packed_tree_unrooted is not None:
             from groot.data.model_meta import _ComponentAsGraph
             return _ComponentAsGraph( self, EComponentGraph.UNMODIFIED )
     
@@ -822,6 +888,26 @@ class Split( HasTable ):
         return hash( self.split )
     
     
+    @property
+    def has_evidence( self ) -> bool:
+        """
+        Whether the evidence for this split has been collected (see `create_consensus`).
+        """
+        return self.evidence_for is not None
+    
+    
+    @property
+    def evidence_frequency( self ) -> float:
+        """
+        The proportion of the components providing evidence that support this split.
+        Components that can neither support nor reject the split are not counted.
+        """
+        if not self.has_evidence:
+            raise ValueError( "Cannot obtain the evidence frequency of «{}» because its evidence has not yet been collected.".format( self ) )
+        
+        return len( self.evidence_for ) / (len( self.evidence_for ) + len( self.evidence_against ))
+    
+    
     def is_evidenced_by( self, other: "Split" ) -> TTristate:
         """
         A split is evidenced by an `other` if it is a subset of the `other`.
@@ -0,0 +1,366 @@
+"""
+Append-only journal of the model, see `ModelJournal`.
+"""
+import io
+import itertools
+import pickle
+import sys
+from typing import Callable, Collection, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from groot.constants import STAGES, Stage
+from groot.data.model import Model
+from groot.data.model_core import Component, Domain, Edge, Formation, Fusion, Gene, Point, Split, Subset
+
+
+_Change_ = Tuple[object, str]
+
+_PROTOCOL = 4
+"""
+Pickle protocol of the journal (and of the sectioned files, see `model_sections`).
+"""
+
+_ENTITIES = (Model, Gene, Edge, Component, Domain, Fusion, Formation, Point, Split, Subset)
+"""
+Objects that are only written once.
+Changes to these objects are recorded as changes to their attributes, see `_CHANGES`.
+"""
+
+_METADATA = ("stage_parameters", "stage_fingerprints", "stage_profiles", "command_history")
+"""
+Attributes of the model that are written with every record.
+"""
+
+
+def __each( items: Iterable[object], *attributes: str ) -> Iterator[_Change_]:
+    for item in items:
+        for attribute in attributes:
+            yield item, attribute
+
+
+_CHANGES: Dict[Stage, Callable[[Model], Iterable[_Change_]]] = {
+    STAGES.SEQ_AND_SIM_ps: lambda m: itertools.chain( __each( (m,), "genes", "edges" ), __each( m.genes, "site_array", "length", "display_name" ) ),
+    STAGES.MAJOR_4       : lambda m: __each( (m,), "components" ),
+    STAGES.MINOR_5       : lambda m: __each( m.components, "minor_domains" ),
+    STAGES.DOMAINS_6     : lambda m: __each( (m,), "user_domains" ),
+    STAGES.ALIGNMENTS_7  : lambda m: __each( m.components, "alignment" ),
+    STAGES.OUTGROUPS_7b  : lambda m: __each( m.genes, "position" ),
+    STAGES.TREES_8       : lambda m: __each( m.components, "packed_tree", "packed_tree_unrooted", "tree_newick", "packed_tree_unmodified" ),
+    STAGES.FUSIONS_9     : lambda m: itertools.chain( __each( (m,), "fusions" ), __each( m.components, "packed_tree" ) ),
+    STAGES.SPLITS_10     : lambda m: itertools.chain( __each( (m,), "splits" ), __each( m.components, "splits", "leaves" ) ),
+    STAGES.CONSENSUS_11  : lambda m: itertools.chain( __each( (m,), "consensus" ), __each( m.splits or (), "evidence_for", "evidence_against", "evidence_unused" ) ),
+    STAGES.SUBSETS_12    : lambda m: __each( (m,), "subsets" ),
+    STAGES.PREGRAPHS_13  : lambda m: __each( m.subsets or (), "pregraphs" ),
+    STAGES.SUPERTREES_14 : lambda m: itertools.chain( __each( (m,), "subgraphs", "subgraphs_sources", "subgraphs_destinations" ), __each( m.subsets or (), "pregraphs" ) ),
+    STAGES.FUSE_15       : lambda m: __each( (m,), "fusion_graph_unclean" ),
+    STAGES.CLEAN_16      : lambda m: __each( (m,), "fusion_graph_clean" ),
+    STAGES.CHECKED_17    : lambda m: __each( (m,), "report" ),
+}
+"""
+The attributes set by each stage.
+Note that some stages also modify objects created by the previous stages, these attributes are listed too:
+* `create_fusions` adds the fusion points to the component trees
+* `create_consensus` records the evidence on the splits
+* `create_supertrees` modifies the pregraphs (when writing them to Newick) and may use them as the subgraphs
+"""
+
+
+def _new_entity( index: int, type_: type ) -> object:
+    """
+    Creates the entity `index` the first time it is written, the unpickler then sets its state.
+    Only `_EntityUnpickler` can read this (see `_EntityUnpickler.find_class`).
+    """
+    raise pickle.UnpicklingError( "The entity #{} can only be read by the journal.".format( index ) )
+    
+    
+def _get_entity( index: int ) -> object:
+    """
+    Refers to the entity `index`, which has been written before.
+    Only `_EntityUnpickler` can read this (see `_EntityUnpickler.find_class`).
+    """
+    raise pickle.UnpicklingError( "The entity #{} can only be read by the journal.".format( index ) )
+
+
+class _EntityPickler( pickle.Pickler ):
+    """
+    Pickler that numbers the entities (see `_ENTITIES`) it writes, remembering them across calls to `get_record`, so
+    that each entity is only written once and is referenced by its number thereafter.
+    
+    The first time an entity is written, it is written as a call to `_new_entity` followed by its state, subsequent
+    references are written as a call to `_get_entity`. Both are written through the `dispatch_table`, which the C
+    pickler only consults for the entities (a `persistent_id` would be called for every object written). Objects that
+    are not entities are written in full by every record that references them.
+    
+    :ivar next_index:   Number of the next entity written.
+    """
+    
+    
+    def __init__( self, entities: Dict[int, Tuple[int, object]] = None, next_index: int = 0, types: Iterable[type] = _ENTITIES, omit: Dict[type, Collection[str]] = None ):
+        """
+        :param entities:    Entities that have already been written, as `id( entity ): (number, entity)`.
+        :param next_index:  Number of the next entity written.
+        :param types:       Types of the entities (including subclasses).
+        :param omit:        Attributes of the entities of each type that aren't written with the entity.
+        """
+        self.__buffer = io.BytesIO()
+        self.__entities: Dict[int, Tuple[int, object]] = dict( entities or { } )
+        self.__omit = omit or { }
+        self.next_index = next_index
+        
+        # The C pickler reads the `dispatch_table` when it is constructed
+        self.dispatch_table = { type_: self.__reduce_entity for type_ in _get_subclasses( types ) }
+        super().__init__( self.__buffer, protocol = _PROTOCOL, fix_imports = False )
+    
+    
+    def __reduce_entity( self, obj: object ) -> tuple:
+        entry = self.__entities.get( id( obj ) )
+        
+        if entry is not None:
+            return _get_entity, (entry[0],)
+        
+        index = self.next_index
+        self.next_index += 1
+        self.__entities[id( obj )] = index, obj
+        
+        function, args, state, *rest = obj.__reduce_ex__( _PROTOCOL )
+        omit = self.__omit.get( type( obj ) )
+        
+        if omit and state:
+            state = { key: value for key, value in state.items() if key not in omit }
+        
+        return (_new_entity, (index, type( obj )), state, *rest)
+    
+    
+    def get_record( self, record: object ) -> bytes:
+        """
+        Pickles the `record`.
+        Each record can be read by itself, given the entities written by the preceding records.
+        """
+        self.clear_memo()
+        self.__buffer.seek( 0 )
+        self.__buffer.truncate()
+        self.dump( record )
+        return self.__buffer.getvalue()
+
+
+class _EntityUnpickler( pickle.Unpickler ):
+    """
+    Reads the records written by `_EntityPickler`.
+    
+    :ivar entities: The entities read, by number.
+    """
+    
+    
+    def __init__( self, file, entities: Dict[int, object] = None, on_missing: Callable[[int], None] = None ):
+        """
+        :param file:        File to read from.
+        :param entities:    Entities read from the preceding records, by number.
+        :param on_missing:  Called with the number of an entity that has not been read, to read it into `entities`.
+        """
+        super().__init__( file, fix_imports = False )
+        self.entities: Dict[int, object] = entities if entities is not None else { }
+        self.__on_missing = on_missing
+    
+    
+    def find_class( self, module: str, name: str ) -> object:
+        if module == __name__:
+            if name == _new_entity.__name__:
+                return self.__new_entity
+            elif name == _get_entity.__name__:
+                return self.__get_entity
+            
+        return super().find_class( module, name )
+                
+            
+    def __new_entity( self, index: int, type_: type ) -> object:
+        entity = type_.__new__( type_ )
+        self.entities[index] = entity
+        return entity
+    
+    
+    def __get_entity( self, index: int ) -> object:
+        entity = self.entities.get( index )
+        
+        if entity is None:
+            if self.__on_missing is None:
+                raise pickle.UnpicklingError( "The entity #{} has not been read.".format( index ) )
+            
+            self.__on_missing( index )
+            entity = self.entities[index]
+        
+        return entity
+
+
+def _get_subclasses( types: Iterable[type] ) -> List[type]:
+    """
+    Returns the `types` and all their subclasses.
+    """
+    r = []
+    stack = list( types )
+    
+    while stack:
+        type_ = stack.pop()
+        
+        if type_ not in r:
+            r.append( type_ )
+            stack.extend( type_.__subclasses__() )
+    
+    return r
+
+
+class ModelJournal:
+    """
+    An append-only file holding a model, followed by the changes made to that model by each stage.
+    
+    Saving the whole model after each stage costs time in proportion to the size of the model, which grows with
+    every stage. The journal writes the whole model once, after which each `append` only writes the data set by
+    the specified stages (see `_CHANGES`). Entities that have already been written are referenced, rather than
+    written again (see `_EntityPickler`).
+    
+    Loading replays the records in order.
+    A record that was only partly written (e.g. Groot was closed whilst saving) is ignored.
+    
+    Each record also holds a `header`, allowing the caller to note what had been done when the record was written.
+    
+    :ivar file_name:    Journal file
+    :ivar num_records:  Number of records in the journal, including the initial model
+    """
+    
+    
+    def __init__( self, file_name: str, pickler: _EntityPickler, num_records: int ):
+        """
+        Use `create` or `open`.
+        """
+        self.file_name = file_name
+        self.num_records = num_records
+        self.__pickler = pickler
+    
+    
+    @classmethod
+    def create( cls, file_name: str, model: Model, header: object = None ) -> "ModelJournal":
+        """
+        Creates a new journal, replacing any existing file.
+        
+        :param file_name:   Journal file
+        :param model:       Model, which is written in its entirety.
+        :param header:      Header of the first record
+        :return:            The journal, ready to `append` to.
+        """
+        journal = cls( file_name, _EntityPickler(), 0 )
+        
+        with open( file_name, "wb" ):
+            pass
+        
+        journal.__write( header, model, () )
+        return journal
+    
+    
+    @classmethod
+    def open( cls, file_name: str ) -> Tuple["ModelJournal", Model, object]:
+        """
+        Replays an existing journal and prepares it to be appended to.
+        Any partly written record at the end of the file is removed.
+        
+        :param file_name:   Journal file
+        :return:            Tuple of the journal, the model and the header of the last record.
+        """
+        model, header, num_records, end, entities = _replay( file_name )
+        
+        with open( file_name, "r+b" ) as file:
+            file.truncate( end )
+        
+        pickler = _EntityPickler( { id( obj ): (index, obj) for index, obj in entities.items() }, max( entities ) + 1 if entities else 0 )
+        
+        return cls( file_name, pickler, num_records ), model, header
+    
+    
+    @staticmethod
+    def load( file_name: str ) -> Tuple[Model, object]:
+        """
+        Replays a journal without modifying it.
+        
+        :param file_name:   Journal file
+        :return:            Tuple of the model and the header of the last record.
+        """
+        model, header, _, _, _ = _replay( file_name )
+        return model, header
+    
+    
+    def append( self, model: Model, stages: Iterable[Stage], header: object = None ) -> int:
+        """
+        Appends the data set by the `stages` to the journal.
+        
+        :param model:   Model, which must be the model in the journal.
+        :param stages:  Stages that have been created since the last record.
+        :param header:  Header of the record
+        :return:        Size of the record, in bytes.
+        """
+        changes: List[_Change_] = [(model, attribute) for attribute in _METADATA]
+        
+        for stage in stages:
+            fn = _CHANGES.get( stage )
+            
+            if fn is None:
+                raise ValueError( "Cannot journal the «{}» stage because I don't know which data it creates.".format( stage ) )
+            
+            changes.extend( fn( model ) )
+        
+        values = [(owner, attribute, getattr( owner, attribute )) for owner, attribute in changes]
+        
+        return self.__write( header, model, values )
+    
+    
+    def __write( self, header: object, model: Model, values: object ) -> int:
+        # Same depth allowance as `file_save`
+        sys.setrecursionlimit( 10000 )
+        data = self.__pickler.get_record( (header, model, values) )
+        
+        with open( self.file_name, "ab" ) as file:
+            file.write( data )
+        
+        self.num_records += 1
+        return len( data )
+
+
+def _replay( file_name: str, limit: Optional[int] = None ) -> Tuple[Model, object, int, int, Dict[int, object]]:
+    """
+    Replays the journal.
+    
+    :return: Tuple of the model, the last header, the number of complete records, the file position following the
+             last complete record and the entities read, by number.
+    """
+    model = None
+    header = None
+    num_records = 0
+    end = 0
+    is_partial = False
+    
+    with open( file_name, "rb" ) as file:
+        entities = { }
+        
+        while limit is None or num_records < limit:
+            try:
+                # Each record has its own memo (see `_EntityPickler.get_record`), so each gets its own unpickler
+                header_, model_, values = _EntityUnpickler( file, entities ).load()
+            except EOFError:
+                is_partial = file.tell() != end
+                break
+            except pickle.UnpicklingError:
+                is_partial = True
+                break
+            
+            for owner, attribute, value in values:
+                setattr( owner, attribute, value )
+            
+            model = model_
+            header = header_
+            num_records += 1
+            end = file.tell()
+        
+    if not num_records:
+        raise ValueError( "Cannot load the journal «{}» because it does not contain a complete record.".format( file_name ) )
+    
+    if is_partial:
+        # The entities include those of the partial record, which must not be referenced when appending
+        return _replay( file_name, num_records )
+    
+    return model, header, num_records, end, entities
@@ -1,9 +1,12 @@
-from typing import Optional
+import hashlib
+from typing import ContextManager, Dict, Iterable, Optional
 
 from groot.constants import Stage, STAGES, EComponentGraph
 from groot.data.exceptions import NotReadyError, InUseError
 from groot.data.model_interfaces import IHasFasta, INamedGraph
+from groot.data import model_profile
 from groot.data.model_core import Component
+from groot.data.model_profile import StageProfile
 from mgraph import MGraph
 
 
@@ -114,6 +117,79 @@ class ModelStatus:
                                                 required_stage ) )
     
     
+    def record( self, **parameters: object ) -> None:
+        """
+        Records the `parameters` used to create this stage, along with the stage's fingerprint (see `get_fingerprint`).
+        The `create_*` commands call this after creating their stage, so that `refresh` can tell if the stage needs
+        to be recreated, and how to recreate it.
+        """
+        self.model.stage_parameters[self.stage.name] = parameters
+        self.model.stage_fingerprints[self.stage.name] = self.get_fingerprint( parameters )
+    
+    
+    def profile( self ) -> ContextManager[StageProfile]:
+        """
+        Measures the creation of this stage (see `StageProfile`).
+        The `create_*` commands wrap their work in this, e.g. `with model.get_status( stage ).profile():`.
+        """
+        return model_profile.profile( self.model, self.stage.name )
+    
+    
+    @property
+    def parameters( self ) -> Optional[Dict[str, object]]:
+        """
+        The parameters recorded by `record`, or `None` if they have not been recorded.
+        """
+        return self.model.stage_parameters.get( self.stage.name )
+    
+    
+    @property
+    def fingerprint( self ) -> str:
+        """
+        The fingerprint of this stage's data.
+        
+        For stages with `Stage.content` this is obtained from that content, otherwise this is the fingerprint
+        recorded by `record`, i.e. that of the inputs the stage was created from.
+        """
+        if self.stage.content is not None:
+            summary = _get_summary( self.model, self.stage )
+            
+            if summary is not None:
+                return summary["fingerprint"]
+            
+            return _get_hash( self.stage.content( self.model ) )
+        
+        return self.model.stage_fingerprints.get( self.stage.name, "" )
+    
+    
+    def get_fingerprint( self, parameters: Dict[str, object] = None ) -> str:
+        """
+        Calculates the fingerprint for this stage from its inputs, being the parameters it is created with and the
+        fingerprints of the stages it requires (and any other `Stage.inputs`).
+        
+        :param parameters:  Parameters. If `None` the recorded parameters are used.
+        """
+        if parameters is None:
+            parameters = self.parameters or { }
+        
+        lines = [self.stage.name]
+        lines.extend( "{}={}".format( key, value ) for key, value in sorted( parameters.items() ) )
+        lines.extend( self.model.get_status( requisite ).fingerprint for requisite in self.stage.requires + self.stage.inputs )
+        return _get_hash( lines )
+    
+    
+    @property
+    def is_current( self ) -> bool:
+        """
+        Whether the inputs to this stage are unchanged since it was created.
+        Stages without recorded parameters are assumed to be current.
+        """
+        if self.parameters is None:
+            return True
+        
+        return self.model.stage_fingerprints.get( self.stage.name ) == self.get_fingerprint()
+    
+    
     @property
     def requisite_complete( self ) -> bool:
         for requisite in self.stage.requires:
@@ -137,6 +213,11 @@ class ModelStatus:
     
     
     def get_headline_text( self ):
+        summary = _get_summary( self.model, self.stage )
+        
+        if summary is not None:
+            return summary["headline"]
+        
         return self.stage.headline( self.model ) if self.stage.headline is not None else ""
     
     
@@ -174,6 +255,11 @@ class ModelStatus:
     
     
     def get_elements( self ):
+        summary = _get_summary( self.model, self.stage )
+        
+        if summary is not None:
+            return summary["elements"]
+        
         r = self.stage.status( self.model )
         if r is None:
             return ()
@@ -196,3 +282,21 @@ class ModelStatus:
                 return False
         
         return has_any
+
+
+def _get_summary( model: _LegoModel_, stage: Stage ) -> Optional[Dict[str, object]]:
+    """
+    Obtains the status of the `stage` from the model file, if the data for that stage hasn't been loaded yet.
+    """
+    from groot.data import model_sections
+    return model_sections.get_summary( model, stage )
+
+
+def _get_hash( items: Iterable[object] ) -> str:
+    result = hashlib.sha1()
+    
+    for item in items:
+        result.update( str( item ).encode( "utf-8" ) )
+        result.update( b"\n" )
+    
+    return result.hexdigest()
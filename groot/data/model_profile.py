@@ -0,0 +1,128 @@
+"""
+Measurements of the time and memory taken to create each stage, see `StageProfile`.
+"""
+import sys
+import time
+import tracemalloc
+from contextlib import contextmanager
+from typing import Dict, Iterator, Optional, Tuple
+
+from mhelper import string_helper
+
+from groot.data.context_vars import ContextVar
+
+
+try:
+    import resource
+except ImportError:
+    # Not available on Windows, peak RSS is not recorded
+    resource = None
+
+
+class StageProfile:
+    """
+    Measurements made whilst creating a stage (see `profile`).
+    These are held in `Model.stage_profiles` and shown by `print_profile`.
+    
+    :ivar name:         Name of the stage (or command) profiled
+    :ivar started:      Time profiling started (as `time.time`)
+    :ivar within:       Name of the enclosing profile, if this was measured within another (e.g. a command profiling
+                        itself when called by another command). The enclosing profile includes the time of this one.
+    :ivar wall:         Wall-clock time taken, in seconds
+    :ivar cpu:          CPU time taken by Groot, in seconds.
+                        This does not include external tools or worker processes (see `counters`).
+    :ivar peak_rss:     Peak resident memory of Groot at the end, in bytes, or `None` if not available on this platform.
+    :ivar rss_growth:   Increase in the peak resident memory, in bytes, or `None` if not available on this platform.
+    :ivar traced:       Change in the memory allocated, in bytes, or `None` if `tracemalloc` was not tracing.
+                        `tracemalloc` slows Groot considerably, so it is only used if it has already been started
+                        (e.g. `python -X tracemalloc -m groot`).
+    :ivar counters:     Stage specific counters (see `count`), such as the number of edges scanned or the time spent
+                        in external tools.
+    """
+    
+    
+    def __init__( self, name: str, within: Optional[str] = None ) -> None:
+        self.name = name
+        self.started: float = time.time()
+        self.within: Optional[str] = within
+        self.wall: float = 0
+        self.cpu: float = 0
+        self.peak_rss: Optional[int] = None
+        self.rss_growth: Optional[int] = None
+        self.traced: Optional[int] = None
+        self.counters: Dict[str, float] = { }
+    
+    
+    def __str__( self ):
+        return "{}: {:.3f}s wall, {:.3f}s CPU, {} peak".format( self.name, self.wall, self.cpu, string_helper.format_size( self.peak_rss ) if self.peak_rss is not None else "(unknown)" )
+
+
+_ACTIVE = ContextVar( "groot_profiles", default = () )
+"""
+The profiles being measured by the current context, innermost last.
+Each context has its own, so that models used at once (see `global_view.use_model`) are measured separately.
+"""
+
+
+@contextmanager
+def profile( model, name: str ) -> Iterator[StageProfile]:
+    """
+    Measures the code inside the `with` block, then stores the result in the `model`'s `stage_profiles`.
+    The `create_*` commands use this, via `ModelStatus.profile`.
+    Nothing is stored if the block raises an error, so a failed attempt doesn't replace the previous profile.
+    
+    :param model:   Model
+    :param name:    Name to store the profile under, usually the name of the stage.
+    """
+    active: Tuple[StageProfile, ...] = _ACTIVE.get()
+    result = StageProfile( name, active[-1].name if active else None )
+    start_wall = time.perf_counter()
+    start_cpu = time.process_time()
+    start_rss = __get_peak_rss()
+    
+    if tracemalloc.is_tracing():
+        start_traced = tracemalloc.get_traced_memory()[0]
+    else:
+        start_traced = None
+    
+    token = _ACTIVE.set( active + (result,) )
+    
+    try:
+        yield result
+    finally:
+        _ACTIVE.reset( token )
+    
+    result.wall = time.perf_counter() - start_wall
+    result.cpu = time.process_time() - start_cpu
+    result.peak_rss = __get_peak_rss()
+    
+    if start_rss is not None:
+        result.rss_growth = result.peak_rss - start_rss
+    
+    if start_traced is not None and tracemalloc.is_tracing():
+        result.traced = tracemalloc.get_traced_memory()[0] - start_traced
+    
+    model.stage_profiles[name] = result
+
+
+def count( name: str, amount: float = 1 ) -> None:
+    """
+    Adds to a counter of the profiles being measured.
+    This does nothing if there aren't any, so can be called freely.
+    Counts made in worker processes are not recorded.
+    
+    :param name:    Name of the counter, e.g. "edges scanned".
+    :param amount:  Amount to add.
+    """
+    for profile_ in _ACTIVE.get():
+        profile_.counters[name] = profile_.counters.get( name, 0 ) + amount
+
+
+def __get_peak_rss() -> Optional[int]:
+    if resource is None:
+        return None
+    
+    peak = resource.getrusage( resource.RUSAGE_SELF ).ru_maxrss
+    
+    # Mac reports bytes, Linux reports kilobytes
+    return peak if sys.platform == "darwin" else peak * 1024
@@ -0,0 +1,294 @@
+"""
+Sectioned model files, which are read on demand.
+
+The file is a ZIP archive holding:
+
+* `header.json`:        The format, the list of sections, the entities written by each section and a summary of
+                        each stage's `ModelStatus`.
+* `sections/<name>`:    One section per stage (see `_SECTIONS`), each holding the attributes set by that stage.
+                        The first section, `Model`, holds the remaining attributes of the model.
+
+Loading only reads the header and the `Model` section.
+The other sections are read when one of their attributes is first accessed, for instance `model.components`.
+Each entity (see `_ENTITY_TYPES`) is written by the first section that references it, and the header records which
+entities each section writes. When a section references an entity written by another section (e.g. the trees
+reference the genes), only the section writing that entity is read.
+"""
+import bisect
+import io
+import sys
+import weakref
+from typing import Dict, List, Optional, Set, Tuple
+
+from groot.constants import STAGES, Stage
+from groot.data.model import Model
+from groot.data.model_core import Component, Gene
+from groot.data.model_journal import _ENTITIES, _EntityPickler, _EntityUnpickler
+from mgraph import MGraph
+
+
+FORMAT = 3
+"""
+Version of the file format, in the header.
+"""
+
+_HEADER = "header.json"
+
+_ENTITY_TYPES = _ENTITIES + (MGraph,)
+"""
+Types of the entities in the sections.
+Unlike the journal, graphs are entities too, since the same graph can be referenced by several sections (e.g. a
+subgraph can be the graph of a pregraph).
+"""
+
+
+class _Section:
+    def __init__( self, name: str, stages: Tuple[Stage, ...], model: Tuple[str, ...] = (), component: Tuple[str, ...] = (), gene: Tuple[str, ...] = () ):
+        """
+        :param name:        Name of the section.
+        :param stages:      Stages whose status is determined (in part) by the content of this section.
+        :param model:       Attributes of the `Model` held in the section.
+        :param component:   Attributes of each `Component` held in the section.
+        :param gene:        Attributes of each `Gene` held in the section.
+        """
+        self.name = name
+        self.stages = stages
+        self.model = model
+        self.component = component
+        self.gene = gene
+
+
+_SECTIONS: List[_Section] = [
+    _Section( "Model", (STAGES.FILE_1,) ),
+    _Section( "Data", (STAGES.SEQ_AND_SIM_ps, STAGES.SEQUENCES_2, STAGES.SIMILARITIES_3, STAGES.OUTGROUPS_7b), model = ("genes", "edges") ),
+    _Section( "Sites", (STAGES.SEQ_AND_SIM_ps, STAGES.SEQUENCES_2), gene = ("site_array",) ),
+    _Section( "Major", (STAGES.MAJOR_4,), model = ("components",) ),
+    _Section( "Minor", (STAGES.MINOR_5,), component = ("minor_domains",) ),
+    _Section( "Domains", (STAGES.DOMAINS_6,), model = ("user_domains",) ),
+    _Section( "Alignments", (STAGES.ALIGNMENTS_7,), component = ("alignment",) ),
+    _Section( "Trees", (STAGES.TREES_8,), component = ("packed_tree", "packed_tree_unrooted", "tree_newick", "packed_tree_unmodified") ),
+    _Section( "Fusions", (STAGES.FUSIONS_9, STAGES._POINTS_9b), model = ("fusions",) ),
+    _Section( "Splits", (STAGES.SPLITS_10,), model = ("splits",), component = ("splits", "leaves") ),
+    _Section( "Consensus", (STAGES.CONSENSUS_11,), model = ("consensus",) ),
+    _Section( "Subsets", (STAGES.SUBSETS_12, STAGES.PREGRAPHS_13), model = ("subsets",) ),
+    _Section( "Subgraphs", (STAGES.SUPERTREES_14,), model = ("subgraphs", "subgraphs_sources", "subgraphs_destinations") ),
+    _Section( "Fused", (STAGES.FUSE_15,), model = ("fusion_graph_unclean",) ),
+    _Section( "Cleaned", (STAGES.CLEAN_16,), model = ("fusion_graph_clean",) ),
+    _Section( "Checked", (STAGES.CHECKED_17,), model = ("report",) ),
+    _Section( "User", (), model = ("user_graphs", "user_reports") ),
+]
+"""
+The sections, in the order they are written.
+"""
+
+_ATTRIBUTES: Dict[type, Dict[str, int]] = { Model    : { attribute: index for index, section in enumerate( _SECTIONS ) for attribute in section.model },
+                                             Component: { attribute: index for index, section in enumerate( _SECTIONS ) for attribute in section.component },
+                                             Gene     : { attribute: index for index, section in enumerate( _SECTIONS ) for attribute in section.gene } }
+"""
+Attributes held in the sections, by the type of their owner, as the index of the section holding them.
+"""
+
+_STAGE_SECTIONS: Dict[Stage, List[int]] = { stage: [index for index, section in enumerate( _SECTIONS ) if stage in section.stages] for stage in STAGES }
+"""
+Indices of the sections that determine the status of each stage.
+"""
+
+_OPEN: "weakref.WeakKeyDictionary[Model, _SectionReader]" = weakref.WeakKeyDictionary()
+"""
+Models which have sections that have not yet been read.
+"""
+
+
+class _SectionReader:
+    """
+    Reads the sections of a model on demand.
+    
+    :ivar read_sections:    Indices of the sections that have been read.
+    :ivar entities:         Entities read, by number.
+    """
+    
+    
+    def __init__( self, file_name: str, header: Dict[str, object] ):
+        self.file_name = file_name
+        self.header = header
+        self.read_sections: Set[int] = set()
+        self.entities: Dict[int, object] = { }
+    
+    
+    def read( self, model: Optional[Model], index: int ) -> Model:
+        """
+        Reads a section, if it has not already been read.
+        
+        :param model:   Model, `None` when reading the first (`Model`) section.
+        :param index:   Index of the section.
+        :return:        The model.
+        """
+        import zipfile
+        
+        if index in self.read_sections:
+            return model
+        
+        # Same depth allowance as `file_save`
+        sys.setrecursionlimit( 10000 )
+        
+        with zipfile.ZipFile( self.file_name ) as archive:
+            data = archive.read( "sections/" + _SECTIONS[index].name )
+                
+        # Entities written by other sections are read from those sections (see `__read_entity`)
+        record = _EntityUnpickler( io.BytesIO( data ), self.entities, self.__read_entity ).load()
+        self.read_sections.add( index )
+                
+        if index == 0:
+            model = record
+        else:
+            for owner, attribute, value in record:
+                setattr( owner, attribute, value )
+        
+        if len( self.read_sections ) == len( _SECTIONS ):
+            self.entities = None
+            _OPEN.pop( model, None )
+        
+        return model
+    
+    
+    def __read_entity( self, number: int ) -> None:
+        """
+        Reads the section that writes the entity `number`.
+        The model is always the first entity.
+        """
+        self.read( self.entities[0], bisect.bisect_right( self.header["entities"], number ) )
+
+
+def save_model( file_name: str, model: Model ) -> None:
+    """
+    Writes the `model` to a sectioned file.
+    """
+    import json
+    import zipfile
+    
+    # Any unread sections must be read before the file is replaced
+    load_all( model )
+    
+    summary = { }
+    
+    for stage in STAGES:
+        status = model.get_status( stage )
+        
+        # Not all headlines can be obtained for stages without data
+        summary[stage.name] = { "elements"   : [True] if status.is_complete else [True, False] if status.is_partial else [],
+                                "headline"   : str( status.get_headline_text() or "" ) if status.is_partial else "",
+                                "fingerprint": status.fingerprint }
+    
+    # The attributes held in the later sections are omitted from the entities
+    pickler = _EntityPickler( types = _ENTITY_TYPES, omit = _ATTRIBUTES )
+    ends = []
+    
+    sys.setrecursionlimit( 10000 )
+    
+    with zipfile.ZipFile( file_name, "w", zipfile.ZIP_STORED ) as archive:
+        for section in _SECTIONS:
+            if section.name == "Model":
+                record = model
+            else:
+                record = [(model, attribute, getattr( model, attribute )) for attribute in section.model]
+                record.extend( (component, attribute, getattr( component, attribute )) for component in model.components for attribute in section.component )
+                record.extend( (gene, attribute, getattr( gene, attribute )) for gene in model.genes for attribute in section.gene )
+            
+            archive.writestr( "sections/" + section.name, pickler.get_record( record ) )
+            
+            # The entities written by each section, as the number following the last
+            ends.append( pickler.next_index )
+        
+        header = { "format"  : FORMAT,
+                   "sections": [section.name for section in _SECTIONS],
+                   "entities": ends,
+                   "status"  : summary }
+        
+        archive.writestr( _HEADER, json.dumps( header, indent = 4 ) )
+
+
+def load_model( file_name: str ) -> Model:
+    """
+    Loads a model from a sectioned file.
+    Only the `Model` section is read, the remaining sections are read when first accessed.
+    """
+    header = read_header( file_name )
+    
+    if header.get( "format" ) != FORMAT or header.get( "sections" ) != [section.name for section in _SECTIONS]:
+        raise ValueError( "Cannot load the model «{}» because it was saved using a different version of Groot.".format( file_name ) )
+    
+    reader = _SectionReader( file_name, header )
+    model = reader.read( None, 0 )
+    _OPEN[model] = reader
+    return model
+
+
+def read_header( file_name: str ) -> Dict[str, object]:
+    """
+    Reads the header of a sectioned file, without reading the sections.
+    """
+    import json
+    import zipfile
+    
+    with zipfile.ZipFile( file_name ) as archive:
+        with archive.open( _HEADER ) as file:
+            return json.loads( file.read().decode( "utf-8" ) )
+
+
+def is_sectioned( file_name: str ) -> bool:
+    """
+    Returns if the file is a sectioned file (rather than a pickled model, as saved by older versions of Groot).
+    """
+    import zipfile
+    
+    return zipfile.is_zipfile( file_name )
+
+
+def load_all( model: Model ) -> None:
+    """
+    Reads any sections of the `model` which have not yet been read.
+    """
+    reader = _OPEN.get( model )
+    
+    if reader is not None:
+        for index in range( len( _SECTIONS ) ):
+            reader.read( model, index )
+
+
+def load_attribute( model: Model, owner: object, name: str ) -> object:
+    """
+    Reads the section holding the attribute `name` of the `owner`, a `Model`, `Component` or `Gene`, then returns the
+    attribute.
+    Called by the owner's `__getattr__`.
+    
+    :except AttributeError: The attribute is not held in a section, or its section has already been read.
+    """
+    reader = _OPEN.get( model ) if model is not None else None
+    index = _ATTRIBUTES.get( type( owner ), { } ).get( name )
+    
+    if reader is None or index is None or index in reader.read_sections:
+        raise AttributeError( "'{}' object has no attribute '{}'".format( type( owner ).__name__, name ) )
+    
+    reader.read( model, index )
+    return vars( owner )[name]
+
+
+def get_summary( model: Model, stage: Stage ) -> Optional[Dict[str, object]]:
+    """
+    Returns the summary of the `stage` from the header, if none of the `model`'s sections for that stage have been read.
+    `ModelStatus` uses this so the status of a model can be shown without reading its sections.
+    
+    Once one of the sections has been read its content may have changed, so the status is then obtained from the
+    content, which reads the remaining sections.
+    """
+    reader = _OPEN.get( model )
+    
+    if reader is None:
+        return None
+    
+    indices = _STAGE_SECTIONS.get( stage )
+    
+    if not indices or any( index in reader.read_sections for index in indices ):
+        return None
+    
+    return reader.header["status"].get( stage.name )
@@ -0,0 +1,202 @@
+"""
+Compact storage for the component trees, see `PackedTree`.
+"""
+from array import array
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from mgraph import MGraph, MNode
+from mgraph.graphing import NodeId
+
+
+_TYPECODE = "i"
+
+_TArrays = Tuple[array, array, array, Tuple[object, ...], Optional[Tuple[object, ...]], Tuple[NodeId, ...]]
+"""
+The `parents`, `offsets`, `children`, `data`, `edge_data` and `uids` of a `PackedTree`.
+"""
+
+
+class PackedTree:
+    """
+    A tree held as flat arrays, rather than as an `MGraph` of node and edge objects.
+    
+    Nodes are numbered in breadth first order from the root(s), so a node's parent always precedes it.
+    
+    * `parents`:    Index of each node's parent, or `-1` for a root.
+    * `offsets`:    Children of node `i` are `children[offsets[i]:offsets[i + 1]]` (a "CSR" layout).
+    * `children`:   Indices of the children.
+    * `data`:       The data of each node (e.g. a `Gene`, `Point` or `None` for a clade).
+    * `edge_data`:  The data of each node's edge from its parent, or `None` if no edges have data.
+    * `uids`:       The UID of each node, so a graph created from the arrays has the same UIDs as the graph they were
+                    created from (as does `MGraph.copy`), and its nodes can be located in other copies of the tree.
+    
+    These are pickled as flat buffers, which avoids the deep recursion needed to pickle an `MGraph`.
+    
+    The `MGraph` is only created when `graph` is first accessed, after which the `graph` is the tree (it can be
+    modified as normal) and the arrays are recreated from it when required.
+    Copies share the arrays, so copying a tree that hasn't been accessed as a graph is free.
+    """
+    
+    
+    def __init__( self, graph: MGraph = None ):
+        """
+        CONSTRUCTOR
+        Use `pack` to hold just the arrays.
+        
+        :param graph:   Graph to wrap.
+                        The `graph` is retained and returned by the `graph` property.
+        """
+        self.__graph: Optional[MGraph] = graph
+        self.__arrays: Optional[_TArrays] = None
+    
+    
+    @classmethod
+    def pack( cls, graph: MGraph ) -> "PackedTree":
+        """
+        Creates a `PackedTree` holding the arrays of the `graph`, but not the `graph` itself.
+        The graph is created again on demand.
+        
+        :except ValueError: The graph is not a tree (or forest).
+        """
+        r = cls()
+        r.__arrays = _pack( graph )
+        return r
+    
+    
+    @property
+    def graph( self ) -> MGraph:
+        """
+        The tree as an `MGraph`.
+        This is created from the arrays the first time it is accessed.
+        """
+        if self.__graph is None:
+            self.__graph = _unpack( *self.__arrays )
+            self.__arrays = None
+        
+        return self.__graph
+    
+    
+    @property
+    def has_graph( self ) -> bool:
+        """
+        Whether the `graph` has been created.
+        """
+        return self.__graph is not None
+    
+    
+    def get_arrays( self ) -> _TArrays:
+        """
+        Returns the `parents`, `offsets`, `children`, `data`, `edge_data` and `uids` arrays (see class comments).
+        If the `graph` has been created these reflect its current content.
+        The arrays must not be modified.
+        """
+        if self.__graph is not None:
+            return _pack( self.__graph )
+        
+        return self.__arrays
+    
+    
+    def copy( self ) -> "PackedTree":
+        """
+        Copies the tree.
+        The copy has no `graph` and shares this tree's arrays.
+        """
+        r = type( self )()
+        r.__arrays = self.get_arrays()
+        return r
+    
+    
+    def __len__( self ):
+        return len( self.get_arrays()[3] ) if self.__graph is None else len( self.__graph.nodes )
+    
+    
+    def __getstate__( self ) -> Dict[str, object]:
+        parents, offsets, children, data, edge_data, uids = self.get_arrays()
+        
+        return { "parents"  : parents.tobytes(),
+                 "offsets"  : offsets.tobytes(),
+                 "children" : children.tobytes(),
+                 "data"     : data,
+                 "edge_data": edge_data,
+                 "uids"     : uids }
+    
+    
+    def __setstate__( self, state: Dict[str, object] ) -> None:
+        self.__graph = None
+        self.__arrays = (_from_bytes( state["parents"] ),
+                         _from_bytes( state["offsets"] ),
+                         _from_bytes( state["children"] ),
+                         state["data"],
+                         state["edge_data"],
+                         # Trees saved by older versions have no UIDs, new ones are created
+                         state.get( "uids" ) or tuple( NodeId() for _ in state["data"] ))
+    
+    
+    def __str__( self ):
+        return "PackedTree({} nodes)".format( len( self ) )
+
+
+def _from_bytes( data: bytes ) -> array:
+    r = array( _TYPECODE )
+    r.frombytes( data )
+    return r
+
+
+def _pack( graph: MGraph ) -> _TArrays:
+    """
+    Obtains the arrays for a `PackedTree`.
+    """
+    order: List[MNode] = [node for node in graph.nodes if node.num_parents == 0]
+    
+    if graph.nodes and not order:
+        raise ValueError( "Cannot pack the graph because it is not a tree, it has no roots." )
+    
+    num_roots = len( order )
+    indices: Dict[MNode, int] = { node: index for index, node in enumerate( order ) }
+    parents = array( _TYPECODE, [-1] * num_roots )
+    offsets = array( _TYPECODE )
+    edge_data = [None] * num_roots
+    
+    # Iterative walk (the trees can be deeper than the recursion limit), this extends `order` as it goes
+    for node in order:
+        offsets.append( len( order ) - num_roots )
+        
+        for edge in node.edges.outgoing:
+            child = edge.right
+            
+            if child in indices:
+                raise ValueError( "Cannot pack the graph because it is not a tree, the node «{}» is reachable via more than one path.".format( child ) )
+            
+            indices[child] = len( order )
+            order.append( child )
+            parents.append( indices[node] )
+            edge_data.append( edge.data )
+    
+    offsets.append( len( order ) - num_roots )
+    
+    if len( order ) != len( graph.nodes ):
+        raise ValueError( "Cannot pack the graph because it is not a tree, {} nodes are in cycles.".format( len( graph.nodes ) - len( order ) ) )
+    
+    # Each node's children are visited together, so they are numbered consecutively
+    children = array( _TYPECODE, range( num_roots, len( order ) ) )
+    
+    return (parents,
+            offsets,
+            children,
+            tuple( node.data for node in order ),
+            tuple( edge_data ) if any( x is not None for x in edge_data ) else None,
+            tuple( node.uid for node in order ))
+
+
+def _unpack( parents: Sequence[int], offsets: Sequence[int], children: Sequence[int], data: Sequence[object], edge_data: Optional[Sequence[object]], uids: Sequence[NodeId] ) -> MGraph:
+    """
+    Creates the `MGraph` for a `PackedTree`.
+    """
+    graph = MGraph()
+    nodes = [MNode( graph, x, uid = uid ) for x, uid in zip( data, uids )]
+    
+    for index, parent in enumerate( parents ):
+        if parent != -1:
+            graph.add_edge( nodes[parent], nodes[index], data = edge_data[index] if edge_data is not None else None )
+    
+    return graph
@@ -2,6 +2,6 @@
 Groot's utilities are functions and classes used to support the logic but which don't belong anywhere in particular.
 """
 
-from . import cli_view_utils, entity_to_html, external_runner, extendable_algorithm, graph_viewing, lego_graph
+from . import cli_view_utils, entity_to_html, external_runner, extendable_algorithm, graph_viewing, lca_index, lego_graph, quartets
 from .extendable_algorithm import AlgorithmCollection, AbstractAlgorithm, run_subprocess
 from .lego_graph import rectify_nodes
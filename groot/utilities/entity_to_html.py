@@ -5,14 +5,11 @@ from typing import List
 
 import groot.data.config
 
-from mhelper_qt import qt_gui_helper
-
 from groot.data import Model, IHasFasta, INamedGraph, Report
 from groot.utilities import cli_view_utils, graph_viewing
 
 
 HTML = List[str]
-_ANSI_SCHEME = qt_gui_helper.ansi_scheme_light( family = 'monospace' )
 
 
 def render( item, model: Model ):
@@ -68,4 +65,6 @@ def render_fasta( html: HTML, item: IHasFasta, model: Model ):
 
 
 def __get_fasta( fasta, model ):
-    return qt_gui_helper.ansi_to_html( cli_view_utils.colour_fasta_ansi( fasta, model.site_type ), _ANSI_SCHEME )
+    # Qt is only imported when required, so that the CLI starts quickly
+    from mhelper_qt import qt_gui_helper
+    return qt_gui_helper.ansi_to_html( cli_view_utils.colour_fasta_ansi( fasta, model.site_type ), qt_gui_helper.ansi_scheme_light( family = 'monospace' ) )
@@ -1,8 +1,9 @@
 """
 Dealing with extendable algorithms
 """
+import importlib
 import inspect
-from typing import Callable, Type, TypeVar, Union
+from typing import Callable, Dict, Type, TypeVar, Union
 
 from intermake import subprocess_helper
 from mhelper import ArgsKwargs, NotFoundError, file_helper
@@ -59,6 +60,14 @@ class AbstractAlgorithm:
     
     def __repr__( self ):
         return "{}(function = {}, argskwargs = {})".format( type( self ).__name__, repr( self.function ), repr( self.argskwargs ) )
+    
+    
+    def __reduce__( self ):
+        # The `Algorithm` types are created dynamically, so pickle algorithms by name (see `get_algorithm`)
+        if self.name is None:
+            return super().__reduce__()
+        
+        return _get_algorithm, (self.get_owner().name, self.name, self.argskwargs.args, self.argskwargs.kwargs)
 
 
 class AlgorithmCollection:
@@ -72,6 +81,9 @@ class AlgorithmCollection:
     the `AlgorithmCollection` describing the purpose of the algorithm.
     
     :cvar ALL:          Holds a reference to all created algorithm collections
+    :cvar DEFAULTS:     Name of the package that registers the default algorithms.
+                        This is only imported when an algorithm is first required (see `load_defaults`), so that
+                        Groot starts quickly.
     
     :ivar delegate:     A `Callable` describing the prototype function accepted by this `AlgorithmCollection`.
                         Functions may also take user-provided arguments in addition to the arguments specified
@@ -85,6 +97,8 @@ class AlgorithmCollection:
     :ivar algorithms:   Maps the algorithm names to their functions
     """
     ALL = []
+    DEFAULTS = "groot_ex"
+    __defaults_loaded = False
     
     
     def __init__( self, delegate: Type[TDelegate], name: str ):
@@ -102,7 +116,25 @@ class AlgorithmCollection:
         self.delegate = delegate
         self.name = name
         self.default = None
-        self.algorithms = { }
+        self.__algorithms = { }
+    
+    
+    @classmethod
+    def load_defaults( cls ) -> None:
+        """
+        Imports the `DEFAULTS` package, if this hasn't been done already, so the default algorithms are registered.
+        """
+        if cls.__defaults_loaded:
+            return
+        
+        cls.__defaults_loaded = True
+        importlib.import_module( cls.DEFAULTS )
+    
+    
+    @property
+    def algorithms( self ) -> Dict[str, TDelegate]:
+        self.load_defaults()
+        return self.__algorithms
     
     
     @property
@@ -127,6 +159,10 @@ class AlgorithmCollection:
         """
         assert isinstance( name, str )
         
+        # Load the defaults first, so they don't replace the user's algorithms when they are loaded later
+        # (this does nothing whilst the defaults themselves are being loaded)
+        self.load_defaults()
+        
         name = name.lower().replace( " ", "_" ).replace( ".", "_" )
         
         
@@ -136,7 +172,7 @@ class AlgorithmCollection:
             if default or self.default is None:
                 self.default = fn_name
             
-            self.algorithms[fn_name] = fn
+            self.__algorithms[fn_name] = fn
             
             return fn
         
@@ -154,6 +190,8 @@ class AlgorithmCollection:
         
         :except NotFoundError:
         """
+        self.load_defaults()
+        
         if not name:
             name = self.default
         
@@ -187,6 +225,17 @@ class AlgorithmCollection:
         return 'AlgorithmCollection(name = "{}", count = {})'.format( self.name, len( self.algorithms ) )
 
 
+def _get_algorithm( collection: str, name: str, args: tuple, kwargs: dict ) -> AbstractAlgorithm:
+    """
+    Obtains the algorithm `name` from the `AlgorithmCollection` named `collection` (used when unpickling algorithms).
+    """
+    for algorithms in AlgorithmCollection.ALL:
+        if algorithms.name == collection:
+            return algorithms.get_algorithm( name, *args, **kwargs )
+    
+    raise NotFoundError( "There is no collection of «{}» algorithms.".format( collection ) )
+
+
 def run_subprocess( *args, collect: bool = False, **kwargs ) -> Union[str, int]:
     """
     Runs a subprocess as for `intermake.subprocess_helper.run_subprocess`, however stdout/stderr is sent to a file.
@@ -1,21 +1,43 @@
 import os
 import shutil
-from uuid import uuid4
+import threading
+import time
 from warnings import warn
 import groot.data.config
+from groot.data import model_profile
 import intermake
 from mhelper import file_helper
 
 
+__lock = threading.RLock()
+"""
+Held whilst the working directory is a temporary folder (see `run_in_temporary`).
+"""
+
+
 def run_in_temporary( function, *args, **kwargs ):
     """
-    Sets the working directory to a temporary folder inside the current working directory.
+    Sets the working directory to a new temporary folder.
     Calls `function`
-    Then deletes the temporary folder and returns to the original working directory. 
+    Then deletes the temporary folder and returns to the original working directory.
+    
+    The algorithms (and the external tools they run) use files relative to the working directory, which all threads
+    share, so only one thread runs an algorithm at a time and the others wait. To run algorithms concurrently, use
+    worker processes (the `processes` parameter of the commands) rather than threads (see `global_view.use_model`).
+    Whilst an algorithm runs, other threads see the temporary folder as the working directory, so they should use
+    absolute paths.
     """
+    with __lock:
+        return __run_in_temporary( function, args, kwargs )
+
+
+def __run_in_temporary( function, args, kwargs ):
+    from uuid import uuid4
+    
     #
     # Create and switch to temporary folder
     #
+    original_folder = os.getcwd()
     id = uuid4()
     temp_folder_name = os.path.join( intermake.Controller.ACTIVE.app.local_data.local_folder( intermake.constants.FOLDER_TEMPORARY ), "temporary_{}".format( id ) )
     
@@ -28,6 +50,8 @@ def run_in_temporary( function, *args, **kwargs ):
     #
     # Run the command
     #
+    start = time.perf_counter()
+    
     try:
         return function( *args, **kwargs )
     except Exception:
@@ -39,7 +63,8 @@ def run_in_temporary( function, *args, **kwargs ):
         
         raise
     finally:
-        os.chdir( ".." )
+        model_profile.count( "external tool seconds", time.perf_counter() - start )
+        os.chdir( original_folder )
         if groot.data.config.options().debug_external_tool:
             warn( "The directory '{}' has not been deleted because of the `debug_external_tool` flag.".format( temp_folder_name ), UserWarning )
         else:
@@ -0,0 +1,161 @@
+"""
+Constant time lowest common ancestor queries on trees.
+"""
+from typing import Dict, Iterable, List, Set
+
+from mgraph import MGraph, MNode
+from mhelper import array_helper
+
+
+class LcaIndex:
+    """
+    Indexes a rooted tree, allowing the lowest common ancestor of two nodes to be found in constant time.
+    
+    The index uses an Euler tour of the tree, with a sparse table holding the shallowest node over every
+    power-of-two length range of that tour.
+    It takes `O(N log N)` to build, which is paid once per tree, rather than once per query.
+    
+    The index is a snapshot, if the tree is modified the index must be recreated.
+    
+    :ivar graph:    The indexed tree
+    :ivar root:     The root of the tree
+    """
+    
+    
+    def __init__( self, graph: MGraph ):
+        """
+        CONSTRUCTOR
+        
+        :param graph:       Tree to index.
+                            This must be rooted and each node must have no more than one parent.
+        :except ValueError: The graph is not a rooted tree.
+        """
+        self.graph: MGraph = graph
+        self.root: MNode = array_helper.single_or_error( node for node in graph.nodes if node.num_parents == 0 )
+        
+        self.__parents: Dict[MNode, MNode] = { }
+        self.__depths: Dict[MNode, int] = { self.root: 0 }
+        self.__firsts: Dict[MNode, int] = { }
+        self.__tour: List[MNode] = []
+        self.__by_data: Dict[object, List[MNode]] = { }
+        
+        # Iterative walk (the trees can be deeper than the recursion limit)
+        stack = [(self.root, iter( self.root.children ))]
+        self.__visit( self.root )
+        
+        while stack:
+            node, children = stack[-1]
+            child = next( children, None )
+            
+            if child is None:
+                stack.pop()
+                
+                if stack:
+                    self.__tour.append( stack[-1][0] )
+                
+                continue
+            
+            if child in self.__depths:
+                raise ValueError( "Cannot index the graph because it is not a tree, the node «{}» is reachable via more than one path.".format( child ) )
+            
+            self.__parents[child] = node
+            self.__depths[child] = self.__depths[node] + 1
+            self.__visit( child )
+            stack.append( (child, iter( child.children )) )
+        
+        if len( self.__depths ) != len( graph.nodes ):
+            raise ValueError( "Cannot index the graph because it is not a tree, {} of the {} nodes are not reachable from the root «{}».".format( len( graph.nodes ) - len( self.__depths ), len( graph.nodes ), self.root ) )
+        
+        # Sparse table - `table[k][i]` is the shallowest node in `tour[i:i + 2**k]`
+        table = [list( self.__tour )]
+        width = 1
+        
+        while width * 2 <= len( self.__tour ):
+            previous = table[-1]
+            table.append( [self.__shallowest( previous[i], previous[i + width] ) for i in range( len( self.__tour ) - width * 2 + 1 )] )
+            width *= 2
+        
+        self.__table: List[List[MNode]] = table
+    
+    
+    def __visit( self, node: MNode ) -> None:
+        self.__firsts[node] = len( self.__tour )
+        self.__tour.append( node )
+        
+        if node.data is not None:
+            self.__by_data.setdefault( node.data, [] ).append( node )
+    
+    
+    def __shallowest( self, a: MNode, b: MNode ) -> MNode:
+        return a if self.__depths[a] <= self.__depths[b] else b
+    
+    
+    def depth( self, node: MNode ) -> int:
+        """
+        Returns the number of edges between the `node` and the root.
+        """
+        return self.__depths[node]
+    
+    
+    def parent( self, node: MNode ) -> MNode:
+        """
+        Returns the parent of the `node`, or `None` for the root.
+        """
+        return self.__parents.get( node )
+    
+    
+    def find( self, data: object ) -> List[MNode]:
+        """
+        Returns the nodes in the tree with the specified `data`, without searching the tree.
+        """
+        return self.__by_data.get( data, [] )
+    
+    
+    def lca( self, a: MNode, b: MNode ) -> MNode:
+        """
+        Returns the lowest common ancestor of nodes `a` and `b`.
+        """
+        start = self.__firsts[a]
+        end = self.__firsts[b]
+        
+        if start > end:
+            start, end = end, start
+        
+        level = (end - start + 1).bit_length() - 1
+        row = self.__table[level]
+        return self.__shallowest( row[start], row[end - (1 << level) + 1] )
+    
+    
+    def get_intermediaries( self, nodes: Iterable[MNode] ) -> Set[MNode]:
+        """
+        Returns the nodes required to connect the specified `nodes` into a single subtree.
+        
+        This gives the same result as `analysing.get_intermediaries`, but the cost is proportional to the size
+        of the result, rather than that of the tree.
+        
+        :param nodes:   Nodes to connect.
+                        As with `analysing.get_intermediaries`, fewer than two nodes results in an empty set.
+        :return:        The nodes of the induced subtree, including `nodes` themselves.
+        """
+        results = set( nodes )
+        
+        if len( results ) < 2:
+            return set()
+        
+        # The top of the subtree is the LCA of the first and last nodes in tour order
+        first = min( results, key = self.__firsts.__getitem__ )
+        last = max( results, key = self.__firsts.__getitem__ )
+        top = self.lca( first, last )
+        
+        # Each node climbs until it reaches the part of the subtree that has already been found
+        for node in list( results ):
+            while node is not top:
+                node = self.__parents[node]
+                
+                if node in results:
+                    break
+                
+                results.add( node )
+        
+        results.add( top )
+        return results
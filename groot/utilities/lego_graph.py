@@ -131,6 +131,38 @@ def export_newick( graph: MGraph ):
                                     internal = False )
 
 
+def canonicalise_newick( newick: str ) -> str:
+    """
+    Rewrites a Newick tree, such as that produced by `export_newick`, in a canonical form.
+    
+    Clade names and branch lengths are dropped and the children of each clade are sorted, so that topologically
+    identical trees result in the same text, regardless of the order in which their nodes were written.
+    """
+    graph: MGraph = importing.import_newick( newick )
+    root = graph.root
+    
+    # Single node trees are given a root by the importer, which isn't part of the tree
+    if root.num_children == 1 and not root.child.has_children:
+        root = root.child
+    
+    texts = { }
+    stack = [(root, False)]
+    
+    # Post-order (iterative, the trees can be deeper than the recursion limit) 
+    while stack:
+        node, expanded = stack.pop()
+        
+        if not node.has_children:
+            texts[node] = node.data
+        elif expanded:
+            texts[node] = "({})".format( ",".join( sorted( texts[child] for child in node.children ) ) )
+        else:
+            stack.append( (node, True) )
+            stack.extend( (child, False) for child in node.children )
+    
+    return texts[root] + ";"
+
+
 def import_newick( newick: str, model: Model, root_ref: ByRef[MNode] = None, reclade: bool = True ) -> MGraph:
     """
     Imports a newick string as an MGraph object.
@@ -0,0 +1,405 @@
+"""
+Comparing graphs by their quartets, without listing the quartets.
+
+The quartet of four leaves `a < b < c < d` (in a fixed leaf order) is found as `mgraph.analysing.get_quartet` does,
+by walking the shortest paths from `a` to `b`, `c` and `d` and noting where they diverge.
+Here, the shortest paths from `a` are taken from a single breadth first search tree, so the quartets involving `a`
+follow from that tree's clades, which are held as bitsets over the leaves.
+"""
+import math
+import random
+from collections import deque
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from intermake import pr
+from mgraph import BadQuartet, MGraph, MNode, analysing
+
+
+DNodePredicate = Callable[[MNode], bool]
+DNodeToObject = Callable[[MNode], object]
+
+
+class QuartetTally:
+    """
+    Totals from a quartet comparison (see `count_quartets`).
+    
+    :ivar match:                Quartets in both graphs, with the same topology.
+    :ivar mismatch:             Quartets in both graphs, with different topologies.
+    :ivar missing_in_left:      Quartets only in the right graph.
+    :ivar missing_in_right:     Quartets only in the left graph.
+    """
+    
+    
+    def __init__( self, match: int = 0, mismatch: int = 0, missing_in_left: int = 0, missing_in_right: int = 0 ):
+        self.match = match
+        self.mismatch = mismatch
+        self.missing_in_left = missing_in_left
+        self.missing_in_right = missing_in_right
+    
+    
+    def __add__( self, other: "QuartetTally" ) -> "QuartetTally":
+        return QuartetTally( self.match + other.match,
+                             self.mismatch + other.mismatch,
+                             self.missing_in_left + other.missing_in_left,
+                             self.missing_in_right + other.missing_in_right )
+    
+    
+    def __len__( self ):
+        return self.match + self.mismatch + self.missing_in_left + self.missing_in_right
+    
+    
+    def __str__( self ):
+        return "{} quartets: {} match, {} mismatch, {} missing in left, {} missing in right".format( len( self ), self.match, self.mismatch, self.missing_in_left, self.missing_in_right )
+
+
+class QuartetEstimate:
+    """
+    Estimated proportions from a sample of the quartets (see `sample_quartets`).
+    
+    :ivar samples:  Number of quartets sampled.
+    :ivar match:    Number of sampled quartets with the same topology in both graphs.
+    :ivar z:        Standard score used for the confidence intervals.
+    """
+    
+    
+    def __init__( self, samples: int, match: int, z: float = 1.96 ):
+        self.samples = samples
+        self.match = match
+        self.z = z
+    
+    
+    @property
+    def mismatch( self ) -> int:
+        return self.samples - self.match
+    
+    
+    def interval( self, successes: int ) -> Tuple[float, float, float]:
+        """
+        Returns the estimated proportion and its (Wilson score) confidence interval.
+        
+        :param successes:   Number of the samples falling into the category of interest, i.e. `match` or `mismatch`.
+        :return:            Tuple of the proportion, lower bound and upper bound.
+        """
+        if not self.samples:
+            return 0.0, 0.0, 1.0
+        
+        n = self.samples
+        p = successes / n
+        z2 = self.z * self.z
+        centre = (p + z2 / (2 * n)) / (1 + z2 / n)
+        spread = (self.z / (1 + z2 / n)) * math.sqrt( p * (1 - p) / n + z2 / (4 * n * n) )
+        return p, max( 0.0, centre - spread ), min( 1.0, centre + spread )
+    
+    
+    def format( self, successes: int ) -> str:
+        """
+        Formats the estimate for the category as a percentage with its confidence interval.
+        """
+        p, lower, upper = self.interval( successes )
+        return "{:.1%} ({:.1%} - {:.1%})".format( p, lower, upper )
+
+
+def count_quartets( left: MGraph,
+                    right: MGraph,
+                    node_filter: DNodePredicate,
+                    key: DNodeToObject = None,
+                    firsts: Iterable[int] = None ) -> QuartetTally:
+    """
+    Counts the matching and mismatching quartets of two graphs.
+    
+    The quartets are never listed, for each leaf `a`, one search of each graph is made and the quartets
+    `a < b < c < d` are then counted from the clades of the search trees, `d` being handled a bitset at a time.
+    This takes `O(n(V + n³/w))` time for `n` leaves, `V` nodes and a `w`-bit machine word.
+    
+    :param left:        First graph
+    :param right:       Second graph
+    :param node_filter: Selects the leaves. These must be leaves of the graph (i.e. have only one relation).
+    :param key:         Identifies equivalent leaves in the two graphs. The default is `MNode.data`.
+    :param firsts:      Only count the quartets whose first leaf has one of these indices (see `get_leaf_order`).
+                        The default is all of them.
+                        Missing quartets are only counted when this is the default.
+    :return:            The totals.
+    :except ValueError: A leaf is not a leaf, or cannot be reached.
+    """
+    left_leaves, right_leaves, left_only, right_only = get_leaf_order( left, right, node_filter, key )
+    n = len( left_leaves )
+    result = QuartetTally()
+    
+    if firsts is None:
+        firsts = range( n )
+        result = __count_missing( n, left_only, right_only )
+    
+    # `later[c]` is the bitset of leaves after leaf `c`
+    everything = (1 << n) - 1
+    later = [everything & ~((1 << (c + 1)) - 1) for c in range( n )]
+    
+    for a in firsts:
+        if a >= n - 3:
+            continue
+        
+        left_tree = _SearchTree( left_leaves, a )
+        right_tree = _SearchTree( right_leaves, a )
+        
+        for b in range( a + 1, n - 2 ):
+            for c in range( b + 1, n - 1 ):
+                lm, lb, lc, ls = left_tree.classify( b, c )
+                rm, rb, rc, rs = right_tree.classify( b, c )
+                count = n - c - 1
+                match = _popcount( later[c] & ((~lm & ~rm) | (lb & rb) | (lc & rc) | (ls & rs)) )
+                result.match += match
+                result.mismatch += count - match
+    
+    return result
+
+
+__parallel_state = []
+"""
+The arguments for `__count_in_worker`.
+This is set before the workers are forked, so they inherit it, along with (copies of) the graphs.
+"""
+
+
+def count_quartets_in_parallel( left: MGraph,
+                                right: MGraph,
+                                node_filter: DNodePredicate,
+                                key: DNodeToObject = None,
+                                processes: int = -1,
+                                shards: int = 0 ) -> QuartetTally:
+    """
+    As `count_quartets`, but the quartets are divided by their first leaf into shards, which are counted by a pool
+    of worker processes.
+    
+    :param left:        First graph
+    :param right:       Second graph
+    :param node_filter: Selects the leaves.
+    :param key:         Identifies equivalent leaves in the two graphs. The default is `MNode.data`.
+    :param processes:   Number of worker processes. `-1` uses one process per CPU.
+    :param shards:      Number of shards. The default is four per process.
+                        Each shard takes every `shards`th leaf as the first leaf, so the shards are of similar sizes.
+    :return:            The totals.
+    :except ValueError: As `count_quartets`, or processes cannot be forked on this platform.
+    """
+    import multiprocessing
+    
+    if "fork" not in multiprocessing.get_all_start_methods():
+        raise ValueError( "Cannot count the quartets in parallel because processes cannot be forked on this platform." )
+    
+    if processes < 1:
+        processes = multiprocessing.cpu_count()
+    
+    if shards < 1:
+        shards = processes * 4
+    
+    left_leaves, _, left_only, right_only = get_leaf_order( left, right, node_filter, key )
+    n = len( left_leaves )
+    result = __count_missing( n, left_only, right_only )
+    shards = max( 1, min( shards, n - 3 ) )
+    
+    __parallel_state[:] = [left, right, node_filter, key, shards]
+    
+    try:
+        with multiprocessing.get_context( "fork" ).Pool( processes ) as pool:
+            for tally in pr.pr_iterate( pool.imap_unordered( __count_in_worker, range( shards ) ), "Counting quartets", count = shards ):
+                result += tally
+    finally:
+        __parallel_state.clear()
+    
+    return result
+
+
+def __count_in_worker( shard: int ) -> QuartetTally:
+    """
+    Counts the quartets in the `shard`th shard of the `__parallel_state` (in a worker process).
+    """
+    left, right, node_filter, key, shards = __parallel_state
+    n = len( get_leaf_order( left, right, node_filter, key )[0] )
+    return count_quartets( left, right, node_filter, key, firsts = range( shard, n, shards ) )
+
+
+def sample_quartets( left: MGraph,
+                     right: MGraph,
+                     node_filter: DNodePredicate,
+                     key: DNodeToObject = None,
+                     samples: int = 10000,
+                     seed: Optional[int] = None ) -> QuartetEstimate:
+    """
+    Estimates the proportion of matching quartets from a random sample of the quartets common to both graphs.
+    Each sampled quartet is found as `analysing.get_quartet` does, so this suits graphs too large for `count_quartets`.
+    
+    :param left:        First graph
+    :param right:       Second graph
+    :param node_filter: Selects the leaves.
+    :param key:         Identifies equivalent leaves in the two graphs. The default is `MNode.data`.
+    :param samples:     Number of quartets to sample (with replacement).
+    :param seed:        Random seed, for repeatable estimates.
+    :return:            The estimate.
+    """
+    if key is None:
+        key = MNode.data.fget
+    
+    left_leaves, right_leaves, _, _ = get_leaf_order( left, right, node_filter, key )
+    
+    if len( left_leaves ) < 4:
+        return QuartetEstimate( 0, 0 )
+    
+    rng = random.Random( seed )
+    match = 0
+    
+    for _ in range( samples ):
+        indices = rng.sample( range( len( left_leaves ) ), 4 )
+        left_quartet = analysing.get_quartet( left, [left_leaves[i] for i in indices] )
+        right_quartet = analysing.get_quartet( right, [right_leaves[i] for i in indices] )
+        
+        if isinstance( left_quartet, BadQuartet ) or isinstance( right_quartet, BadQuartet ):
+            if isinstance( left_quartet, BadQuartet ) and isinstance( right_quartet, BadQuartet ):
+                match += 1
+        elif left_quartet.get_sorted_key( key ) == right_quartet.get_sorted_key( key ):
+            match += 1
+    
+    return QuartetEstimate( samples, match )
+
+
+def get_leaf_order( left: MGraph,
+                    right: MGraph,
+                    node_filter: DNodePredicate,
+                    key: DNodeToObject = None ) -> Tuple[List[MNode], List[MNode], int, int]:
+    """
+    Obtains the leaves common to both graphs, in a fixed order (by the text of their keys).
+    
+    :return: Tuple of:
+                * the leaves of the left graph
+                * the equivalent leaves of the right graph
+                * the number of leaves only in the left graph
+                * the number of leaves only in the right graph
+    """
+    if key is None:
+        key = MNode.data.fget
+    
+    left_keys = __get_keys( left, node_filter, key )
+    right_keys = __get_keys( right, node_filter, key )
+    common = sorted( set( left_keys ) & set( right_keys ), key = str )
+    
+    return ([left_keys[x] for x in common],
+            [right_keys[x] for x in common],
+            len( left_keys ) - len( common ),
+            len( right_keys ) - len( common ))
+
+
+def __get_keys( graph: MGraph, node_filter: DNodePredicate, key: DNodeToObject ) -> Dict[object, MNode]:
+    r = { }
+    
+    for node in analysing.realise_node_predicate_as_set( graph, node_filter ):
+        k = key( node )
+        
+        if k in r:
+            raise ValueError( "Key allows two nodes in the same graph to be considered equivalent." )
+        
+        r[k] = node
+    
+    return r
+
+
+def __count_missing( n: int, left_only: int, right_only: int ) -> QuartetTally:
+    """
+    Counts the quartets which are only in one graph, given the number of leaves in both (`n`) and in only one graph.
+    """
+    num_both = __get_num_quartets( n )
+    return QuartetTally( missing_in_left = __get_num_quartets( n + right_only ) - num_both,
+                         missing_in_right = __get_num_quartets( n + left_only ) - num_both )
+
+
+def __get_num_quartets( n: int ) -> int:
+    return n * (n - 1) * (n - 2) * (n - 3) // 24
+
+
+def _popcount( value: int ) -> int:
+    return bin( value ).count( "1" )
+
+
+class _SearchTree:
+    """
+    The breadth first search tree of a graph, rooted at the `a`th leaf.
+    
+    Nodes are explored in the same order as `analysing.find_shortest_path`, so the paths are the same.
+    Each node's clade is held as a bitset over the leaves after `a`.
+    """
+    
+    
+    def __init__( self, leaves: List[MNode], a: int ):
+        root = leaves[a]
+        parents: Dict[MNode, Optional[MNode]] = { root: None }
+        order = [root]
+        queue = deque( order )
+        
+        while queue:
+            node = queue.popleft()
+            
+            for relation in node.relations:
+                if relation not in parents:
+                    parents[relation] = node
+                    order.append( relation )
+                    queue.append( relation )
+        
+        clades: Dict[MNode, int] = { }
+        
+        for index in range( a + 1, len( leaves ) ):
+            leaf = leaves[index]
+            
+            if leaf not in parents:
+                raise ValueError( "Cannot count the quartets because there is no path between the leaves «{}» and «{}».".format( root, leaf ) )
+            
+            if leaf.num_relations != 1:
+                raise ValueError( "Cannot count the quartets because «{}» is not a leaf. Please list the quartets instead.".format( leaf ) )
+            
+            clades[leaf] = 1 << index
+        
+        for node in reversed( order ):
+            parent = parents[node]
+            
+            if parent is not None:
+                clades[parent] = clades.get( parent, 0 ) | clades.get( node, 0 )
+        
+        # Path from the root to each leaf
+        paths: List[Optional[List[MNode]]] = [None] * len( leaves )
+        
+        for index in range( a + 1, len( leaves ) ):
+            path = []
+            node = leaves[index]
+            
+            while node is not None:
+                path.append( node )
+                node = parents[node]
+            
+            path.reverse()
+            paths[index] = path
+        
+        self.__clades = clades
+        self.__paths = paths
+    
+    
+    def classify( self, b: int, c: int ) -> Tuple[int, int, int, int]:
+        """
+        For leaves `b` and `c`, obtains the bitsets of leaves `d` forming each topology of the quartet `a, b, c, d`.
+        
+        :return: Tuple of:
+                    * the clade of `LCA(b, c)` - the quartet is `ad|bc` for `d` *outside* of this
+                    * `d` for which the quartet is `ac|bd`
+                    * `d` for which the quartet is `ab|cd`
+                    * `d` for which the quartet is unresolved (i.e. `BadQuartet`)
+        """
+        b_path = self.__paths[b]
+        c_path = self.__paths[c]
+        
+        # Find where the paths diverge
+        depth = 0
+        limit = min( len( b_path ), len( c_path ) )
+        
+        while depth < limit and b_path[depth] is c_path[depth]:
+            depth += 1
+        
+        clades = self.__clades
+        lca = clades[b_path[depth - 1]]
+        towards_b = clades[b_path[depth]]
+        towards_c = clades[c_path[depth]]
+        
+        return lca, towards_b, towards_c, lca & ~towards_b & ~towards_c
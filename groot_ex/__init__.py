@@ -1,6 +1,6 @@
 """
 GrootEx provides the default set of algorithms for Groot.
-It is automatically loaded when Groot starts.
+It is automatically loaded when an algorithm is first required.
 
 To get Groot to register custom algorithms, use the `import` command.
 You can register python packages with an `__init__.py` (like this one) or stand-alone python files (like `align.py`).  
@@ -1,4 +1,4 @@
-from groot import supertree_algorithms, Subset, Gene
+from groot import supertree_algorithms, Subset, Gene, Point
 from mgraph import importing, MGraph
 from mhelper import file_helper, Logger, LogicError, exception_helper
 from intermake import subprocess_helper
@@ -78,6 +78,11 @@ def supertree_groot( subset_src: Subset ) -> MGraph:
     
     minigraph = importing.import_splits( relevant_splits )
     
+    # The supertree must reference the fusion formations, rather than the points (see `create_supertrees`)
+    for node in minigraph.nodes:
+        if isinstance( node.data, Point ):
+            node.data = node.data.formation
+    
     __LOG_CREATE( minigraph.to_ascii() )
     __LOG_CREATE( "END OF GENE SET {}", subset, key = "nrfg.289" )
     
@@ -1,4 +1,7 @@
-from mhelper import bio_helper, file_helper, SwitchError
+import operator
+from typing import Dict, List
+
+from mhelper import bio_helper, file_helper, ignore, SwitchError
 import groot
 
 
@@ -66,3 +69,79 @@ def tree_maximum_likelihood( model: str, alignment: str ) -> str:
     groot.run_subprocess( "raxml -T 4 -m {} -p 1 -s in_file.phy -# 20 -n t".format( method ).split( " " ) )
     
     return file_helper.read_all_text( "RAxML_bestTree.t", "the expected output from raxml" )
+
+
+@groot.tree_algorithms.register( "upgma" )
+def tree_upgma( model: str, alignment: str ) -> str:
+    """
+    Uses UPGMA (average linkage clustering of the proportion of differing sites) to generate the tree.
+    
+    This does not require any external tools, but is only suitable for closely related sequences with a constant rate
+    of evolution. It is intended for tests and benchmarks (see `create_synthetic_test`).
+    
+    The time and memory taken grow with the square of the number of sequences, since every pair is compared in pure
+    Python. A tree of 500 sequences takes a couple of seconds and 1000 sequences about ten, so this is not practical
+    for alignments of more than a few thousand sequences.
+    
+    :param model:       Format, a string `n` or `p` denoting the site type (ignored).
+    :param alignment:   Alignment in FASTA format.
+    :return:            The tree in Newick format.
+    """
+    ignore( model )
+    names, sequences = zip( *bio_helper.parse_fasta( text = alignment ) )
+    
+    if len( names ) == 1:
+        return "{};".format( names[0] )
+    
+    # Distances between the active clusters, the clusters are merged using the nearest neighbour chain, which visits
+    # each pair O(1) times amortised, so finding the pairs to merge is O(n²) overall
+    distances: Dict[int, Dict[int, float]] = { index: { } for index in range( len( names ) ) }
+    
+    for index, sequence in enumerate( sequences ):
+        for other in range( index ):
+            distance = sum( map( operator.ne, sequence, sequences[other] ) ) / max( len( sequence ), 1 )
+            distances[index][other] = distance
+            distances[other][index] = distance
+    
+    newick: Dict[int, str] = { index: name for index, name in enumerate( names ) }
+    sizes: Dict[int, int] = { index: 1 for index in newick }
+    heights: Dict[int, float] = { index: 0.0 for index in newick }
+    chain: List[int] = []
+    next_index = len( names )
+    
+    while len( distances ) > 1:
+        if not chain:
+            chain.append( min( distances ) )
+        
+        a = chain[-1]
+        b = min( distances[a], key = lambda x: (distances[a][x], x) )
+        
+        # Ties must favour the previous cluster in the chain, otherwise the chain could cycle
+        if len( chain ) > 1 and distances[a][chain[-2]] <= distances[a][b]:
+            b = chain[-2]
+        
+        if len( chain ) == 1 or b != chain[-2]:
+            chain.append( b )
+            continue
+        
+        chain.pop()
+        chain.pop()
+        c = next_index
+        next_index += 1
+        height = distances[a][b] / 2
+        row_a = distances.pop( a )
+        row_b = distances.pop( b )
+        row_c = { }
+        
+        for x, row_x in distances.items():
+            row_c[x] = (row_a[x] * sizes[a] + row_b[x] * sizes[b]) / (sizes[a] + sizes[b])
+            row_x[c] = row_c[x]
+            del row_x[a]
+            del row_x[b]
+        
+        distances[c] = row_c
+        newick[c] = "({}:{:.6f},{}:{:.6f})".format( newick.pop( a ), height - heights[a], newick.pop( b ), height - heights[b] )
+        sizes[c] = sizes[a] + sizes[b]
+        heights[c] = height
+    
+    return newick[next_index - 1] + ";"
@@ -13,8 +13,9 @@ from groot.constants import EChanges, EStartupMode, EWindowMode
 from groot.data import global_view
 from groot_gui.forms.designer import frm_main_designer
 from groot_gui.forms.frm_base import FrmBase
+from groot_gui.utilities.gui_controller import LegoGuiController
 from groot_gui.utilities.gui_workflow import Intent, handlers, EIntent
-from intermake import Result, Controller
+from intermake import Result, Controller, TaskCancelledError
 import intermake_qt
 
 
@@ -107,7 +108,10 @@ class FrmMain( QMainWindow, intermake_qt.utilities.interfaces.IGuiMainWindow ):
         self.menu_handler.gui_actions.dismiss_startup_screen()
         self.menu_handler.update_buttons()
         
-        if result.is_error:
+        if result.is_error and isinstance( result.exception, TaskCancelledError ):
+            self.ui.LBL_STATUS.setText( "OPERATION CANCELLED: " + result.command.name )
+            self.ui.BTN_STATUS.setIcon( resources.remove.icon() )
+        elif result.is_error:
             self.ui.LBL_STATUS.setText( "OPERATION FAILED TO COMPLETE: " + result.command.name )
             self.ui.BTN_STATUS.setIcon( resources.remove.icon() )
         elif result.is_success and isinstance( result.result, EChanges ):
@@ -124,6 +128,17 @@ class FrmMain( QMainWindow, intermake_qt.utilities.interfaces.IGuiMainWindow ):
             self.ui.BTN_STATUS.setIcon( resources.accept.icon() )
     
     
+    def show_progress( self, text: str ) -> None:
+        """
+        Shows the progress of the command running in the background, see `BackgroundExecution`.
+        """
+        if text:
+            self.ui.LBL_STATUS.setText( text )
+            self.ui.BTN_STATUS.setToolTip( "Cancel" )
+        else:
+            self.ui.BTN_STATUS.setToolTip( "" )
+    
+    
     def iter_forms( self ):
         return [x for x in self.mdi.values() if isinstance( x, FrmBase )]
     
@@ -187,9 +202,12 @@ class FrmMain( QMainWindow, intermake_qt.utilities.interfaces.IGuiMainWindow ):
     @qt.exqtSlot()
     def on_BTN_STATUS_clicked( self ) -> None:
         """
-        Signal handler:
+        Signal handler: Cancels the command running in the background.
         """
-        pass
+        background = cast( LegoGuiController, Controller.ACTIVE ).background
+        
+        if background is not None:
+            background.cancel()
     
     
     def __show_menu( self, menu: QMenu ):
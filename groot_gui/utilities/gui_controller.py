@@ -1,13 +1,26 @@
 import typing
+from os import path
+
+import intermake
 import intermake_qt
 
 
 class LegoGuiController( intermake_qt.GuiControllerWithBrowser ):
     """
     Wraps the GUI as an Intermake host.
+    
+    Unlike the base class, commands run in the background (see `BackgroundExecution`), so the GUI can still be used
+    whilst they run.
+    
+    :ivar background:   Runs the commands, created with the main window.
     """
     
     
+    def __init__( self, app: intermake.Application, mode: str ) -> None:
+        super().__init__( app, mode )
+        self.background = None
+    
+    
     def on_start( self ):
         """
         OVERRIDE to apply our Open GL settings before the window opens.
@@ -25,9 +38,68 @@ class LegoGuiController( intermake_qt.GuiControllerWithBrowser ):
         """
         OVERRIDE to show our custom window (`FrmMain`)
         """
-        from groot_gui.forms.resources import resources_rc as groot_resources_rc
+        _register_resources()
         from intermake_qt.forms.designer.resource_files import resources_rc as intermake_resources_rc
-        typing.cast( None, groot_resources_rc )
         typing.cast( None, intermake_resources_rc )
         from groot_gui.forms.frm_main import FrmMain
-        return FrmMain()
+        from groot_gui.utilities.gui_execution import BackgroundExecution
+        frm_main = FrmMain()
+        self.background = BackgroundExecution( frm_main.show_progress )
+        return frm_main
+    
+    
+    def on_execute( self, xargs: intermake.Result ) -> None:
+        """
+        OVERRIDE to run the command using `background`.
+        
+        Accepts the same controller arguments as the base class (`window`, `auto_close`, `confirm` and `callback`).
+        """
+        window = xargs.ui_args.get( *self.ARG_PARENT_WINDOW, self.owner_window )
+        callback = xargs.ui_args.get( *self.ARG_LISTEN, None )
+        confirm = xargs.ui_args.get( *self.ARG_CONFIRM, False )
+        auto_close = xargs.ui_args.get( *self.ARG_AUTO_CLOSE, False )
+        
+        if window is None:
+            raise ValueError( "Cannot run the command «{}» because the GUI has no window to run it from.".format( xargs.command.name ) )
+        
+        if callback is not None:
+            xargs.listen( callback )
+        
+        if confirm and xargs.command.args:
+            start = False
+        else:
+            start = self.gui_settings.read( xargs.command, "auto_start_if_parameterless", not confirm )
+        
+        if not start:
+            from intermake_qt.forms.frm_arguments import FrmArguments
+            avc = FrmArguments.query( owner_window = window,
+                                      editorium = self.editorium,
+                                      command = xargs.command,
+                                      defaults = xargs.args )
+            
+            if avc is None:
+                xargs.set_error( intermake.TaskCancelledError( "User denied starting task." ), None, None )
+                return
+            
+            xargs.args = avc.to_argskwargs()
+        
+        self.background.submit( xargs, window, auto_close )
+
+
+def _register_resources() -> None:
+    """
+    Registers Groot's icons and images with Qt.
+    
+    These are read from `resources.rcc`, which Qt maps into memory, only reading the icons as they are used.
+    The equivalent Python module, `resources_rc`, embeds the same data in 2Mb of source code, which takes seconds to
+    load from a network drive, or if Python cannot write its compiled bytecode, so it is only imported if the `.rcc` is
+    missing.
+    
+    `resources.rcc` is compiled from `resources.qrc` using `rcc -binary resources.qrc -o resources.rcc`.
+    """
+    from PyQt5.QtCore import QResource
+    from groot_gui.forms.resources import resources
+    
+    if not QResource.registerResource( path.join( path.dirname( resources.__file__ ), "resources.rcc" ) ):
+        from groot_gui.forms.resources import resources_rc
+        typing.cast( None, resources_rc )
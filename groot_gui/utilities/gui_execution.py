@@ -0,0 +1,289 @@
+"""
+Runs the commands started from the GUI in the background, see `BackgroundExecution`.
+"""
+import re
+import threading
+from collections import deque
+from typing import Callable, Deque, List, Optional, Tuple
+
+import intermake
+from PyQt5.QtCore import QObject, QThread, Qt, pyqtSignal, pyqtSlot
+from PyQt5.QtGui import QCloseEvent
+from PyQt5.QtWidgets import QWidget
+from intermake_qt.forms.frm_maintenance import FrmMaintenance
+from mhelper import exception_helper
+
+from groot import constants
+from groot.constants import EChanges
+from groot.data import global_view
+
+
+_RX_ACTION = re.compile( r'^<action name="(.*?)" max="([0-9]+)">' )
+_RX_PROGRESS = re.compile( r'^<progress value="([0-9]+)">' )
+_END_ACTION = "</action>"
+
+
+class _Worker( QThread ):
+    """
+    Runs a command on its own thread.
+    
+    The worker is the target of everything the command prints (see `intermake.Streaming`).
+    Each message is relayed to the GUI thread via `message` and the innermost action being iterated over
+    (see `intermake.pr.pr_iterate`) is relayed via `progress`.
+    
+    The command is cancelled by raising a `TaskCancelledError` when it next reports its progress, i.e. at the start of
+    an action or its next iteration.
+    
+    :ivar xargs:        The command being run
+    :ivar cancelled:    Set from the GUI thread to cancel the command.
+    :ivar history:      Messages printed by the command.
+    :ivar result:       Result of the command, once finished.
+    :ivar exception:    Error raised by the command, once finished, if any.
+    :ivar traceback:    Traceback of the `exception`.
+    """
+    message = pyqtSignal( str )
+    progress = pyqtSignal( str )
+    
+    
+    def __init__( self, xargs: intermake.Result, is_cancelled: Callable[[], bool] ):
+        super().__init__()
+        self.xargs = xargs
+        self.cancelled = False
+        self.history: List[str] = []
+        self.result: Optional[object] = None
+        self.exception: Optional[Exception] = None
+        self.traceback: Optional[str] = None
+        self.__is_cancelled = is_cancelled
+        self.__actions: List[Tuple[str, int, int]] = []
+    
+    
+    def run( self ) -> None:
+        #############################
+        # THIS IS THE WORKER THREAD #
+        #############################
+        threading.current_thread().name = "groot_background_{}".format( self.xargs.command.name )
+        intermake.Streaming.INSTANCE.set_target( self )
+        
+        try:
+            if self.xargs.command.folder == constants.F_PRINT:
+                # Commands that only print don't change the model, so they read the committed model, rather than copying it
+                self.result = self.xargs.execute()
+            else:
+                # Other threads (i.e. the GUI) continue to see the model as it was until the command completes
+                with global_view.edit_model( self.xargs.args ) as (_, self.xargs.args):
+                    self.result = self.xargs.execute()
+                
+                # Committing the snapshot replaces every object of the model, so the forms must obtain the new model,
+                # even if the command only changed its data (e.g. `FrmLego` keeps the model's objects otherwise)
+                if self.result is None or isinstance( self.result, EChanges ):
+                    self.result = (self.result or EChanges.NONE) | EChanges.MODEL_OBJECT
+        except Exception as ex:
+            self.exception = ex
+            self.traceback = exception_helper.get_traceback()
+    
+    
+    def write( self, data: str ) -> None:
+        """
+        Receives the messages printed by the command (in the worker thread).
+        """
+        self.history.append( data )
+        self.message.emit( data )
+        
+        if data.startswith( _END_ACTION ):
+            if self.__actions:
+                self.__actions.pop()
+            
+            self.__update_progress()
+            return
+        
+        match = _RX_ACTION.match( data )
+        
+        if match is not None:
+            self.__actions.append( (match.group( 1 ), 0, int( match.group( 2 ) )) )
+        else:
+            match = _RX_PROGRESS.match( data )
+            
+            if match is None or not self.__actions:
+                return
+            
+            title, _, maximum = self.__actions[-1]
+            self.__actions[-1] = title, int( match.group( 1 ) ), maximum
+        
+        self.__update_progress()
+        
+        if self.cancelled or self.__is_cancelled():
+            raise intermake.TaskCancelledError( "The command «{}» was cancelled by the user.".format( self.xargs.command.name ) )
+    
+    
+    def flush( self ) -> None:
+        pass
+    
+    
+    def __update_progress( self ) -> None:
+        if not self.__actions:
+            self.progress.emit( "" )
+            return
+        
+        title, value, maximum = self.__actions[-1]
+        
+        if maximum:
+            self.progress.emit( "{}: {} of {}".format( title, value, maximum ) )
+        else:
+            self.progress.emit( "{}: {}".format( title, value ) )
+
+
+class _FrmProgress( FrmMaintenance ):
+    """
+    The `FrmMaintenance` "please wait" form, but only as a view of the command's progress.
+    
+    `FrmMaintenance` sets the command's result when it closes, whereas `BackgroundExecution` sets the result as soon as
+    the command completes, so that the forms are updated even if this form remains open.
+    """
+    
+    
+    def __init__( self, parent: QWidget, command: intermake.Command, auto_close: bool ):
+        super().__init__( parent, command, auto_close )
+        self.__completed = False
+    
+    
+    def handle_worker_finished( self, async_result, result, exception, traceback, messages ):
+        self.__completed = True
+        super().handle_worker_finished( async_result, result, exception, traceback, messages )
+    
+    
+    def closeEvent( self, event: QCloseEvent ):
+        if not self.__completed:
+            event.ignore()
+
+
+class _Task:
+    def __init__( self, xargs: intermake.Result, window: QWidget, auto_close: bool ):
+        self.xargs = xargs
+        self.window = window
+        self.auto_close = auto_close
+        self.form: _FrmProgress = None
+        self.worker: _Worker = None
+
+
+class BackgroundExecution( QObject ):
+    """
+    Runs the commands started from the GUI on a worker thread, so the GUI remains responsive whilst a stage is
+    created.
+    
+    Commands run one at a time, in the order they are submitted, since they all act upon the same model.
+    The progress of each command is shown in a non-modal "please wait" form, with the innermost action also being
+    reported to `on_progress`, for the main window's status bar.
+    
+    Each command edits a snapshot of the model (see `global_view.edit_model`), so the GUI continues to show the model
+    as it was, until the command completes, and a command that fails or is cancelled leaves the model unchanged.
+    The `print_*` commands (`constants.F_PRINT`) don't change the model, so they read it directly, without a snapshot.
+    Other commands always report `EChanges.MODEL_OBJECT`, since the snapshot replaces the model's objects.
+    The command's result is set (see `intermake.Result.set_result`) in the GUI thread once the command completes,
+    hence the `EChanges` are applied to the open forms (see `FrmMain.command_completed`) only upon completion,
+    never part way through a command.
+    
+    :ivar on_progress:      Called (in the GUI thread) with a description of the progress of the current command, or
+                            an empty string when it completes.
+    """
+    
+    
+    def __init__( self, on_progress: Callable[[str], None] = None ):
+        super().__init__()
+        self.on_progress = on_progress
+        self.__queue: Deque[_Task] = deque()
+        self.__current: Optional[_Task] = None
+    
+    
+    @property
+    def is_busy( self ) -> bool:
+        """
+        Whether a command is running.
+        """
+        return self.__current is not None
+    
+    
+    def submit( self, xargs: intermake.Result, window: QWidget, auto_close: bool ) -> None:
+        """
+        Runs a command, once any commands submitted before it have completed.
+        
+        :param xargs:       Command to run. Its result is set once it completes.
+        :param window:      Window that owns the "please wait" form.
+        :param auto_close:  Whether to close the "please wait" form when the command completes.
+        """
+        self.__queue.append( _Task( xargs, window, auto_close ) )
+        
+        if self.__current is None:
+            self.__start_next()
+    
+    
+    def cancel( self ) -> bool:
+        """
+        Cancels the running command, and any commands waiting to run.
+        
+        The running command stops when it next reports its progress (see `_Worker`).
+        
+        :return: `True` if there was a command to cancel.
+        """
+        while self.__queue:
+            task = self.__queue.popleft()
+            task.xargs.set_error( intermake.TaskCancelledError( "The command «{}» was cancelled by the user before it started.".format( task.xargs.command.name ) ), None, None )
+        
+        if self.__current is None:
+            return False
+        
+        self.__current.worker.cancelled = True
+        self.__current.form.handle_message_from_worker( "<system>Cancel requested. The command will stop during the next iteration.</system>" )
+        return True
+    
+    
+    def __start_next( self ) -> None:
+        if not self.__queue:
+            return
+        
+        task = self.__queue.popleft()
+        task.form = _FrmProgress( task.window, task.xargs.command, task.auto_close )
+        task.form.setModal( False )
+        task.form.show()
+        task.worker = _Worker( task.xargs, task.form.handle_was_cancelled )
+        
+        # Signals are emitted in the worker thread, queue them for the GUI thread
+        task.worker.message.connect( task.form.handle_message_from_worker, Qt.QueuedConnection )
+        task.worker.progress.connect( self.__on_progress, Qt.QueuedConnection )
+        task.worker.finished.connect( self.__on_finished, Qt.QueuedConnection )
+        self.__current = task
+        
+        try:
+            task.worker.start()
+        except Exception as ex:
+            task.worker.exception = ex
+            task.worker.traceback = exception_helper.get_traceback()
+            self.__on_finished()
+    
+    
+    @pyqtSlot( str )
+    def __on_progress( self, text: str ) -> None:
+        if self.on_progress is not None and self.__current is not None:
+            self.on_progress( "{}: {}".format( self.__current.xargs.command.name, text ) if text else "" )
+    
+    
+    @pyqtSlot()
+    def __on_finished( self ) -> None:
+        ##########################
+        # THIS IS THE GUI THREAD #
+        ##########################
+        task = self.__current
+        worker = task.worker
+        self.__current = None
+        
+        if self.on_progress is not None:
+            self.on_progress( "" )
+        
+        try:
+            task.form.handle_worker_finished( task.xargs, worker.result, worker.exception, worker.traceback, worker.history )
+            
+            if worker.exception is not None:
+                task.xargs.set_error( worker.exception, worker.traceback, worker.history )
+            else:
+                task.xargs.set_result( worker.result, worker.history )
+        finally:
+            self.__start_next()
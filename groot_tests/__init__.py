@@ -5,4 +5,7 @@ This suite tests the groot core commands only - the GUI is excluded.
 
 To use these tests from within the Groot CLI, you can use `import groot_tests`.
 """
-from .test_commands import print_test, load_test, create_test, run_test 
\ No newline at end of file
+from .test_commands import print_test, load_test, create_test, run_test, run_tests
+from .synthetic import create_synthetic_test
+from .startup import run_startup_test
+from .benchmark import run_benchmark, compare_benchmark, print_benchmark
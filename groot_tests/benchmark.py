@@ -0,0 +1,271 @@
+"""
+Benchmarks of the workflow stages, see `run_benchmark`.
+"""
+import json
+import math
+import platform
+import statistics
+import time
+from collections import defaultdict
+from os import path
+from typing import Dict, List, Optional, Tuple
+
+import intermake
+from mhelper import file_helper
+
+import groot
+from groot.application import app
+from groot_tests.test_commands import _create_test_case, run_test
+from groot_tests.synthetic import _create_synthetic_case
+from groot_tests.test_directory import TestDirectory
+
+
+FORMAT = 1
+"""
+Version of the results file format.
+"""
+
+_TResults = Dict[str, object]
+_TKey = Tuple[str, int, str]
+
+_TOTAL = "(total)"
+"""
+Key of the time taken by the whole test (including creating the model, saving and comparing the results).
+"""
+
+
+@app.command()
+def run_benchmark( types: str = "1", sizes: Optional[List[int]] = None, repeats: int = 1, no_blast: bool = False, synthetic: bool = False, baseline: Optional[str] = None, threshold: float = 0.25, output: Optional[str] = None ) -> groot.EChanges:
+    """
+    Times each workflow stage over test cases of increasing size.
+    
+    For each size, a test case of each type is created (as `create_test`) and run (as `run_test`), then the time taken
+    by each stage (see `print_profile`) is recorded.
+    The results are written as JSON and the time taken by each stage is listed against the number of genes, along
+    with the apparent order of growth.
+    
+    :param types:       Type(s) of test to create, see `create_test`.
+    :param sizes:       Clade sizes, see `create_test`. The default is `2,4,8,16`.
+                        For `synthetic` tests, the number of genes. The default is `50,100,200,400`.
+    :param repeats:     Number of test cases created for each type and size.
+                        The median time is reported.
+    :param no_blast:    Perform no BLAST, see `create_test`.
+    :param synthetic:   Use synthetic test cases (see `create_synthetic_test`), which do not require external tools.
+                        Each type is then the number of fusion events, with one more component than fusions.
+                        The repeats use different random seeds.
+                        Each test case of 400 genes takes a few minutes, and the time grows faster than the square of
+                        the size (see `create_synthetic_test`).
+    :param baseline:    Previous results to compare against, see `compare_benchmark`.
+    :param threshold:   Proportion by which a stage must be slower than the `baseline` to be reported as a regression.
+    :param output:      File to write the results to.
+                        If not specified the results are written to the test results folder.
+                        Test cases that fail are listed under `failures`, the remaining test cases still run.
+    """
+    if synthetic:
+        creation_errors = ()
+    else:
+        # noinspection PyPackageRequirements
+        import faketree
+        creation_errors = faketree.RandomChoiceError
+    
+    if not sizes:
+        sizes = [50, 100, 200, 400] if synthetic else [2, 4, 8, 16]
+    
+    if repeats < 1:
+        raise ValueError( "Cannot run the benchmark because the number of repeats ({}) is less than 1.".format( repeats ) )
+    
+    cases = []
+    
+    for size in sizes:
+        for name in types:
+            for repeat in range( repeats ):
+                cases.append( (name, size, repeat) )
+    
+    runs = []
+    failures = []
+    
+    for name, size, repeat in intermake.pr.pr_iterate( cases, "Running benchmarks" ):
+        try:
+            if synthetic:
+                tdir = _create_synthetic_case( size, int( name ) + 1, int( name ), seed = repeat + 1 )
+            else:
+                tdir = _create_test_case( name, size, no_blast )
+        except creation_errors as ex:
+            intermake.pr.printx( "<warning>Skipping test {} of size {} because it could not be created: {}</warning>".format( name, size, ex ) )
+            continue
+        
+        start = time.perf_counter()
+        
+        # A failing test case is recorded, rather than losing the timings of the others
+        try:
+            run_test( tdir.t_name )
+        except Exception as ex:
+            intermake.pr.printx( "<warning>Test {} of size {} (repeat {}) failed: {}</warning>".format( name, size, repeat, ex ) )
+            failures.append( { "type"  : name,
+                               "size"  : size,
+                               "repeat": repeat,
+                               "test"  : tdir.t_name,
+                               "error" : "{}: {}".format( type( ex ).__name__, ex ) } )
+            continue
+        
+        wall = time.perf_counter() - start
+        model = groot.current_model()
+        
+        runs.append( { "type"  : name,
+                       "size"  : size,
+                       "repeat": repeat,
+                       "test"  : tdir.t_name,
+                       "genes" : len( model.genes ),
+                       "wall"  : wall,
+                       "stages": { key: { "wall"      : profile.wall,
+                                          "cpu"       : profile.cpu,
+                                          "rss_growth": profile.rss_growth,
+                                          "counters"  : profile.counters }
+                                   for key, profile in model.stage_profiles.items() } } )
+    
+    results = { "format"  : FORMAT,
+                "created" : time.strftime( "%Y-%m-%d %H:%M:%S" ),
+                "platform": platform.platform(),
+                "python"  : platform.python_version(),
+                "runs"    : runs,
+                "failures": failures }
+    
+    if not output:
+        output = path.join( TestDirectory.get_results_folder(), "benchmark-{}.json".format( time.strftime( "%Y%m%d-%H%M%S" ) ) )
+    
+    file_helper.write_all_text( output, json.dumps( results, indent = 4 ) )
+    intermake.pr.printx( "<verbose>Benchmark results saved to <file>{}</file>.</verbose>".format( output ) )
+    
+    __print_scaling( results )
+    
+    if baseline:
+        __print_comparison( results, __load_results( baseline ), threshold )
+    
+    if failures:
+        intermake.pr.printx( "<warning>{} of {} test cases failed and are not included in the timings, see «{}».</warning>".format( len( failures ), len( cases ), output ) )
+    
+    return groot.EChanges.INFORMATION
+
+
+@app.command()
+def compare_benchmark( results: str, baseline: str, threshold: float = 0.25 ) -> groot.EChanges:
+    """
+    Compares the results of two benchmarks, listing the stages that have regressed.
+    
+    Stages are compared by the median time taken for each test type and size present in both files.
+    
+    :param results:     Results file, written by `run_benchmark`.
+    :param baseline:    Results file to compare against.
+    :param threshold:   Proportion by which a stage must be slower than the `baseline` to be reported as a regression.
+                        Differences of less than 10ms are never reported.
+    """
+    __print_comparison( __load_results( results ), __load_results( baseline ), threshold )
+    
+    return groot.EChanges.INFORMATION
+
+
+@app.command()
+def print_benchmark( results: str ) -> groot.EChanges:
+    """
+    Prints the time taken by each stage against the number of genes, from the results of a benchmark.
+    
+    :param results:     Results file, written by `run_benchmark`.
+    """
+    __print_scaling( __load_results( results ) )
+    
+    return groot.EChanges.INFORMATION
+
+
+def __load_results( file_name: str ) -> _TResults:
+    results = json.loads( file_helper.read_all_text( file_name ) )
+    
+    if results.get( "format" ) != FORMAT:
+        raise ValueError( "Cannot read the benchmark results «{}» because they were written by a different version of the benchmark.".format( file_name ) )
+    
+    return results
+
+
+def __get_medians( results: _TResults ) -> Dict[_TKey, Tuple[float, float]]:
+    """
+    Obtains the median number of genes and time taken, for each test type, size and stage.
+    """
+    samples: Dict[_TKey, List[Tuple[int, float]]] = defaultdict( list )
+    
+    for run in results["runs"]:
+        for stage, measurements in run["stages"].items():
+            samples[run["type"], run["size"], stage].append( (run["genes"], measurements["wall"]) )
+        
+        samples[run["type"], run["size"], _TOTAL].append( (run["genes"], run["wall"]) )
+    
+    return { key: (statistics.median( x[0] for x in values ), statistics.median( x[1] for x in values )) for key, values in samples.items() }
+
+
+def __print_scaling( results: _TResults ) -> None:
+    medians = __get_medians( results )
+    types = sorted( set( key[0] for key in medians ) )
+    stages = [stage.name for stage in groot.STAGES]
+    stages.extend( sorted( set( key[2] for key in medians if key[2] not in stages and key[2] != _TOTAL ) ) )
+    stages.append( _TOTAL )
+    
+    for type_ in types:
+        sizes = sorted( set( key[1] for key in medians if key[0] == type_ ) )
+        
+        with intermake.pr.pr_section( "Test {}".format( type_ ) ):
+            r = []
+            r.append( "<table>" )
+            r.append( "<tr><td>Stage</td>{}<td>Growth</td></tr>".format( "".join( "<td>N={}</td>".format( int( medians[type_, size, _TOTAL][0] ) ) for size in sizes ) ) )
+            
+            for stage in stages:
+                points = [medians.get( (type_, size, stage) ) for size in sizes]
+                
+                if not any( points ):
+                    continue
+                
+                r.append( "<tr><td>{}</td>".format( stage ) )
+                
+                for point in points:
+                    r.append( "<td>{:.3f}s</td>".format( point[1] ) if point else "<td>-</td>" )
+                
+                exponent = __get_exponent( [x for x in points if x] )
+                r.append( "<td>{}</td>".format( "N^{:.2f}".format( exponent ) if exponent is not None else "-" ) )
+                r.append( "</tr>" )
+            
+            r.append( "</table>" )
+            intermake.pr.printx( "".join( r ) )
+
+
+def __get_exponent( points: List[Tuple[float, float]] ) -> Optional[float]:
+    """
+    Estimates `k`, where the time taken is proportional to `N^k`, from the slope of `log(time)` against `log(N)`.
+    """
+    points = [(math.log( n ), math.log( t )) for n, t in points if n > 0 and t > 0]
+    
+    if len( set( x for x, _ in points ) ) < 2:
+        return None
+    
+    mean_x = statistics.mean( x for x, _ in points )
+    mean_y = statistics.mean( y for _, y in points )
+    
+    return sum( (x - mean_x) * (y - mean_y) for x, y in points ) / sum( (x - mean_x) ** 2 for x, _ in points )
+
+
+def __print_comparison( results: _TResults, baseline: _TResults, threshold: float ) -> None:
+    medians = __get_medians( results )
+    baseline_medians = __get_medians( baseline )
+    regressions = []
+    
+    for key in sorted( set( medians ) & set( baseline_medians ) ):
+        time_ = medians[key][1]
+        baseline_time = baseline_medians[key][1]
+        
+        # Very short times are dominated by noise
+        if time_ > baseline_time * (1 + threshold) and time_ - baseline_time > 0.01:
+            regressions.append( (key, baseline_time, time_) )
+    
+    if not regressions:
+        intermake.pr.printx( "<positive>No stages have regressed by more than {:.0%}.</positive>".format( threshold ) )
+        return
+    
+    with intermake.pr.pr_section( "Regressions" ):
+        for (type_, size, stage), baseline_time, time_ in regressions:
+            intermake.pr.printx( "<warning>Test {} size {}: {} took {:.3f}s, compared to {:.3f}s ({:+.0%}).</warning>".format( type_, size, stage, time_, baseline_time, time_ / baseline_time - 1 if baseline_time else math.inf ) )
@@ -0,0 +1,117 @@
+"""
+Startup time test, see `run_startup_test`.
+"""
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+from typing import Dict, List
+
+import intermake
+
+import groot
+from groot.application import app
+
+
+_LAZY_MODULES = ("groot_ex", "groot_gui", "mhelper_qt", "PyQt5")
+"""
+Modules that should not be imported by a headless command that doesn't need them.
+"""
+
+_SCRIPT = """
+import json, sys, time
+start = time.perf_counter()
+import intermake, mhelper, mgraph, stringcoercion
+dependencies = time.perf_counter()
+import groot
+imported = time.perf_counter()
+results = sys.argv[1]
+sys.argv = ["groot"] + sys.argv[2:]
+try:
+    groot.Application.INSTANCE.start()
+except SystemExit:
+    pass
+finally:
+    ran = time.perf_counter()
+    with open( results, "w" ) as file:
+        json.dump( { "dependencies": dependencies - start,
+                     "import"      : imported - dependencies,
+                     "command"     : ran - imported,
+                     "modules"     : sorted( sys.modules ) }, file )
+"""
+"""
+Run by `__measure` in the new process, writing the times taken and the modules imported to the file named by the first
+argument, then the command to run.
+"""
+
+
+@app.command()
+def run_startup_test( command: str = "version", budget: float = 0.25, repeats: int = 5 ) -> groot.EChanges:
+    """
+    Measures the time taken to start Groot and run a headless command, failing if this exceeds the `budget`.
+    
+    Each measurement is made in a new Python process, so nothing is already imported.
+    The time taken to import Groot's dependencies (Intermake, MHelper, MGraph and StringCoercion) is reported
+    separately and is not included in the budget, since Groot cannot control it.
+    The test also fails if the command imports any of the modules only required by the GUI or by the algorithms
+    (e.g. `groot_gui` or `groot_ex`), which should only be imported when first used.
+    
+    :param command:     Command to run, along with its arguments, separated by spaces.
+    :param budget:      Maximum time, in seconds, to import Groot and run the `command` (the median of the `repeats`).
+    :param repeats:     Number of times to start Groot.
+    """
+    if repeats < 1:
+        raise ValueError( "Cannot run the startup test because the number of repeats ({}) is less than 1.".format( repeats ) )
+    
+    results: List[Dict[str, object]] = []
+    
+    for _ in intermake.pr.pr_iterate( range( repeats ), "Starting Groot" ):
+        results.append( __measure( command.split( " " ) ) )
+    
+    medians = { key: statistics.median( result[key] for result in results ) for key in ("dependencies", "import", "command") }
+    total = medians["import"] + medians["command"]
+    loaded = sorted( set( module.split( "." )[0] for result in results for module in result["modules"] ) & set( _LAZY_MODULES ) )
+    
+    with intermake.pr.pr_section( "Startup time" ):
+        print( "Dependencies : {:.3f}s (not included)".format( medians["dependencies"] ) )
+        print( "Import Groot : {:.3f}s".format( medians["import"] ) )
+        print( "Command      : {:.3f}s".format( medians["command"] ) )
+        print( "Total        : {:.3f}s of {:.3f}s".format( total, budget ) )
+    
+    if loaded:
+        raise ValueError( "The startup test failed because the command «{}» imported modules that it does not need: {}.".format( command, ", ".join( loaded ) ) )
+    
+    if total > budget:
+        raise ValueError( "The startup test failed because Groot took {:.3f}s to start and run the command «{}», which exceeds the budget of {:.3f}s.".format( total, command, budget ) )
+    
+    intermake.pr.printx( "<positive>Startup is within the budget.</positive>" )
+    
+    return groot.EChanges.INFORMATION
+
+
+def __measure( arguments: List[str] ) -> Dict[str, object]:
+    """
+    Starts Groot in a new process, running the command `arguments`.
+    
+    :return: The times taken and modules imported, see `_SCRIPT`.
+    """
+    handle, file_name = tempfile.mkstemp( suffix = ".json" )
+    os.close( handle )
+    
+    try:
+        # The new process finds Groot and its dependencies in the same places as this one
+        env = dict( os.environ, PYTHONPATH = os.pathsep.join( sys.path ) )
+        
+        subprocess.run( [sys.executable, "-c", _SCRIPT, file_name] + arguments,
+                        env = env,
+                        stdin = subprocess.DEVNULL,
+                        stdout = subprocess.DEVNULL,
+                        stderr = subprocess.DEVNULL,
+                        check = True )
+        
+        with open( file_name ) as file:
+            return json.load( file )
+    finally:
+        os.remove( file_name )
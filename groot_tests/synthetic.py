@@ -0,0 +1,305 @@
+"""
+Synthetic test cases, see `create_synthetic_test`.
+"""
+import random
+import string
+import uuid
+from itertools import count
+from os import path
+from typing import List, Optional, TextIO, Tuple
+
+import intermake
+from mhelper import file_helper
+
+import groot
+from groot.application import app
+from groot_tests.test_commands import run_test
+from groot_tests.test_directory import TestDirectory
+
+
+_ALPHABET = "ACDEFGHIKLMNPQRSTVWY"
+
+
+class _Family:
+    """
+    A gene family, the genes of which evolve along a random tree.
+    
+    Nodes are numbered such that each node's parent has a higher number, the root is the last node and the leaves
+    (the genes) are the first `len( genes )` nodes.
+    
+    The tree is ultrametric: the genes have a height of `0` and each clade is higher than its children, the number of
+    mutations along each branch being in proportion to the difference in height. Unlike mutating a fixed number of
+    sites along each branch, this keeps the genes of large families from becoming saturated, and `upgma` can recover
+    such a tree.
+    
+    :ivar name:         Name of the family, e.g. `A`
+    :ivar genes:        Names of the genes (leaves)
+    :ivar parents:      Parent of each node, or `-1` for the root.
+    :ivar heights:      Height of each node.
+    :ivar sequences:    Sequence of each node.
+    :ivar outgroup:     Name of the outgroup, if any.
+    :ivar sources:      For a fused family, the families and nodes the root was fused from.
+    """
+    
+    
+    def __init__( self, name: str, num_genes: int, root: str, height: float, outgroup: bool, sources: List[Tuple["_Family", int]], rnd: random.Random, mutation: float ):
+        self.name = name
+        self.genes = ["{}_{}".format( name, index ) for index in range( num_genes )]
+        self.parents: List[int] = [-1] * num_genes
+        self.outgroup: Optional[str] = self.genes[0] if outgroup else None
+        self.sources = sources
+        
+        # Join random pairs of clades, the outgroup (if any) is joined last so it branches from the root
+        clades = list( range( 1 if outgroup else 0, num_genes ) )
+        
+        while len( clades ) > 1 or (outgroup and clades):
+            if len( clades ) > 1:
+                left = self.__pop_random( clades, rnd )
+                right = self.__pop_random( clades, rnd )
+            else:
+                left = clades.pop()
+                right = 0
+                outgroup = False
+            
+            node = len( self.parents )
+            self.parents.append( -1 )
+            self.parents[left] = node
+            self.parents[right] = node
+            clades.append( node )
+        
+        # Each clade is joined after its children, so the clades are given heights in the order they were joined
+        num_clades = len( self.parents ) - num_genes
+        self.heights: List[float] = [0.0] * num_genes + [height * (index + 1) / num_clades for index in range( num_clades )]
+        
+        # Mutate the sequences from the root downwards
+        self.sequences: List[str] = [""] * len( self.parents )
+        self.sequences[-1] = root
+        
+        for node in range( len( self.parents ) - 2, -1, -1 ):
+            parent = self.parents[node]
+            self.sequences[node] = _mutate( self.sequences[parent], mutation * (self.heights[parent] - self.heights[node]), rnd )
+    
+    
+    @staticmethod
+    def __pop_random( items: List[int], rnd: random.Random ) -> int:
+        # Swap with the last item, so each pop is O(1)
+        index = rnd.randrange( len( items ) )
+        items[index], items[-1] = items[-1], items[index]
+        return items.pop()
+    
+    
+    @property
+    def length( self ) -> int:
+        return len( self.sequences[-1] )
+    
+    
+    def get_node_name( self, node: int ) -> str:
+        """
+        Name of the node in the edge list, clades are prefixed `clade` so that `rectify_nodes` ignores them.
+        """
+        return self.genes[node] if node < len( self.genes ) else "clade_{}_{}".format( self.name, node )
+
+
+@app.command()
+def create_synthetic_test( genes: int = 1000, components: int = 2, fusions: int = 1, length: int = 100, mutation: float = 0.5, hits: int = 10, seed: int = 1, run: bool = False ) -> groot.EChanges:
+    """
+    Creates a synthetic test case in the sample data folder.
+    
+    Unlike `create_test`, this does not require `faketree` or BLAST, the test case is generated directly and the same
+    `seed` always generates the same test case. The test case is run using the `as_is` alignment, `upgma` tree and
+    `groot` supertree algorithms, so MUSCLE, PAUP, RAxML and CLANN are not required either.
+    Running (`run`) takes time that grows faster than the square of the number of `genes`, with the default test case
+    taking about half a minute for 200 genes and eleven minutes for 600, most of which is spent creating the subgraphs and
+    the consensus and comparing the results (the trees take a few seconds). Larger test cases can still be created, to
+    be run with other algorithms.
+    
+    The sequences of each gene family evolve along a random tree.
+    Fused families originate from the concatenation of the sequences at random nodes of two families that are not
+    fused, such that every family is joined by the fusions.
+    The BLAST data is written directly from the known relationships (it is not a real BLAST), with each gene reporting
+    hits against a random selection of the genes it is related to.
+    
+    :param genes:       Total number of genes, divided equally between the families.
+    :param components:  Number of families that are not fused.
+                        The `fusions` must join all of the components, so at most one more than `fusions`.
+    :param fusions:     Number of fusion events (fused families).
+    :param length:      Length of the sequences of the families that are not fused.
+    :param mutation:    Proportion of sites that mutate between the root of each family and its genes.
+    :param hits:        Number of BLAST hits reported by each gene against each related family.
+                        This is in addition to one hit that ensures the genes of a family are connected.
+    :param seed:        Random seed.
+    :param run:         Run test after creating it.
+    """
+    tdir = _create_synthetic_case( genes, components, fusions, length, mutation, hits, seed )
+    
+    if run:
+        run_test( tdir.t_name )
+    
+    return groot.EChanges.INFORMATION
+
+
+def _create_synthetic_case( genes: int, components: int, fusions: int, length: int = 100, mutation: float = 0.5, hits: int = 10, seed: int = 1 ) -> TestDirectory:
+    """
+    Creates a synthetic test case, see `create_synthetic_test`.
+    
+    :return: The test case directory.
+    """
+    num_families = components + fusions
+    
+    if components < 1:
+        raise ValueError( "Cannot create the test case because it requires at least one component that is not fused." )
+    
+    if fusions and components < 2:
+        raise ValueError( "Cannot create the test case because fusions require at least two components that are not fused." )
+    
+    if fusions < components - 1:
+        raise ValueError( "Cannot create the test case because {} fusions cannot join {} components (at least {} fusions are required).".format( fusions, components, components - 1 ) )
+    
+    if genes < num_families * 3:
+        raise ValueError( "Cannot create the test case because {} genes is too few for {} families (at least 3 genes per family are required).".format( genes, num_families ) )
+    
+    rnd = random.Random( seed )
+    names = __iter_family_names()
+    families: List[_Family] = []
+    
+    for index in intermake.pr.pr_iterate( range( num_families ), "Generating families" ):
+        num_genes = genes // num_families + (1 if index < genes % num_families else 0)
+        
+        if index < components:
+            root = "".join( rnd.choice( _ALPHABET ) for _ in range( length ) )
+            families.append( _Family( next( names ), num_genes, root, 1.0, True, [], rnd, mutation ) )
+        else:
+            # Only the families that are not fused are fused, since the `groot` supertree does not recover fusions of
+            # fused families, and each fusion joins a family that has not yet been joined (if any), since the genes of a
+            # family that is not joined are missing from the fusion graph
+            unfused = families[:components]
+            joined = { family.name for fused in families[components:] for family, _ in fused.sources }
+            isolated = [family for family in unfused if family.name not in joined]
+            
+            if joined and isolated:
+                pair = [rnd.choice( [family for family in unfused if family.name in joined] ), rnd.choice( isolated )]
+            else:
+                pair = unfused
+            
+            sources = [(family, __get_random_clade( family, families[components:], rnd )) for family in rnd.sample( pair, 2 )]
+            
+            # The fused family is half the height of the lower of the clades it is fused from, each part of its root
+            # mutating along the branch from its clade, so that its genes are closer to each other than to any others
+            height = min( family.heights[node] for family, node in sources ) / 2
+            root = "".join( _mutate( family.sequences[node], mutation * (family.heights[node] - height), rnd ) for family, node in sources )
+            families.append( _Family( next( names ), num_genes, root, height, False, sources, rnd, mutation ) )
+    
+    tdir = TestDirectory( None )
+    file_helper.create_directory( tdir.t_folder )
+    
+    with open( path.join( tdir.t_folder, "leaves.fasta" ), "w" ) as file:
+        for family in families:
+            for index, gene in enumerate( family.genes ):
+                file.write( ">{}\n{}\n".format( gene, family.sequences[index] ) )
+    
+    identity = round( 100 * (1 - mutation), 1 )
+    
+    with open( path.join( tdir.t_folder, "leaves.blast" ), "w" ) as file:
+        for family in intermake.pr.pr_iterate( families, "Writing BLAST" ):
+            __write_hits( file, family, family, 1, 1, hits, identity, rnd, True )
+            
+            offset = 1
+            
+            for source, _ in family.sources:
+                __write_hits( file, family, source, offset, 1, hits, identity, rnd, False )
+                __write_hits( file, source, family, 1, offset, hits, identity, rnd, False )
+                offset += source.length
+    
+    with open( tdir.t_tree, "w" ) as file:
+        for family in families:
+            for node, parent in enumerate( family.parents ):
+                if parent != -1:
+                    file.write( "{}\t{}\n".format( family.get_node_name( parent ), family.get_node_name( node ) ) )
+            
+            for source, node in family.sources:
+                file.write( "{}\t{}\n".format( source.get_node_name( node ), family.get_node_name( len( family.parents ) - 1 ) ) )
+    
+    file_helper.write_all_text( tdir.t_ini, ["[groot_wizard]",
+                                             "tolerance=50",
+                                             "outgroups={}".format( ",".join( family.outgroup for family in families if family.outgroup ) ),
+                                             "alignment=as_is",
+                                             "tree=upgma",
+                                             "supertree=groot",
+                                             "",
+                                             "[groot_test]",
+                                             "name=synthetic",
+                                             "size={}".format( genes ),
+                                             "components={}".format( components ),
+                                             "fusions={}".format( fusions ),
+                                             "seed={}".format( seed ),
+                                             "guid={}".format( uuid.uuid4() )] )
+    
+    intermake.pr.printx( "<verbose>Created synthetic test case <file>{}</file>.</verbose>".format( tdir.t_folder ) )
+    
+    return tdir
+
+
+def __iter_family_names():
+    for size in count( 1 ):
+        for index in range( len( string.ascii_uppercase ) ** size ):
+            name = ""
+            
+            for _ in range( size ):
+                index, letter = divmod( index, len( string.ascii_uppercase ) )
+                name = string.ascii_uppercase[letter] + name
+            
+            yield name
+
+
+def __get_random_clade( family: _Family, fused: List[_Family], rnd: random.Random ) -> int:
+    """
+    Obtains a random clade of the `family`, excluding the root so that the fusion occurs within the family.
+    
+    Only the upper half of the clades are considered, since the lower clades hold too few mutations to tell the fused
+    genes apart from the clade's own genes. The clades already fused from by the `fused` families, and their parents
+    and children, are excluded too, since the `groot` supertree does not recover adjacent fusion points.
+    """
+    root = len( family.parents ) - 1
+    used = { node for fused_family in fused for source, node in fused_family.sources if source is family }
+    excluded = used | { family.parents[node] for node in used } | { node for node, parent in enumerate( family.parents ) if parent in used }
+    clades = [node for node in range( len( family.genes ), root ) if family.heights[node] >= family.heights[root] / 2 and node not in excluded]
+    return rnd.choice( clades ) if clades else root
+
+
+def _mutate( sequence: str, proportion: float, rnd: random.Random ) -> str:
+    """
+    Mutates the expected `proportion` of the sites of the `sequence`, each to a different residue.
+    """
+    expected = len( sequence ) * proportion
+    num_mutations = min( len( sequence ), int( expected ) + (rnd.random() < expected % 1) )
+    sites = list( sequence )
+    
+    for site in rnd.sample( range( len( sites ) ), num_mutations ):
+        sites[site] = rnd.choice( _ALPHABET.replace( sites[site], "" ) )
+    
+    return "".join( sites )
+
+
+def __write_hits( file: TextIO, query: _Family, subject: _Family, query_start: int, subject_start: int, num_hits: int, identity: float, rnd: random.Random, connect: bool ) -> None:
+    """
+    Writes BLAST format 6 hits from each gene of the `query` family to random genes of the `subject` family.
+    The region of the hit is the length of the shorter family, starting at the specified positions.
+    
+    :param identity:    Nominal percent identity, Groot does not use this.
+    :param connect:     Also write a hit to the next gene, so that each gene of the family is connected.
+    """
+    length = min( query.length, subject.length )
+    
+    for index, gene in enumerate( query.genes ):
+        targets = set( rnd.sample( subject.genes, min( num_hits, len( subject.genes ) ) ) )
+        
+        if connect:
+            targets.add( subject.genes[(index + 1) % len( subject.genes )] )
+        
+        targets.discard( gene )
+        
+        for target in sorted( targets ):
+            file.write( "{}\t{}\t{}\t{}\t0\t0\t{}\t{}\t{}\t{}\t1e-50\t{}\n".format( gene, target, identity, length,
+                                                                               query_start, query_start + length - 1,
+                                                                               subject_start, subject_start + length - 1,
+                                                                               length * 2 ) )
@@ -1,13 +1,18 @@
+import multiprocessing
 import os
 import os.path
 import shutil
+import sys
+import tempfile
+import traceback
 import uuid
 from itertools import count
+from multiprocessing import connection
 
 import intermake
 import mgraph
 
-from typing import Optional
+from typing import Iterator, List, Optional, Tuple
 from mhelper import SwitchError, file_helper, io_helper, OpeningWriter
 
 import groot
@@ -16,16 +21,22 @@ from groot_tests.test_directory import TestDirectory
 
 
 @app.command()
-def primary_test( repeats = 1 ):
+def primary_test( repeats = 1, processes: int = -1 ):
     """
     This is Groot's primary test suite!
     
-    :param repeats: Number of repeats.
-                    The default `1` permits a quick test, though larger numbers will giver better edge-case coverage.
-                    `-1` repeats forever (until Groot is forcibly closed). 
+    :param repeats:     Number of repeats.
+                        The default `1` permits a quick test, though larger numbers will giver better edge-case coverage.
+                        `-1` repeats forever (until Groot is forcibly closed).
+    :param processes:   Number of test cases to run at once, see `run_tests`.
+                        The test cases of all the repeats are created first, then run together.
+                        When repeating forever, the test cases of each repeat are run together.
     :return:    Nothing is returned, the program shouldn't die and the output is printed to the screen when the test
                 completes. If presumptively closed use the `print_test` command to review. 
     """
+    # noinspection PyPackageRequirements
+    import faketree as FAKE
+    
     if repeats < 0:
         r = count()
     elif repeats == 0:
@@ -33,9 +44,23 @@ def primary_test( repeats = 1 ):
     else:
         r = range( repeats )
     
+    names = []
+    
     for n in r:
         intermake.pr.printx( "groot - primary_test - repeat {} of {})".format( n, repeats ) )
-        create_test( types = "01457", size = 10, run = True )
+        
+        for name in "01457":
+            try:
+                names.append( _create_test_case( name, 10 ).t_name )
+            except FAKE.RandomChoiceError as ex:
+                print( "FAILURE {}".format( ex ) )
+        
+        if repeats < 0:
+            run_tests( names, processes )
+            names.clear()
+    
+    if names:
+        run_tests( names, processes )
 
 
 @app.command()
@@ -91,7 +116,7 @@ def print_test_dir() -> groot.EChanges:
 
 
 @app.command()
-def run_test( name: str ) -> groot.EChanges:
+def run_test( name: str, processes: int = -1 ) -> groot.EChanges:
     """
     Runs a test case and saves the results to the global results folder. 
     
@@ -102,6 +127,8 @@ def run_test( name: str ) -> groot.EChanges:
                             * The data (BLAST, FASTA)
                             * A `tree.csv` file describing the expected results (in edge-list format)
                             * A `groot.ini` file describing the parameters to use.
+    :param processes:  Number of processes used to compare the results with the expected results, see
+                       `create_comparison`.
                              
     :return:           Nothing is returned, the results are saved to the global results folder. 
     """
@@ -136,6 +163,10 @@ def run_test( name: str ) -> groot.EChanges:
     try:
         wiz_tol = int( wizard_params["tolerance"] )
         wiz_og = wizard_params["outgroups"].split( "," )
+        # Optional, synthetic test cases use algorithms that don't require external tools
+        wiz_alignment = wizard_params.get( "alignment", "" )
+        wiz_tree = wizard_params.get( "tree", "maximum_likelihood" )
+        wiz_supertree = wizard_params.get( "supertree", "clann" )
     except KeyError as ex:
         raise ValueError( "This is not a test case (it is missing the «{}» setting from the «wizard» section of the INI «{}»).".format( ex, tdir.t_ini ) )
     
@@ -150,11 +181,11 @@ def run_test( name: str ) -> groot.EChanges:
                                  pauses = set(),
                                  tolerance = wiz_tol,
                                  outgroups = wiz_og,
-                                 alignment = "",
-                                 tree = "maximum_likelihood",  # "neighbor_joining",
+                                 alignment = wiz_alignment,
+                                 tree = wiz_tree,  # "neighbor_joining",
                                  view = False,
                                  save = False,
-                                 supertree = "clann" )
+                                 supertree = wiz_supertree )
     
     try:
         # Execute the wizard (no pauses are set so this only requires 1 `step`)
@@ -174,7 +205,7 @@ def run_test( name: str ) -> groot.EChanges:
     
     # Perform the comparison
     model = groot.current_model()
-    differences = groot.compare_graphs( model.fusion_graph_clean, test_tree_file_data )
+    differences = groot.compare_graphs( model.fusion_graph_clean, test_tree_file_data, processes = processes )
     q = differences.raw_data["quartets"]["match_quartets"]
     print( "match_quartets: " + q )
     
@@ -199,6 +230,145 @@ def run_test( name: str ) -> groot.EChanges:
     return groot.EChanges.MODEL_OBJECT
 
 
+@app.command()
+def run_tests( names: Optional[List[str]] = None, processes: int = -1 ) -> groot.EChanges:
+    """
+    Runs many test cases at once, each as `run_test`.
+    
+    Each test case is run in its own worker process, with its own model and temporary folder, so the test cases cannot
+    interfere with each other or with the current model.
+    The results of each test case are saved to the global results folder as usual, along with the output of the test
+    (`test_log.txt`), and a summary of all the test cases is printed when they complete.
+    
+    :param names:       Names of the test cases.
+                        If not specified all test cases are run.
+    :param processes:   Number of test cases to run at once.
+                        `-1` runs one per CPU.
+                        `0` runs the test cases one at a time in the current process, as `run_test`.
+                        A test case that fails does not stop the remaining test cases in either case.
+                        Parallel processing requires that processes can be forked (i.e. it is not available on Windows).
+    """
+    if not names:
+        names = sorted( file_helper.get_filename( x ) for x in file_helper.list_sub_dirs( TestDirectory.get_test_folder() ) )
+    
+    errors = { }
+    
+    if not processes:
+        for name in names:
+            # Continue with the remaining test cases, the failures are summarised below
+            try:
+                run_test( name )
+            except Exception as ex:
+                traceback.print_exc()
+                errors[name] = "{}: {}".format( type( ex ).__name__, ex )
+    else:
+        if "fork" not in multiprocessing.get_all_start_methods():
+            raise ValueError( "Cannot run the test cases in parallel because processes cannot be forked on this platform. Please set `processes` to `0`." )
+        
+        for name, error in intermake.pr.pr_iterate( __run_tests_in_parallel( names, processes if processes > 0 else multiprocessing.cpu_count() ), "Running tests", count = len( names ) ):
+            if error is not None:
+                errors[name] = error
+    
+    with intermake.pr.pr_section( "Test results" ):
+        for name in names:
+            tdir = TestDirectory( name )
+            
+            if name in errors:
+                # Test cases run in the current process have no log, their output has already been printed
+                intermake.pr.printx( "<warning>{} - Failed: {}{}</warning>".format( name.ljust( 20 ), errors[name], " (see «{}»)".format( tdir.r_log ) if processes else "" ) )
+            else:
+                ini = io_helper.load_ini( tdir.r_summary, stop = ("quartets", "match_quartets") )
+                print( "{} - match_quartets: {}".format( name.ljust( 20 ), ini["quartets"]["match_quartets"] ) )
+    
+    if errors:
+        raise ValueError( "{} of {} test cases failed, see «{}».".format( len( errors ), len( names ), TestDirectory.get_results_folder() ) )
+    
+    return groot.EChanges.INFORMATION
+
+
+def __run_tests_in_parallel( names: List[str], processes: int ) -> Iterator[Tuple[str, Optional[str]]]:
+    """
+    Runs each of the test cases in a new worker process, with up to `processes` running at once.
+    
+    Each test case gets a new process, so no state is carried from one test case to the next.
+    The workers are forked by the calling thread, rather than by a `Pool`, whose replacement workers are forked by a
+    thread that Intermake has not set up for printing.
+    
+    :return: The name of each test case and its error (if it failed), as each completes.
+    """
+    context = multiprocessing.get_context( "fork" )
+    pending = list( reversed( names ) )
+    running = { }
+    
+    try:
+        while pending or running:
+            while pending and len( running ) < processes:
+                name = pending.pop()
+                receiver, sender = context.Pipe( duplex = False )
+                process = context.Process( target = __run_test_in_worker, args = (name, sender), name = "groot-test-{}".format( name ) )
+                process.start()
+                sender.close()
+                running[process.sentinel] = name, process, receiver
+            
+            for sentinel in connection.wait( list( running ) ):
+                name, process, receiver = running.pop( sentinel )
+                process.join()
+                
+                if receiver.poll():
+                    error = receiver.recv()
+                else:
+                    error = "The worker process exited unexpectedly (exit code {}).".format( process.exitcode )
+                
+                receiver.close()
+                yield name, error
+    finally:
+        for _, process, _ in running.values():
+            process.terminate()
+
+
+def __run_test_in_worker( name: str, sender: connection.Connection ) -> None:
+    """
+    Runs the test case `name` (in a worker process), sending the error (or `None` if the test succeeded) to `sender`.
+    The output is written to the test's log, rather than interleaving with that of the other workers.
+    """
+    tdir = TestDirectory( name )
+    temp_folder = os.path.join( intermake.Controller.ACTIVE.app.local_data.local_folder( intermake.constants.FOLDER_TEMPORARY ), "test_{}".format( name ) )
+    file_helper.create_directory( temp_folder, overwrite = True )
+    
+    # External tools also use the temporary folder
+    os.chdir( temp_folder )
+    os.environ["TMPDIR"] = temp_folder
+    tempfile.tempdir = temp_folder
+    
+    log_file_name = os.path.join( temp_folder, "test_log.txt" )
+    error = None
+    
+    with open( log_file_name, "w" ) as log:
+        # Redirect the underlying streams, since Intermake replaces `sys.stdout`
+        sys.__stdout__.flush()
+        sys.__stderr__.flush()
+        os.dup2( log.fileno(), sys.__stdout__.fileno() )
+        os.dup2( log.fileno(), sys.__stderr__.fileno() )
+        
+        try:
+            groot.data.global_view.new_model()
+            run_test( name, processes = 0 )
+        except Exception as ex:
+            traceback.print_exc()
+            error = "{}: {}".format( type( ex ).__name__, ex )
+        finally:
+            sys.__stdout__.flush()
+            sys.__stderr__.flush()
+    
+    # `run_test` recreates the results folder, so the log is only copied there once the test has finished
+    file_helper.create_directory( tdir.r_folder )
+    shutil.copy( log_file_name, tdir.r_log )
+    os.chdir( tdir.r_folder )
+    shutil.rmtree( temp_folder )
+    
+    sender.send( error )
+
+
 @app.command()
 def load_test( name: str ) -> groot.EChanges:
     """
@@ -267,189 +437,15 @@ def create_test( types: str = "1", no_blast: bool = False, size: int = 2, run: b
     # noinspection PyPackageRequirements
     import faketree as FAKE
     print( "START" )
-    r = []
-    args_random_tree = { "suffix": "1", "delimiter": "_", "size": size, "outgroup": True }
-    # args_fn = "-d 0.2"
-    mutate_args = ""
     
     if not types:
         raise ValueError( "Missing :param:`types`." )
     
     for index, name in enumerate( types ):
-        tdir = TestDirectory( None )
-        
         print( "Test {} of {}".format( index + 1, len( types ) ) )
         
         try:
-            FAKE.new_tree()
-            # The SeqGen mutator has a weird problem where, given a root `(X,O)R` in which `R`
-            # is set as a result of an earlier tree, `O` will be more similar to the leaves of
-            # that earlier tree than to the leaves in X. For this reason we use a simple random
-            # model and not SeqGen.
-            mutate_fn = FAKE.make_random
-            
-            if name == "0":
-                # 0 no fusions
-                outgroups = FAKE.create_random_tree( ["A"], **args_random_tree )
-                a, = (x.parent for x in outgroups)
-                mutate_fn( [a], *mutate_args )
-            elif name == "1":
-                # 1 fusion point; 3 genes; 2 origins
-                #
-                # # Should be an acyclic 2-rooted tree:
-                #
-                # A
-                #  \
-                #   -->C
-                #  /
-                # B
-                #
-                
-                # Trees
-                outgroups = FAKE.create_random_tree( ["A", "B", "C"], **args_random_tree )
-                a, b, c = (x.parent for x in outgroups)
-                __remove_outgroups( outgroups, 2 )
-                
-                mutate_fn( [a, b, c], *mutate_args )
-                
-                # Fusion point
-                fa = FAKE.get_random_node( a, avoid = outgroups )
-                fb = FAKE.get_random_node( b, avoid = outgroups )
-                FAKE.create_branch( [fa, fb], c )
-                FAKE.make_composite_node( [c] )
-            elif name == "4":
-                # 2 fusion points; 4 genes; 2 origins
-                # (Possibly the most difficult scenario because the result is cyclic)
-                #
-                # Should be a cyclic 2-rooted graph:
-                #
-                #
-                # A--------
-                #  \       \
-                #   -->C    -->D
-                #  /       /
-                # B--------
-                #         
-                
-                
-                # Trees
-                outgroups = FAKE.create_random_tree( ["A", "B", "C", "D"], **args_random_tree )
-                a, b, c, d = (x.parent for x in outgroups)
-                mutate_fn( [a, b, c, d], *mutate_args )
-                __remove_outgroups( outgroups, 2, 3 )
-                
-                # Fusion points
-                fa1 = FAKE.get_random_node( a, avoid = outgroups )
-                fb1 = FAKE.get_random_node( b, avoid = outgroups )
-                fa2 = FAKE.get_random_node( a, avoid = outgroups )
-                fb2 = FAKE.get_random_node( b, avoid = outgroups )
-                FAKE.create_branch( [fa1, fb1], c )
-                FAKE.create_branch( [fa2, fb2], d )
-                FAKE.make_composite_node( [c, d] )
-            
-            elif name == "5":
-                # 2 fusion points; 5 genes; 3 origins
-                #
-                # # Should be an acyclic 3-rooted tree:
-                #
-                # A
-                #  \
-                #   -->C
-                #  /    \
-                # B      -->E
-                #       /
-                #      D
-                
-                # Trees
-                outgroups = FAKE.create_random_tree( ["A", "B", "C", "D", "E"], **args_random_tree )
-                a, b, c, d, e = (x.parent for x in outgroups)
-                mutate_fn( [a, b, c, d, e], *mutate_args )
-                __remove_outgroups( outgroups, 2, 4 )
-                
-                # Fusion points
-                fa = FAKE.get_random_node( a, avoid = outgroups )
-                fb = FAKE.get_random_node( b, avoid = outgroups )
-                fc = FAKE.get_random_node( c, avoid = outgroups )
-                fd = FAKE.get_random_node( d, avoid = outgroups )
-                FAKE.create_branch( [fa, fb], c )
-                FAKE.create_branch( [fc, fd], e )
-                FAKE.make_composite_node( [c, e] )
-            elif name == "7":
-                # 3 fusion points; 7 genes; 4 origins
-                #
-                # Should be an acyclic 4-rooted tree:
-                #
-                # A
-                #  \
-                #   -->C
-                #  /    \
-                # B      \
-                #         -->G
-                # D      /
-                #  \    /
-                #   -->F
-                #  /
-                # E
-                #
-                
-                
-                # Trees
-                outgroups = FAKE.create_random_tree( ["A", "B", "C", "D", "E", "F", "G"], **args_random_tree )
-                a, b, c, d, e, f, g = (x.parent for x in outgroups)
-                mutate_fn( [a, b, c, d, e, f, g], *mutate_args )
-                __remove_outgroups( outgroups, 2, 5, 6 )
-                
-                # Fusion points
-                fa = FAKE.get_random_node( a, avoid = outgroups )
-                fb = FAKE.get_random_node( b, avoid = outgroups )
-                fc = FAKE.get_random_node( c, avoid = outgroups )
-                fd = FAKE.get_random_node( d, avoid = outgroups )
-                fe = FAKE.get_random_node( e, avoid = outgroups )
-                ff = FAKE.get_random_node( f, avoid = outgroups )
-                FAKE.create_branch( [fa, fb], c )
-                FAKE.create_branch( [fd, fe], f )
-                FAKE.create_branch( [fc, ff], g )
-                FAKE.make_composite_node( [c, f, g] )
-            else:
-                raise SwitchError( "name", name )
-            
-            FAKE.generate()
-            
-            file_helper.create_directory( tdir.t_folder )
-            os.chdir( tdir.t_folder )
-            
-            FAKE.print_trees( format = mgraph.EGraphFormat.ASCII, file = "tree.txt" )
-            FAKE.print_trees( format = mgraph.EGraphFormat.TSV, file = "tree.tsv", name = True, mutator = False, sequence = False, length = False )
-            FAKE.print_fasta( which = FAKE.ESubset.ALL, file = "all.fasta.hidden" )
-            FAKE.print_fasta( which = FAKE.ESubset.LEAVES, file = "leaves.fasta" )
-            
-            if not no_blast:
-                blast = []
-                # noinspection SpellCheckingInspection
-                intermake.subprocess_helper.run_subprocess( ["blastp",
-                                                             "-subject", "leaves.fasta",
-                                                             "-query", "leaves.fasta",
-                                                             "-outfmt", "6"],
-                                                            collect_stdout = blast.append )
-                
-                file_helper.write_all_text( "leaves.blast", blast )
-            
-            guid = uuid.uuid4()
-            outgroups_str = ",".join( x.data.name for x in outgroups if x.parent.is_root )
-            
-            file_helper.write_all_text( "groot.ini", ["[groot_wizard]",
-                                                      "tolerance=50",
-                                                      "outgroups={}".format( outgroups_str ),
-                                                      "",
-                                                      "[groot_test]",
-                                                      "name={}".format( name ),
-                                                      "size={}".format( size ),
-                                                      "guid={}".format( guid )] )
-            
-            path_ = os.path.abspath( "." )
-            print( "FINAL PATH: " + path_ )
-            r.append( path_ )
-        
+            tdir = _create_test_case( name, size, no_blast )
         except FAKE.RandomChoiceError as ex:
             print( "FAILURE {}".format( ex ) )
             return groot.EChanges.INFORMATION
@@ -460,6 +456,194 @@ def create_test( types: str = "1", no_blast: bool = False, size: int = 2, run: b
     return groot.EChanges.INFORMATION
 
 
+def _create_test_case( name: str, size: int, no_blast: bool = False ) -> TestDirectory:
+    """
+    Creates a test case in the sample data folder, see `create_test`.
+    
+    :param name:        Type of test to create.
+    :param size:        Clade size
+    :param no_blast:    Perform no BLAST
+    :return:            The test case directory.
+    :except faketree.RandomChoiceError: The random tree could not accommodate the fusions.
+    """
+    # noinspection PyPackageRequirements
+    import faketree as FAKE
+    args_random_tree = { "suffix": "1", "delimiter": "_", "size": size, "outgroup": True }
+    # args_fn = "-d 0.2"
+    mutate_args = ""
+    tdir = TestDirectory( None )
+    
+    FAKE.new_tree()
+    # The SeqGen mutator has a weird problem where, given a root `(X,O)R` in which `R`
+    # is set as a result of an earlier tree, `O` will be more similar to the leaves of
+    # that earlier tree than to the leaves in X. For this reason we use a simple random
+    # model and not SeqGen.
+    mutate_fn = FAKE.make_random
+    
+    if name == "0":
+        # 0 no fusions
+        outgroups = FAKE.create_random_tree( ["A"], **args_random_tree )
+        a, = (x.parent for x in outgroups)
+        mutate_fn( [a], *mutate_args )
+    elif name == "1":
+        # 1 fusion point; 3 genes; 2 origins
+        #
+        # # Should be an acyclic 2-rooted tree:
+        #
+        # A
+        #  \
+        #   -->C
+        #  /
+        # B
+        #
+        
+        # Trees
+        outgroups = FAKE.create_random_tree( ["A", "B", "C"], **args_random_tree )
+        a, b, c = (x.parent for x in outgroups)
+        __remove_outgroups( outgroups, 2 )
+        
+        mutate_fn( [a, b, c], *mutate_args )
+        
+        # Fusion point
+        fa = FAKE.get_random_node( a, avoid = outgroups )
+        fb = FAKE.get_random_node( b, avoid = outgroups )
+        FAKE.create_branch( [fa, fb], c )
+        FAKE.make_composite_node( [c] )
+    elif name == "4":
+        # 2 fusion points; 4 genes; 2 origins
+        # (Possibly the most difficult scenario because the result is cyclic)
+        #
+        # Should be a cyclic 2-rooted graph:
+        #
+        #
+        # A--------
+        #  \       \
+        #   -->C    -->D
+        #  /       /
+        # B--------
+        #         
+        
+        
+        # Trees
+        outgroups = FAKE.create_random_tree( ["A", "B", "C", "D"], **args_random_tree )
+        a, b, c, d = (x.parent for x in outgroups)
+        mutate_fn( [a, b, c, d], *mutate_args )
+        __remove_outgroups( outgroups, 2, 3 )
+        
+        # Fusion points
+        fa1 = FAKE.get_random_node( a, avoid = outgroups )
+        fb1 = FAKE.get_random_node( b, avoid = outgroups )
+        fa2 = FAKE.get_random_node( a, avoid = outgroups )
+        fb2 = FAKE.get_random_node( b, avoid = outgroups )
+        FAKE.create_branch( [fa1, fb1], c )
+        FAKE.create_branch( [fa2, fb2], d )
+        FAKE.make_composite_node( [c, d] )
+    
+    elif name == "5":
+        # 2 fusion points; 5 genes; 3 origins
+        #
+        # # Should be an acyclic 3-rooted tree:
+        #
+        # A
+        #  \
+        #   -->C
+        #  /    \
+        # B      -->E
+        #       /
+        #      D
+        
+        # Trees
+        outgroups = FAKE.create_random_tree( ["A", "B", "C", "D", "E"], **args_random_tree )
+        a, b, c, d, e = (x.parent for x in outgroups)
+        mutate_fn( [a, b, c, d, e], *mutate_args )
+        __remove_outgroups( outgroups, 2, 4 )
+        
+        # Fusion points
+        fa = FAKE.get_random_node( a, avoid = outgroups )
+        fb = FAKE.get_random_node( b, avoid = outgroups )
+        fc = FAKE.get_random_node( c, avoid = outgroups )
+        fd = FAKE.get_random_node( d, avoid = outgroups )
+        FAKE.create_branch( [fa, fb], c )
+        FAKE.create_branch( [fc, fd], e )
+        FAKE.make_composite_node( [c, e] )
+    elif name == "7":
+        # 3 fusion points; 7 genes; 4 origins
+        #
+        # Should be an acyclic 4-rooted tree:
+        #
+        # A
+        #  \
+        #   -->C
+        #  /    \
+        # B      \
+        #         -->G
+        # D      /
+        #  \    /
+        #   -->F
+        #  /
+        # E
+        #
+        
+        
+        # Trees
+        outgroups = FAKE.create_random_tree( ["A", "B", "C", "D", "E", "F", "G"], **args_random_tree )
+        a, b, c, d, e, f, g = (x.parent for x in outgroups)
+        mutate_fn( [a, b, c, d, e, f, g], *mutate_args )
+        __remove_outgroups( outgroups, 2, 5, 6 )
+        
+        # Fusion points
+        fa = FAKE.get_random_node( a, avoid = outgroups )
+        fb = FAKE.get_random_node( b, avoid = outgroups )
+        fc = FAKE.get_random_node( c, avoid = outgroups )
+        fd = FAKE.get_random_node( d, avoid = outgroups )
+        fe = FAKE.get_random_node( e, avoid = outgroups )
+        ff = FAKE.get_random_node( f, avoid = outgroups )
+        FAKE.create_branch( [fa, fb], c )
+        FAKE.create_branch( [fd, fe], f )
+        FAKE.create_branch( [fc, ff], g )
+        FAKE.make_composite_node( [c, f, g] )
+    else:
+        raise SwitchError( "name", name )
+    
+    FAKE.generate()
+    
+    file_helper.create_directory( tdir.t_folder )
+    os.chdir( tdir.t_folder )
+    
+    FAKE.print_trees( format = mgraph.EGraphFormat.ASCII, file = "tree.txt" )
+    FAKE.print_trees( format = mgraph.EGraphFormat.TSV, file = "tree.tsv", name = True, mutator = False, sequence = False, length = False )
+    FAKE.print_fasta( which = FAKE.ESubset.ALL, file = "all.fasta.hidden" )
+    FAKE.print_fasta( which = FAKE.ESubset.LEAVES, file = "leaves.fasta" )
+    
+    if not no_blast:
+        blast = []
+        # noinspection SpellCheckingInspection
+        intermake.subprocess_helper.run_subprocess( ["blastp",
+                                                     "-subject", "leaves.fasta",
+                                                     "-query", "leaves.fasta",
+                                                     "-outfmt", "6"],
+                                                    collect_stdout = blast.append )
+        
+        file_helper.write_all_text( "leaves.blast", blast )
+    
+    guid = uuid.uuid4()
+    outgroups_str = ",".join( x.data.name for x in outgroups if x.parent.is_root )
+    
+    file_helper.write_all_text( "groot.ini", ["[groot_wizard]",
+                                              "tolerance=50",
+                                              "outgroups={}".format( outgroups_str ),
+                                              "",
+                                              "[groot_test]",
+                                              "name={}".format( name ),
+                                              "size={}".format( size ),
+                                              "guid={}".format( guid )] )
+    
+    path_ = os.path.abspath( "." )
+    print( "FINAL PATH: " + path_ )
+    
+    return tdir
+
+
 def __remove_outgroups( outgroups, *args ):
     # noinspection PyPackageRequirements
     import faketree
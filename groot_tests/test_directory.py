@@ -22,6 +22,7 @@ class TestDirectory:
         self.r_summary = path.join( self.r_folder, "test_summary.ini" )
         self.r_model = path.join( self.r_folder, "session.groot" )
         self.r_alignments = path.join( self.r_folder, "alignments.fasta" )
+        self.r_log = path.join( self.r_folder, "test_log.txt" )
         self.rc_ini = path.join( self.r_folder, "input_groot.ini" )
     
     @staticmethod
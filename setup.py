@@ -23,6 +23,7 @@ setup( name = "groot",
                    "groot_gui.utilities",
                    "groot_tests"
                    ],
+       package_data = { "groot_gui.forms.resources": ["resources.rcc"] },
        entry_points = { "console_scripts": ["groot = groot.__main__:main"] },
        install_requires = ["intermake",  # MJR, architecture
                            "mhelper",  # MJR, general